@@ -0,0 +1,321 @@
+import argparse
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+import requests
+from utils import COINS
+from cycles import HALVING_DATES
+from indicators import daily_closes, compute_indicators
+
+# Rules file (JSON list, see AlertEngine) and sinks, configured through the environment
+ALERT_RULES = os.environ.get("CCA_ALERT_RULES", "alert_rules.json")
+ALERT_LOG = os.environ.get("CCA_ALERT_LOG", "alerts.jsonl")
+ALERT_WEBHOOK = os.environ.get("CCA_ALERT_WEBHOOK")
+
+# Seconds before a rule that fired may fire again (rules can set their own 'cooldown')
+DEFAULT_COOLDOWN = 3600
+
+# Quantities a rule can watch, per coin:
+# - price, change_24h: current USD price and 24h change (%)
+# - drawdown: % below the all-time high (0 at a new high, so 'below 5' means within 5% of the ATH)
+# - ma200w_ratio: price / 200-week MA (crossing 1 = crossing the 200-week MA)
+# - mayer: price / 200-day MA (Mayer multiple)
+# - halving_days: days since the latest BTC halving (the same for every coin)
+METRICS = ("price", "change_24h", "drawdown", "ma200w_ratio", "mayer", "halving_days")
+OPS = ("above", "below")
+
+# Metrics that need the coin's history (see AlertEngine.update_history)
+HISTORY_METRICS = ("drawdown", "ma200w_ratio", "mayer")
+
+_HALVINGS = pd.to_datetime(sorted(HALVING_DATES.values()))
+
+
+class AlertEngine:
+    """
+    Evaluates every price alert rule against the latest tickers in one vectorized pass.
+
+    Rules are dicts like {"id": "btc-100k", "coin": "Bitcoin (BTC)", "metric": "price", "op": "above",
+    "value": 100000, "cooldown": 3600}; "coin": "*" expands to every coin in COINS. They are compiled
+    into arrays once, so a tick costs a few numpy operations however many rules there are.
+
+    A rule fires when its condition becomes true (it must turn false before it can fire again) and
+    its cooldown has passed since it last fired. Identical rules (same coin, metric, op and value)
+    are evaluated once.
+
+    Args:
+        rules (list): Rule dicts.
+        sinks (list): Callables receiving each non-empty list of fired alerts.
+        coins (list, optional): Coin universe (default: COINS).
+        background (bool): Deliver to the sinks on a background thread, so a tick never waits for them.
+    """
+
+    def __init__(self, rules, sinks=(), coins=None, background=True):
+        self.coins = list(coins or COINS)
+        self.sinks = list(sinks)
+        self.background = background
+        self._coin_index = {coin: i for i, coin in enumerate(self.coins)}
+        self._lock = threading.Lock()
+        self._compile(rules)
+
+        # Latest value of every metric for every coin (NaN until known)
+        self.market = np.full((len(METRICS), len(self.coins)), np.nan)
+        self._ath = np.full(len(self.coins), np.nan)
+        self._ma200w = np.full(len(self.coins), np.nan)
+        self._ma200 = np.full(len(self.coins), np.nan)
+        self._history_versions = {}
+
+    def _compile(self, rules):
+        if not isinstance(rules, list):
+            raise ValueError("rules must be a list of rule objects")
+        seen = {}
+        for position, rule in enumerate(rules):
+            if not isinstance(rule, dict):
+                raise ValueError(f"rule {position}: must be an object")
+            name = rule.get("id", position)
+            if rule.get("metric") not in METRICS or rule.get("op") not in OPS:
+                raise ValueError(f"rule {name}: metric must be one of {METRICS} and op one of {OPS}")
+            try:
+                value = float(rule["value"])
+                cooldown = float(rule.get("cooldown", DEFAULT_COOLDOWN))
+            except (KeyError, TypeError, ValueError):
+                raise ValueError(f"rule {name}: value (and cooldown, if given) must be numbers")
+            coins = self.coins if rule.get("coin") == "*" else [rule.get("coin")]
+            for coin in coins:
+                if coin not in self._coin_index:
+                    raise ValueError(f"rule {name}: unknown coin {coin!r}")
+                key = (coin, rule["metric"], rule["op"], value)
+                seen.setdefault(key, (rule.get("id", str(position)), cooldown))
+
+        keys = list(seen)
+        self.rule_ids = [seen[key][0] for key in keys]
+        self._coin = np.array([self._coin_index[key[0]] for key in keys], dtype=np.intp)
+        self._metric = np.array([METRICS.index(key[1]) for key in keys], dtype=np.intp)
+        self._above = np.array([key[2] == "above" for key in keys], dtype=bool)
+        self._value = np.array([key[3] for key in keys], dtype=np.float64)
+        self._cooldown = np.array([seen[key][1] for key in keys], dtype=np.float64)
+        self._active = np.zeros(len(keys), dtype=bool)
+        self._last_fired = np.full(len(keys), -np.inf)
+
+        # Coins any rule watches, and those with a rule on a metric computed from the history
+        self.watched_coins = [self.coins[i] for i in np.unique(self._coin)]
+        from_history = np.isin(self._metric, [METRICS.index(m) for m in HISTORY_METRICS])
+        self.needs_history = [self.coins[i] for i in np.unique(self._coin[from_history])]
+
+    def update_history(self, coin_name, df, data_version=None):
+        """Updates the all-time high and moving averages of a coin (skipped if data_version was seen)."""
+        i = self._coin_index.get(coin_name)
+        if i is None or df is None or df.empty:
+            return
+        if data_version is not None and self._history_versions.get(coin_name) == data_version:
+            return
+        last = compute_indicators(daily_closes(df)).iloc[-1]
+        with self._lock:
+            self._ath[i] = np.fmax(self._ath[i], df["price"].max())
+            self._ma200w[i] = last["ma200w"]
+            self._ma200[i] = last["ma200"]
+            self._history_versions[coin_name] = data_version
+
+    def update_tickers(self, tickers, now=None):
+        """
+        Stores current-price records ({'usd', 'usd_24h_change'} per coin name) and evaluates all rules.
+
+        Returns:
+            list: Alerts fired by this tick (see evaluate).
+        """
+        with self._lock:
+            for coin_name, record in tickers.items():
+                i = self._coin_index.get(coin_name)
+                if i is None or not record:
+                    continue
+                self.market[METRICS.index("price"), i] = record["usd"]
+                self.market[METRICS.index("change_24h"), i] = record["usd_24h_change"]
+                self._ath[i] = np.fmax(self._ath[i], record["usd"])
+        return self.evaluate(now)
+
+    def evaluate(self, now=None):
+        """
+        Evaluates every rule against the current market state and delivers what fired to the sinks.
+
+        Returns:
+            list: One dict per fired rule: rule id, coin, metric, op, value, observed value and time.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            price = self.market[METRICS.index("price")]
+            with np.errstate(invalid="ignore", divide="ignore"):
+                self.market[METRICS.index("drawdown")] = (1 - price / self._ath) * 100
+                self.market[METRICS.index("ma200w_ratio")] = price / self._ma200w
+                self.market[METRICS.index("mayer")] = price / self._ma200
+            today = pd.Timestamp(now, unit="s").normalize()
+            last_halving = _HALVINGS[max(_HALVINGS.searchsorted(today, side="right") - 1, 0)]
+            self.market[METRICS.index("halving_days")] = (today - last_halving).days
+
+            observed = self.market[self._metric, self._coin]
+            with np.errstate(invalid="ignore"):
+                condition = np.where(self._above, observed > self._value, observed < self._value) # NaN -> False
+            fire = condition & ~self._active & (now - self._last_fired >= self._cooldown)
+            self._active = condition
+            self._last_fired[fire] = now
+
+        alerts = [{
+            "rule": self.rule_ids[i],
+            "coin": self.coins[self._coin[i]],
+            "metric": METRICS[self._metric[i]],
+            "op": "above" if self._above[i] else "below",
+            "value": float(self._value[i]),
+            "observed": float(observed[i]),
+            "time": now
+        } for i in np.flatnonzero(fire)]
+        if alerts and self.sinks:
+            if self.background:
+                # Webhooks can be slow; a tick (e.g. an app rerun) does not wait for delivery
+                threading.Thread(target=_deliver, args=(self.sinks, alerts), daemon=True).start()
+            else:
+                _deliver(self.sinks, alerts)
+        return alerts
+
+
+def _deliver(sinks, alerts):
+    for sink in sinks:
+        try:
+            sink(alerts)
+        except Exception as e:
+            print(f"Alert sink failed: {e}")
+
+
+def file_sink(path=None):
+    """Sink appending alerts to a JSON-lines file (default: ALERT_LOG)."""
+    path = path or ALERT_LOG
+    lock = threading.Lock()
+
+    def write(alerts):
+        with lock, open(path, "a") as f:
+            for alert in alerts:
+                f.write(json.dumps(alert) + "\n")
+    return write
+
+
+def webhook_sink(url, timeout=3):
+    """Sink POSTing each batch of alerts as JSON ({'alerts': [...]}) to a URL."""
+    def post(alerts):
+        requests.post(url, json={"alerts": alerts}, timeout=timeout).raise_for_status()
+    return post
+
+
+def load_rules(path=None):
+    """
+    Returns:
+        list: Rules from a JSON file (empty if the file does not exist).
+    """
+    path = path or ALERT_RULES
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return json.load(f)
+
+
+_default = {"loaded": False, "engine": None}
+_default_lock = threading.Lock()
+
+
+def default_engine():
+    """
+    Engine for the rules in ALERT_RULES with the file and (if CCA_ALERT_WEBHOOK is set) webhook sinks.
+
+    Loaded once per process. A rules file that cannot be read or has an invalid rule is reported
+    once and alerting stays off, so it never breaks the price fetches that feed the engine.
+
+    Returns:
+        AlertEngine or None: None when there are no (valid) rules, so callers can skip alerting entirely.
+    """
+    with _default_lock:
+        if not _default["loaded"]:
+            engine = None
+            try:
+                rules = load_rules()
+                sinks = [file_sink()] + ([webhook_sink(ALERT_WEBHOOK)] if ALERT_WEBHOOK else [])
+                engine = AlertEngine(rules, sinks) if rules else None
+            except (OSError, ValueError) as e:
+                print(f"Alerts disabled: could not load {ALERT_RULES}: {e}")
+            _default.update(loaded=True, engine=engine)
+        return _default["engine"]
+
+
+def on_ticker(coin_name, record):
+    """Feeds a freshly fetched current price to the default engine (no-op without rules)."""
+    engine = default_engine()
+    if engine is not None and record:
+        engine.update_tickers({coin_name: record})
+
+
+def on_history(coin_name, df, data_version=None):
+    """Feeds a loaded history to the default engine (no-op without rules or history-based rules for the coin)."""
+    engine = default_engine()
+    if engine is not None and coin_name in engine.needs_history:
+        engine.update_history(coin_name, df, data_version)
+
+
+def random_rules(n, seed=0):
+    """n random rules over every coin and metric (for benchmarking evaluation)."""
+    rng = np.random.default_rng(seed)
+    scales = {"price": 100000, "change_24h": 20, "drawdown": 100, "ma200w_ratio": 3, "mayer": 3, "halving_days": 1460}
+    rules = []
+    for i in range(n):
+        metric = METRICS[rng.integers(len(METRICS))]
+        rules.append({"id": f"r{i}", "coin": list(COINS)[rng.integers(len(COINS))], "metric": metric,
+                      "op": OPS[rng.integers(2)], "value": float(rng.random() * scales[metric]),
+                      "cooldown": float(rng.integers(0, 7200))})
+    return rules
+
+
+if __name__ == "__main__":
+    import utils
+
+    parser = argparse.ArgumentParser(description="Watch current prices and fire the alert rules of a rules file.")
+    parser.add_argument("--rules", default=ALERT_RULES, help="Rules file (default: %(default)s)")
+    parser.add_argument("--log", default=ALERT_LOG, help="JSON-lines file alerts are appended to (default: %(default)s)")
+    parser.add_argument("--webhook", default=ALERT_WEBHOOK, help="URL alerts are POSTed to")
+    parser.add_argument("--interval", type=float, default=300, help="Seconds between ticks")
+    parser.add_argument("--once", action="store_true", help="Evaluate a single tick and exit")
+    parser.add_argument("--bench", type=int, metavar="N", help="Time evaluation of N random rules on synthetic tickers and exit")
+    args = parser.parse_args()
+
+    if args.bench:
+        engine = AlertEngine(random_rules(args.bench))
+        rng = np.random.default_rng(1)
+        times = []
+        for tick in range(200):
+            tickers = {coin: {"usd": float(rng.random() * 100000), "usd_24h_change": float(rng.normal(0, 5))} for coin in COINS}
+            started = time.perf_counter()
+            engine.update_tickers(tickers, now=tick * 60.0)
+            times.append(time.perf_counter() - started)
+        print(f"{len(engine.rule_ids)} rules: p50 {np.percentile(times, 50) * 1000:.2f} ms, p95 {np.percentile(times, 95) * 1000:.2f} ms per tick")
+        raise SystemExit
+
+    try:
+        rules = load_rules(args.rules)
+        if not rules:
+            parser.error(f"no rules in {args.rules}")
+        engine = AlertEngine(rules, [file_sink(args.log)] + ([webhook_sink(args.webhook)] if args.webhook else []), background=False)
+    except ValueError as e:
+        parser.error(f"invalid rules in {args.rules}: {e}")
+
+    history_loaded = 0
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        while True:
+            # Moving averages move slowly; histories are refreshed hourly (like the app's history cache)
+            if time.time() - history_loaded >= 3600:
+                for coin, (df, _) in zip(engine.needs_history, pool.map(utils.fetch_coin_history, engine.needs_history)):
+                    engine.update_history(coin, df)
+                history_loaded = time.time()
+            tickers = dict(zip(engine.watched_coins, pool.map(utils.fetch_current_price, engine.watched_coins)))
+            for alert in engine.update_tickers(tickers):
+                print(f"{time.strftime('%Y-%m-%d %H:%M:%S')} {alert['rule']}: {alert['coin']} {alert['metric']} "
+                      f"{alert['op']} {alert['value']:g} (now {alert['observed']:,.2f})")
+            if args.once:
+                break
+            time.sleep(args.interval)
@@ -0,0 +1,288 @@
+import argparse
+import hashlib
+import json
+import math
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+import pandas as pd
+from utils import fetch_coin_history, get_data_version, COINS
+from cycles import get_cycle_data
+from prediction import generate_fan_chart_data
+from dca import calculate_dca
+from cache import ByteLRUCache, DATA_CACHE
+from metrics import render_prometheus
+
+# How long a fetched history is served before it is fetched again (same as the app's history cache)
+HISTORY_TTL = 3600
+
+# Memory budget for rendered responses (bytes)
+RESPONSE_CACHE_BYTES = 64 * 1024 * 1024
+
+ARROW_MIME = "application/vnd.apache.arrow.stream"
+
+# Seconds an idle keep-alive connection is kept open before the server closes it
+KEEPALIVE_TIMEOUT = 5
+
+# Histories share the process-wide byte-bounded cache; responses get their own budget
+_history_locks = {}
+_locks_guard = threading.Lock()
+
+_response_cache = ByteLRUCache(RESPONSE_CACHE_BYTES)
+
+
+class ApiError(Exception):
+    """Error returned to the client with an HTTP status code."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def get_history(coin_name, source="Auto"):
+    """
+    Returns (df, source_used, data_version) for a coin, fetching at most once per TTL.
+
+    A per-(coin, source) lock makes concurrent requests for a cold coin wait for one fetch instead
+    of all hitting the upstream APIs.
+    """
+    if coin_name not in COINS:
+        raise ApiError(404, f"Unknown coin: {coin_name}")
+
+    key = ("api_server.history", coin_name, source)
+    with _locks_guard:
+        lock = _history_locks.setdefault(key, threading.Lock())
+
+    with lock:
+        cached = DATA_CACHE.get(key)
+        if cached:
+            return cached
+
+        df, source_used = fetch_coin_history(coin_name, None, source)
+        if df.empty:
+            raise ApiError(503, f"No data available for {coin_name}")
+
+        cached = (df, source_used, get_data_version(df))
+        DATA_CACHE.put(key, cached, ttl=HISTORY_TTL)
+        return cached
+
+
+# --- Endpoint handlers ---
+# Each handler returns (table, meta): a DataFrame payload plus a dict of scalar metadata.
+
+def _history_endpoint(df, params):
+    return df[["price"]].rename_axis("date"), {}
+
+
+def _cycles_endpoint(df, params):
+    cycles = get_cycle_data(df)
+    rows = []
+    for c_num, data in cycles.items():
+        rows.append({
+            "cycle": c_num,
+            "start_date": data["start_date"],
+            "actual_start_date": data["actual_start_date"],
+            "end_date": data["end_date"],
+            "high": data["high"],
+            "high_date": data["high_date"],
+            "high_days": data["high_days"],
+            "low": data["low"],
+            "low_date": data["low_date"]
+        })
+    return pd.DataFrame(rows), {}
+
+
+def _projection_endpoint(df, params):
+    fan_data = generate_fan_chart_data(df, get_cycle_data(df))
+    if fan_data.empty:
+        raise ApiError(422, "Not enough cycle history to build a projection")
+    return fan_data, {}
+
+
+def _dca_endpoint(df, params):
+    try:
+        amount = float(params.get("amount", 500))
+    except ValueError:
+        raise ApiError(400, "amount must be a number")
+    if not (math.isfinite(amount) and amount > 0):
+        raise ApiError(400, "amount must be a finite number greater than 0")
+    frequency = params.get("frequency", "Monthly")
+    if frequency not in ("Daily", "Weekly", "Monthly"):
+        raise ApiError(400, "frequency must be Daily, Weekly or Monthly")
+
+    dates = {}
+    for name in ("start", "end"):
+        try:
+            dates[name] = pd.to_datetime(params[name]) if params.get(name) else None
+        except (ValueError, OverflowError):
+            raise ApiError(400, f"{name} must be a date (YYYY-MM-DD)")
+
+    res = calculate_dca(df, amount, frequency, dates["start"], dates["end"])
+    if res is None:
+        raise ApiError(422, "Not enough data for selected range")
+
+    meta = {k: float(res[k]) for k in ("total_invested", "final_value", "total_btc", "roi", "max_drawdown")}
+    return res["history"], meta
+
+
+ENDPOINTS = {
+    "/history": _history_endpoint,
+    "/cycles": _cycles_endpoint,
+    "/projection": _projection_endpoint,
+    "/dca": _dca_endpoint
+}
+
+
+# --- Serialization ---
+
+def _finite(meta):
+    # NaN and infinity are not JSON; report them as null
+    return {k: None if isinstance(v, float) and not math.isfinite(v) else v for k, v in meta.items()}
+
+
+def _to_json(table, meta, info):
+    records = table.reset_index().to_json(orient="records", date_format="iso") if table.index.name else \
+        table.to_json(orient="records", date_format="iso")
+    # Splice the records in as-is instead of decoding and re-encoding them
+    header = json.dumps({**info, **_finite(meta)}, allow_nan=False)
+    return (header[:-1] + ', "data": ' + records + "}").encode("utf-8")
+
+
+def _to_arrow(table, meta, info):
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise ApiError(406, "Arrow output requires the pyarrow package")
+
+    frame = table.reset_index() if table.index.name else table
+    arrow_table = pa.Table.from_pandas(frame, preserve_index=False)
+    metadata = {k: json.dumps(v, allow_nan=False) for k, v in {**info, **_finite(meta)}.items()}
+    arrow_table = arrow_table.replace_schema_metadata({**(arrow_table.schema.metadata or {}), **metadata})
+
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, arrow_table.schema) as writer:
+        writer.write_table(arrow_table)
+    return sink.getvalue().to_pybytes()
+
+
+def render(path, params, fmt):
+    """
+    Renders an endpoint response, served from the response cache when the data version is unchanged.
+
+    Returns:
+        tuple: (etag, body bytes, content type)
+    """
+    if path not in ENDPOINTS:
+        raise ApiError(404, f"Unknown endpoint: {path}")
+    if "coin" not in params:
+        raise ApiError(400, "Missing required parameter: coin")
+
+    source = params.get("source", "Auto")
+    df, source_used, data_version = get_history(params["coin"], source)
+
+    # The ETag covers everything the body depends on: endpoint, parameters, format and data version
+    param_key = "&".join(f"{k}={params[k]}" for k in sorted(params))
+    digest = hashlib.md5(f"{path}?{param_key}|{fmt}".encode("utf-8")).hexdigest()[:8]
+    etag = f'"{data_version}-{digest}"'
+    cache_key = (path, param_key, fmt, data_version)
+
+    response = _response_cache.get(cache_key)
+    if response is not None:
+        return response
+
+    table, meta = ENDPOINTS[path](df, params)
+    info = {"coin": params["coin"], "source": source_used, "data_version": data_version}
+    if fmt == "arrow":
+        response = (etag, _to_arrow(table, meta, info), ARROW_MIME)
+    else:
+        response = (etag, _to_json(table, meta, info), "application/json")
+
+    _response_cache.put(cache_key, response)
+    return response
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1" # Keep-alive, so clients can reuse connections
+    timeout = KEEPALIVE_TIMEOUT # Idle connections are closed instead of holding their thread forever
+    disable_nagle_algorithm = True # Headers and body are separate writes; don't let them wait on delayed ACKs
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        fmt = params.pop("format", None)
+        if fmt is None:
+            fmt = "arrow" if ARROW_MIME in self.headers.get("Accept", "") else "json"
+
+        try:
+            if url.path == "/coins":
+                self._send(200, json.dumps(list(COINS.keys())).encode("utf-8"), "application/json")
+                return
+            if url.path == "/metrics":
+                self._send(200, render_prometheus().encode("utf-8"), "text/plain; version=0.0.4; charset=utf-8")
+                return
+            if url.path == "/stats":
+                stats = {"data_cache": DATA_CACHE.stats(), "response_cache": _response_cache.stats()}
+                self._send(200, json.dumps(stats).encode("utf-8"), "application/json")
+                return
+            with self.server.render_slots:
+                etag, body, content_type = render(url.path, params, fmt)
+        except ApiError as e:
+            self._send(e.status, json.dumps({"error": str(e)}).encode("utf-8"), "application/json")
+            return
+        except Exception as e:
+            print(f"Error serving {self.path}: {e}")
+            self._send(500, json.dumps({"error": "Internal server error"}).encode("utf-8"), "application/json")
+            return
+
+        if self.headers.get("If-None-Match") == etag:
+            self._send(304, b"", content_type, etag)
+        else:
+            self._send(200, body, content_type, etag)
+
+    def _send(self, status, body, content_type, etag=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        if etag:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache") # Clients revalidate with If-None-Match
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass # Request logging would dominate the cost of cached responses
+
+
+class ApiServer(ThreadingHTTPServer):
+    """
+    HTTP server with one daemon thread per connection and at most `workers` requests rendered at once.
+
+    Connections are not pinned to a fixed pool, so idle keep-alive clients cannot starve new ones
+    (and they are dropped after KEEPALIVE_TIMEOUT); daemon threads never keep the process from exiting.
+    """
+    daemon_threads = True
+
+    def __init__(self, server_address, handler_class, workers=8):
+        super().__init__(server_address, handler_class)
+        self.render_slots = threading.BoundedSemaphore(workers)
+
+
+def serve(host="127.0.0.1", port=8000, workers=8):
+    server = ApiServer((host, port), ApiHandler, workers=workers)
+    print(f"Serving Crypto Cycle Analysis API on http://{host}:{port} with {workers} workers")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Headless JSON/Arrow API for cycles, projections and DCA.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=8, help="Requests rendered concurrently")
+    args = parser.parse_args()
+    serve(args.host, args.port, args.workers)
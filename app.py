@@ -1,13 +1,32 @@
 import streamlit as st
+import functools
+import os
+import time
+import uuid
 import pandas as pd
 import numpy as np
-import plotly.express as px
 import plotly.graph_objects as go
-from utils import fetch_coin_history, fetch_current_price, COINS
+import utils
+from utils import get_data_version, COINS
 from cycles import get_cycle_data, get_current_cycle_progress, HALVING_DATES
-from dca import calculate_dca
+from dca import calculate_dca, calculate_dca_sweep, compare_lump_sum_dca
+from strategies import run_strategies, DEFAULT_STRATEGIES
 from prediction import generate_fan_chart_data
 from languages import TRANSLATIONS
+from downsample import downsample_series, downsample_matrix, target_points
+from charts import full_history_spec, overlay_spec, fan_spec, comparison_spec, mayer_spec, power_law_spec, correlation_series_spec, correlation_heatmap_spec, apply_labels, to_figure, FAN_TRACE_ACTUAL, FAN_TRACE_MEDIAN, FAN_TRACE_RANGE
+from comparison import fetch_price_matrix, normalize_prices, matrix_version, ANCHORS
+from correlation import rolling_pair_stats, pair_series, snapshot, phase_means, WINDOWS, MEASURES, REFERENCE
+from local_store import shared_history
+from portfolio import align_prices
+from power_law import fit_power_laws, band_prices
+from indicators import daily_closes, compute_indicators, latest_values, INDICATORS, MAYER_LOW, MAYER_HIGH
+from denomination import USD, fiat_currencies, load_fiat, quote_symbol, denominate, cross_price, fiat_current_price, format_price, quote_label
+from cache import DATA_CACHE, cached
+from metrics import start_exporters_from_env
+import alerts
+import profiling
+from profiling import stage
 
 # Page Config
 st.set_page_config(
@@ -33,112 +52,374 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# --- Sidebar ---
+# --- Data Fetching ---
+# Fetch metrics on CCA_METRICS_PORT (/metrics) and/or CCA_METRICS_FILE, if configured
+start_exporters_from_env()
+
+# utils is Streamlit-free; caching is added here. Histories and derived data (cycles, projections,
+# DCA results) go to the byte-bounded cache.DATA_CACHE (CCA_CACHE_MB, default 256), so memory stays
+# bounded however many coins, sources and parameters are requested. Figure specs stay in st.cache_data.
+# Cache for 1 hour; an empty history (every source failed) is not kept, so the next rerun tries again
+fetch_coin_history = cached(DATA_CACHE, ttl=3600, keep=lambda result: not result[0].empty)(utils.fetch_coin_history)
+
+def fetch_and_check_price(coin_name, api_key=None):
+    # Runs on every miss of the price cache below: each fresh ticker is checked against the alert rules (CCA_ALERT_RULES)
+    price = utils.fetch_current_price(coin_name, api_key)
+    alerts.on_ticker(coin_name, price)
+    return price
+
+fetch_current_price = cached(DATA_CACHE, ttl=300, keep=bool)(fetch_and_check_price) # A failed fetch (None) is retried
+
+@cached(DATA_CACHE)
+def cycle_data(coin_name, data_version, _df):
+    return get_cycle_data(_df)
+
+@cached(DATA_CACHE)
+def fan_chart_data(coin_name, data_version, _df):
+    return generate_fan_chart_data(_df, cycle_data(coin_name, data_version, _df))
+
+# --- Denomination ---
+# A coin priced in another coin or a fiat series is derived from the two USD histories already loaded
+# (no pair history is fetched); the ratio is cached per (base, quote, data versions).
+fiat_history = cached(DATA_CACHE, ttl=3600)(load_fiat)
+
+@cached(DATA_CACHE)
+def ratio_history(base, quote, base_version, quote_version, _base_df, _quote_df):
+    ratio = denominate(_base_df, _quote_df)
+    return ratio, get_data_version(ratio)
+
+# --- Indicators ---
+# Rolling indicators (200-week MA, Pi Cycle, Mayer multiple) are one vectorized pass over the daily
+# closes, cached per coin, quote and data version.
+@cached(DATA_CACHE)
+def indicator_data(series_key, data_version, _df):
+    return compute_indicators(daily_closes(_df))
+
+# --- Power Law ---
+# Closed-form log-log fits from six sums per coin: the selected coin on every Dashboard load (cached per
+# data version) and, on request, every coin in COINS as one batch over the comparison matrix.
+@cached(DATA_CACHE)
+def power_law_fit(coin_name, quote, data_version, _df):
+    fits = fit_power_laws(align_prices({coin_name: _df}))
+    return fits.iloc[0] if not fits.empty else None
+
+@cached(DATA_CACHE)
+def power_law_batch(version, _prices):
+    return fit_power_laws(_prices)
+
+@cached(DATA_CACHE)
+def dca_result(coin_name, data_version, amount, frequency, start_date, end_date, _df):
+    return calculate_dca(_df, amount, frequency, start_date, end_date)
+
+@cached(DATA_CACHE)
+def strategy_results(coin_name, data_version, amount, frequency, start_date, end_date, _df):
+    # The default strategies, sized to the amount entered in the DCA form
+    strategies = [dict(strategy, amount=amount) for strategy in DEFAULT_STRATEGIES]
+    return run_strategies(_df, strategies, frequency, start_date, end_date)
+
+# --- Chart Downsampling ---
+# Plotly draws every point it is sent; anything beyond the chart's pixel width is wasted payload.
+# Downsampled traces are cached per (coin, data version, scale); leading-underscore args are not hashed.
+
+@st.cache_data(max_entries=128)
+def downsample_history(coin_name, data_version, log_scale, _df, n_points=target_points()):
+    return downsample_series(_df["price"], n_points, log_scale=log_scale).to_frame()
+
+@st.cache_data(max_entries=128)
+def downsample_cycles(coin_name, data_version, _cycles, n_points=target_points()):
+    traces = {}
+    for cycle_num, data in _cycles.items():
+        cycle_df = data["data"]
+        if not cycle_df.empty:
+            # Overlay chart is always on a log axis
+            series = cycle_df.set_index("days_since_halving")["price"]
+            traces[cycle_num] = downsample_series(series, n_points, log_scale=True)
+    return traces
+
+# --- Figure Specs ---
+# Figures are cached per (coin, page, scale, data version) without any translated text, so switching
+# language or touching unrelated widgets only re-applies labels (see charts.apply_labels).
+
+@st.cache_data(max_entries=128)
+def full_history_figure(coin_name, data_version, log_scale, _df, indicators=(), _indicator_frame=None, n_points=target_points()):
+    plot_df = downsample_history(coin_name, data_version, log_scale, _df)
+    lines, pi_tops = {}, None
+    if "ma200w" in indicators:
+        lines["ma200w"] = downsample_series(_indicator_frame["ma200w"], n_points, log_scale=log_scale)
+    if "pi_cycle" in indicators:
+        lines["ma111"] = downsample_series(_indicator_frame["ma111"], n_points, log_scale=log_scale)
+        lines["ma350x2"] = downsample_series(_indicator_frame["ma350x2"], n_points, log_scale=log_scale)
+        pi_tops = _indicator_frame.loc[_indicator_frame["pi_top"], "price"]
+    return full_history_spec(plot_df, _df["price"].min(), _df["price"].max(), _df.index.min(), log_scale, lines, pi_tops)
+
+@st.cache_data(max_entries=128)
+def mayer_figure(coin_name, data_version, _indicator_frame, n_points=target_points()):
+    return mayer_spec(downsample_series(_indicator_frame["mayer"], n_points, log_scale=True), MAYER_LOW, MAYER_HIGH)
+
+def indicator_trace_names(spec, t):
+    """Translated legend names for the traces full_history_spec names by key."""
+    return {i: t[f"legend_{trace['name']}"] for i, trace in enumerate(spec["data"])
+            if trace.get("name") in ("price", "ma200w", "ma111", "ma350x2", "pi_top")}
+
+@st.cache_data(max_entries=128)
+def power_law_figure(coin_name, quote, data_version, _df, _fit, n_points=target_points()):
+    plot_df = downsample_history(coin_name, data_version, True, _df)
+    bands = band_prices(_fit, _df.index.min())
+    # The bands are smooth lines; every n-th day is enough
+    return power_law_spec(plot_df, bands.iloc[::max(1, len(bands) // n_points)], quote)
+
+@st.cache_data(max_entries=128)
+def overlay_figure(coin_name, data_version, _cycles):
+    return overlay_spec(downsample_cycles(coin_name, data_version, _cycles), _cycles)
+
+@st.cache_data(max_entries=128)
+def fan_figure(coin_name, data_version, _cycles, _fan_data):
+    return fan_spec(_cycles[4]['data'], _fan_data)
+
+@cached(DATA_CACHE)
+def dca_sweep_matrix(coin_name, data_version, frequency, _df):
+    # Holding periods from 1 month to ~4 years, start dates sampled weekly to keep the heatmap light
+    sweep_durations = [30 * m for m in range(1, 51)]
+    return calculate_dca_sweep(_df, sweep_durations, [frequency], start_step=7)[frequency].dropna(how="all")
+
+@cached(DATA_CACHE)
+def lump_sum_comparison(coin_name, data_version, frequency, _df):
+    # 1, 2 and 4 year windows, every start date in the history
+    return compare_lump_sum_dca(_df, (365, 730, 1460), frequency)
+
+# --- Multi-Coin Comparison ---
+# The selection is fetched concurrently into one date x coin matrix; normalization, downsampling and
+# the figure work on that matrix as a whole, so comparing 14 coins costs about as much as one.
+
+@cached(DATA_CACHE, ttl=3600, keep=lambda result: not result[0].empty)
+def comparison_matrix(coin_names, api_key, source):
+    # coin_names is a sorted tuple, so the same selection in another order hits the cache
+    # Per-coin fetches go through the cached fetch_coin_history, so changing the selection only fetches the added coins
+    prices, sources = fetch_price_matrix(list(coin_names), api_key, source, fetch=fetch_coin_history)
+    return prices, sources, matrix_version(prices)
+
+@st.cache_data(max_entries=128)
+def comparison_figure(version, coin_order, anchor, anchor_date, axis, log_scale, _prices, n_points=target_points()):
+    normalized, anchor_dates = normalize_prices(_prices[list(coin_order)], anchor, anchor_date, axis)
+    if normalized.empty:
+        return None, None
+    summary = pd.DataFrame({
+        "anchor_date": anchor_dates,
+        "multiple": normalized.ffill().iloc[-1]
+    })
+    return comparison_spec(downsample_matrix(normalized, n_points, log_scale), log_scale), summary
+
+# Rolling correlation / beta tensors (date x coin x coin) of the comparison matrix, one per window;
+# the time series, heatmap and cycle table are slices of the same cached tensor
+@cached(DATA_CACHE)
+def correlation_stats(version, window, _prices):
+    return rolling_pair_stats(_prices, window)
+
+@st.cache_data(max_entries=128)
+def correlation_figure(version, window, measure, reference, coin_order, _stats, n_points=target_points()):
+    series = pair_series(_stats, reference, measure)[[c for c in coin_order if c != reference]]
+    return correlation_series_spec(downsample_matrix(series.astype(np.float64), n_points), measure)
+
+# --- Data Loading ---
+# How long a session reuses its loaded data before asking the fetch caches again (matches the price TTL)
+DATA_REFRESH_SECONDS = 300
+
+# Multi-worker deployments: serve histories from the host-wide shared cache (local_store.shared_history)
+# instead of a per-process st.cache_data copy, so all workers map one copy and one of them refreshes it
+SHARED_CACHE = os.environ.get("CCA_SHARED_CACHE") == "1"
+
+def load_coin_data(coin_name, api_key, source, t):
+    """
+    Loads history and current price for a coin, once per (coin, data version) per session.
+    
+    Only full reruns (sidebar changes) get here; widget events inside the page fragments rerun just
+    their fragment and reuse the data passed to it.
+    """
+    cached = st.session_state.get("coin_data")
+    if cached and cached["coin"] == coin_name and time.time() - cached["loaded_at"] < DATA_REFRESH_SECONDS:
+        return cached
+    
+    with st.spinner(t["fetch_data"].format(coin=coin_name)):
+        with stage("fetch_history"):
+            if SHARED_CACHE:
+                df, meta = shared_history(coin_name, lambda coin: utils.fetch_coin_history(coin, api_key, source), max_age=3600)
+                source_used, data_version = (meta["source"], meta["data_version"]) if meta else ("None", "empty")
+            else:
+                df, source_used = fetch_coin_history(coin_name, api_key, source)
+                data_version = get_data_version(df)
+        alerts.on_history(coin_name, df, data_version) # ATH and moving averages for history-based rules
+        with stage("fetch_current_price"):
+            current_price_data = fetch_current_price(coin_name, api_key)
+    
+    if cached and cached["coin"] == coin_name and cached["data_version"] == data_version:
+        # Same history as before: keep the existing frame so downstream caches keep hitting
+        df = cached["df"]
+    
+    data = {
+        "coin": coin_name,
+        "df": df,
+        "source": source_used,
+        "current_price": current_price_data,
+        "data_version": data_version,
+        "loaded_at": time.time()
+    }
+    st.session_state["coin_data"] = data
+    return data
+
+def denominate_coin_data(coin_data, quote, api_key, source):
+    """
+    Prices loaded coin data in another coin or a fiat currency.
+    
+    Returns:
+        dict: Same keys as load_coin_data (history, current price and data version in quote units),
+              or None if the quote has no data.
+    """
+    if quote in COINS:
+        quote_df, _ = fetch_coin_history(quote, api_key, source)
+        quote_price = fetch_current_price(quote, api_key)
+    else:
+        quote_df = fiat_history(quote)
+        quote_price = fiat_current_price(quote_df)
+    if quote_df.empty or not quote_price:
+        return None
+    
+    df, data_version = ratio_history(coin_data["coin"], quote, coin_data["data_version"], get_data_version(quote_df), coin_data["df"], quote_df)
+    if df.empty:
+        return None
+    return {
+        **coin_data,
+        "df": df,
+        "current_price": cross_price(coin_data["current_price"], quote_price),
+        "data_version": data_version
+    }
 
-# 1. Language Selector
-# Moved to sidebar top for better accessibility
-if 'language' not in st.session_state:
-    st.session_state['language'] = "🇬🇧"
+# --- Profiling ---
+# Opt-in with CCA_PROFILE=1 (all sessions) or ?profile=1 (one session): every rerun is split into
+# timed stages, shown in the sidebar and appended to CCA_PROFILE_LOG. Disabled, stage() is a no-op.
+
+def profiling_enabled():
+    return profiling.ENABLED or st.query_params.get("profile") == "1"
+
+def profile_session():
+    if "profile_session" not in st.session_state:
+        st.session_state["profile_session"] = uuid.uuid4().hex[:8]
+    return st.session_state["profile_session"]
+
+def profiled(func):
+    """Profiles fragment-only reruns of a page (during a full rerun it joins the running profile)."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with profiling.run(func.__name__, enabled=profiling_enabled(), session=profile_session(), fragment=True):
+            return func(*args, **kwargs)
+    return wrapper
+
+def render_profile_panel(session):
+    runs = profiling.recent(session)
+    if not runs:
+        return
+    last = runs[-1]
+    with st.sidebar.expander("⏱ Profile", expanded=True):
+        st.caption(f"{last['name']} · {last.get('coin', '')} · {last['total_ms']:,.0f} ms")
+        rows = [{"stage": "· " * s["depth"] + s["name"], "ms": round(s["ms"], 1)} for s in last["stages"]]
+        rows.append({"stage": "(other)", "ms": round(last["other_ms"], 1)})
+        st.dataframe(pd.DataFrame(rows), hide_index=True, use_container_width=True)
+        if last["cprofile"]:
+            st.caption("cProfile (cumulative)")
+            st.dataframe(pd.DataFrame(last["cprofile"])[["function", "calls", "cumtime_ms"]].round(1), hide_index=True, use_container_width=True)
+        if len(runs) > 1:
+            # Earlier reruns of this session, including fragment-only ones
+            st.caption("Previous reruns")
+            st.dataframe(pd.DataFrame([{
+                "run": r["name"],
+                "ms": round(r["total_ms"], 1)
+            } for r in reversed(runs[:-1])]), hide_index=True, use_container_width=True)
+        if profiling.PROFILE_LOG:
+            st.caption(f"Logged to {profiling.PROFILE_LOG}")
+
+# --- Sidebar ---
+# Language, asset and page all change what every element shows, so sidebar changes run the whole
+# script once (no extra st.rerun()); everything else lives in fragments below.
 
 lang_options = {
     "🇬🇧": "🇬🇧 English", 
     "🇨🇳": "🇨🇳 中文", 
     "🇯🇵": "🇯🇵 日本語"
 }
-lang_map_rev = {v: k for k, v in lang_options.items()}
-
-# Determine current language code
-current_code = st.session_state['language']
-if current_code not in lang_options:
-    current_code = "🇬🇧"
-    st.session_state['language'] = current_code
-    
-current_display = lang_options[current_code]
-try:
-    current_index = list(lang_options.values()).index(current_display)
-except ValueError:
-    current_index = 0
-
-# Render language selector in sidebar
-selected_display = st.sidebar.selectbox(
-    "Language",
-    options=list(lang_options.values()),
-    index=current_index,
-    label_visibility="collapsed",
-    key="lang_select_box_sidebar"
-)
 
-# Handle language change
-new_code = lang_map_rev[selected_display]
-if new_code != st.session_state['language']:
-    st.session_state['language'] = new_code
-    st.rerun()
-
-# Set current language translation
-current_lang = st.session_state['language']
-t = TRANSLATIONS[current_lang]
-
-st.sidebar.title(t["sidebar_title"])
-
-# 2. Coin Selector
-# Dropdown for selecting the crypto asset to analyze
-selected_coin = st.sidebar.selectbox(t["select_asset"], list(COINS.keys()))
-
-# 3. API Configuration
-# Currently set to 'Auto' to try CoinGecko first, then fallback to Yahoo/Binance
-selected_source = "Auto"
-api_key = None 
-
-# 4. Navigation
-# Radio buttons for switching between different analysis pages
-page_options = list(t["nav_options"].keys())
-nav_display_values = list(t["nav_options"].values())
-nav_canonical_keys = list(t["nav_options"].keys())
-
-# Maintain current page state across reruns
-current_page_canonical = st.session_state.get('current_page_canonical', 'Dashboard')
-try:
-    default_index = nav_canonical_keys.index(current_page_canonical)
-except ValueError:
-    default_index = 0
-
-page_display = st.sidebar.radio(t["nav_label"], nav_display_values, index=default_index)
-
-# Update session state based on selection
-selected_canonical = next((k for k, v in t["nav_options"].items() if v == page_display), "Dashboard")
-st.session_state['current_page_canonical'] = selected_canonical
-page = selected_canonical
-
-st.sidebar.markdown("---")
-
-# 5. Data Fetching
-# Load historical and current price data for the selected coin
-with st.spinner(t["fetch_data"].format(coin=selected_coin)):
-    df, source_used = fetch_coin_history(selected_coin, api_key, selected_source)
-    current_price_data = fetch_current_price(selected_coin, api_key)
-
-# Error Handling: Stop if no data is found
-if df.empty or not current_price_data:
-    st.error(t["load_error"].format(coin=selected_coin))
-    st.stop()
-
-# 6. Sidebar Footer
-st.sidebar.markdown(t["data_source"])
-st.sidebar.info("Binance, Yahoo, CoinGecko")
-
-st.sidebar.markdown("### About Author")
-import os
-logo_path = "jw_logo.png"
-if os.path.exists(logo_path):
-    st.sidebar.image(logo_path, width=120)
-else:
-    st.sidebar.markdown("🦁 **JW**") 
+def render_sidebar():
+    """
+    Renders the sidebar selectors.
+    
+    Returns:
+        tuple: (translations, selected coin, canonical page name, quote)
+    """
+    # 1. Language Selector
+    # Moved to sidebar top for better accessibility
+    if st.session_state.get('language') not in lang_options:
+        st.session_state['language'] = "🇬🇧"
+    
+    # Bound to session state through its key, so the selection applies in this same run
+    st.sidebar.selectbox(
+        "Language",
+        options=list(lang_options.keys()),
+        format_func=lambda code: lang_options[code],
+        label_visibility="collapsed",
+        key="language"
+    )
+    
+    # Set current language translation
+    t = TRANSLATIONS[st.session_state['language']]
+    
+    st.sidebar.title(t["sidebar_title"])
+    
+    # 2. Coin Selector
+    # Dropdown for selecting the crypto asset to analyze (keyed so a language change keeps the selection)
+    selected_coin = st.sidebar.selectbox(t["select_asset"], list(COINS.keys()), key="selected_coin")
+    
+    # Quote: USD, any other coin or a fiat series from the fiat directory
+    quote = st.sidebar.selectbox(t["select_quote"], [USD] + list(COINS.keys()) + fiat_currencies(), format_func=quote_symbol, key="quote")
+    
+    # 3. Navigation
+    # Radio buttons for switching between different analysis pages
+    # Maintain current page state across reruns (and languages) through the widget key
+    if st.session_state.get('current_page_canonical') not in t["nav_options"]:
+        st.session_state['current_page_canonical'] = "Dashboard"
+    
+    page = st.sidebar.radio(
+        t["nav_label"],
+        list(t["nav_options"].keys()),
+        format_func=lambda key: t["nav_options"][key],
+        key="current_page_canonical"
+    )
+    
+    st.sidebar.markdown("---")
+    return t, selected_coin, page, quote
+
+def render_sidebar_footer(t):
+    st.sidebar.markdown(t["data_source"])
+    st.sidebar.info("Binance, Yahoo, CoinGecko")
+    
+    st.sidebar.markdown("### About Author")
+    logo_path = "jw_logo.png"
+    if os.path.exists(logo_path):
+        st.sidebar.image(logo_path, width=120)
+    else:
+        st.sidebar.markdown("🦁 **JW**") 
+    
+    st.sidebar.markdown("[@JW_CryptoBeggar](https://x.com/JW_CryptoBeggar)")
 
-st.sidebar.markdown("[@JW_CryptoBeggar](https://x.com/JW_CryptoBeggar)")
+
+def quote_axis(quote):
+    """apply_labels arguments for the price axis of a chart priced in `quote` (none for USD)."""
+    if quote == USD:
+        return {}
+    return {"y_title": f"Price ({quote_symbol(quote)})", "y_tickprefix": ""}
 
 
 # --- Page: Dashboard ---
-if page == "Dashboard":
+@st.fragment
+@profiled
+def render_dashboard(t, selected_coin, df, current_price_data, data_version, quote=USD, api_key=None, source="Auto"):
     st.title(t["dash_title"].format(coin=selected_coin))
     
     # Top Metrics
@@ -148,9 +429,10 @@ if page == "Dashboard":
     change_24h = current_price_data['usd_24h_change']
     
     with col1:
-        st.metric(t["current_price"], f"${price:,.2f}", f"{change_24h:.2f}%")
+        st.metric(t["current_price"], format_price(price, quote), f"{change_24h:.2f}%")
         
-    progress = get_current_cycle_progress()
+    with stage("cycle_progress"):
+        progress = get_current_cycle_progress()
     
     with col2:
         st.metric(t["days_since_halving"], f"{progress['days_passed']} Days")
@@ -168,94 +450,113 @@ if page == "Dashboard":
     
     # Recent Price Chart
     st.markdown(t["recent_price_title"])
-    last_30_days = df.tail(30)
-    fig = px.line(last_30_days, x=last_30_days.index, y="price", title=t["chart_price_title"].format(coin=selected_coin))
-    fig.update_layout(xaxis_title="Date", yaxis_title="Price (USD)", dragmode="pan")
-    st.plotly_chart(fig, use_container_width=True)
+    with stage("figure"):
+        import plotly.express as px # Only the dashboard and full history chart use express; it is slow to import
+        last_30_days = df.tail(30)
+        fig = px.line(last_30_days, x=last_30_days.index, y="price", title=t["chart_price_title"].format(coin=selected_coin))
+        fig.update_layout(xaxis_title="Date", yaxis_title=f"Price ({quote_symbol(quote)})", dragmode="pan")
+    with stage("plotly_chart"):
+        st.plotly_chart(fig, use_container_width=True)
+    
+    # Power-Law Rainbow
+    st.markdown(t["power_law_title"])
+    st.caption(t["power_law_desc"])
+    with stage("power_law"):
+        fit = power_law_fit(selected_coin, quote, data_version, df)
+    if fit is None or fit["band"] < 0:
+        return
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric(t["power_law_fair"], format_price(fit["fair_value"], quote))
+    with col2:
+        st.metric(t["power_law_deviation"], f"{fit['z']:+.2f}σ", f"{fit['last_price'] / fit['fair_value'] - 1:+.1%}", delta_color="off")
+    with col3:
+        st.metric(t["power_law_band"], t["rainbow_bands"][fit["band"]])
+    
+    with stage("figure:power_law"):
+        fig_power = power_law_figure(selected_coin, quote, data_version, df, fit)
+        apply_labels(fig_power, title=t["power_law_chart"].format(coin=selected_coin),
+                     trace_names={len(fig_power["data"]) - 2: t["legend_fair_value"], len(fig_power["data"]) - 1: t["legend_price"]},
+                     **quote_axis(quote))
+    with stage("plotly_chart"):
+        st.plotly_chart(to_figure(fig_power), use_container_width=True)
+    
+    if st.toggle(t["power_law_all"], key="power_law_all"):
+        with st.spinner(t["fetch_data"].format(coin=", ".join(COINS))), stage("fetch_matrix"):
+            prices, _, version = comparison_matrix(tuple(sorted(COINS)), api_key, source)
+        with stage("power_law_batch"):
+            fits = power_law_batch(version, prices)
+        if fits.empty:
+            st.error(t["comp_error"])
+            return
+        # The batch is fitted on the USD comparison matrix, whatever the selected quote
+        st.markdown(t["power_law_table_title"])
+        st.dataframe(pd.DataFrame({
+            t["col_coin"]: fits.index,
+            t["col_last_price"]: [format_price(p, USD) for p in fits["last_price"]],
+            t["col_fair_value"]: [format_price(p, USD) for p in fits["fair_value"]],
+            t["power_law_deviation"]: [f"{z:+.2f}σ" for z in fits["z"]],
+            t["power_law_band"]: [t["rainbow_bands"][b] if b >= 0 else "N/A" for b in fits["band"]],
+            t["col_slope"]: fits["slope"].round(2).values,
+            t["col_r2"]: fits["r2"].round(3).values
+        }), hide_index=True, use_container_width=True)
 
 # --- Page: Cycle Analysis ---
-elif page == "Cycle Analysis":
+@st.fragment
+@profiled
+def render_cycle_analysis(t, selected_coin, df, data_version, quote=USD):
     st.title(t["cycle_title"].format(coin=selected_coin))
     st.info(t["cycle_info"])
     
-    cycles = get_cycle_data(df)
+    with stage("cycle_data"):
+        cycles = cycle_data(selected_coin, data_version, df)
     
     # 1. Full History with Halvings
     st.markdown(t["full_history_title"])
     
-    # Log/Linear Toggle
+    # Log/Linear Toggle (only reruns this fragment)
     # Default to Linear as per user request
     scale_type = st.radio("Scale Type", [t["linear_scale_label"], t["log_scale_label"]], horizontal=True, label_visibility="collapsed")
     use_log = (scale_type == t["log_scale_label"])
     
-    fig_full = px.line(df, x=df.index, y="price", log_y=use_log, title=t["full_history_chart"].format(coin=selected_coin))
-    
-    # Add vertical lines for halvings
-    # Only show halvings that are within or slightly before the data range to avoid huge empty spaces
-    min_date = df.index.min()
-    max_date = df.index.max()
-    
-    # Buffer: Allow halving lines 1 year before data starts to show context, but not 10 years
-    buffer_date = min_date - pd.Timedelta(days=365)
-    
-    for cycle_num, date_str in HALVING_DATES.items():
-        h_date = pd.to_datetime(date_str)
-        if h_date >= buffer_date:
-            fig_full.add_vline(x=h_date, line_width=1, line_dash="dash", line_color="orange")
-            # Only add text if it's within the visible range or close to it
-            if h_date >= min_date:
-                fig_full.add_annotation(x=h_date, y=df['price'].min(), text=f"BTC Halving {cycle_num}", showarrow=False, textangle=-90)
-    
-    # Adjust Y-axis range to fit data tightly (User Request)
-    y_min_val = df['price'].min()
-    y_max_val = df['price'].max()
-    
-    if use_log:
-        # Log scale range (log10 units)
-        # Add slight padding (e.g. 5% of the log range)
-        range_min = np.log10(y_min_val)
-        range_max = np.log10(y_max_val)
-        log_padding = (range_max - range_min) * 0.05
-        fig_full.update_layout(yaxis_range=[range_min - log_padding, range_max + log_padding])
-    else:
-        # Linear scale range
-        # Add 5% padding
-        padding = (y_max_val - y_min_val) * 0.05
-        fig_full.update_layout(yaxis_range=[y_min_val - padding, y_max_val + padding])
-
-    fig_full.update_layout(yaxis_tickprefix="$", dragmode="pan")
-    st.plotly_chart(fig_full, use_container_width=True)
+    selected_indicators = st.multiselect(t["indicators_label"], INDICATORS, default=["ma200w"],
+                                         format_func=lambda key: t["indicator_options"][key], key="indicators")
+    indicator_frame = None
+    if selected_indicators:
+        with stage("indicators"):
+            indicator_frame = indicator_data(f"{selected_coin}|{quote}", data_version, df)
+    
+    with stage("figure:full_history"):
+        fig_full = full_history_figure(selected_coin, data_version, use_log, df, tuple(sorted(selected_indicators)), indicator_frame)
+        apply_labels(fig_full, title=t["full_history_chart"].format(coin=selected_coin),
+                     trace_names=indicator_trace_names(fig_full, t), **quote_axis(quote))
+    with stage("plotly_chart"):
+        st.plotly_chart(to_figure(fig_full), use_container_width=True)
+    
+    if indicator_frame is not None:
+        latest = latest_values(indicator_frame)
+        st.markdown(t["indicator_summary"].format(
+            ma200w=format_price(latest["ma200w"], quote),
+            mayer=f"{latest['mayer']:.2f}x" if not pd.isna(latest["mayer"]) else "N/A",
+            pi_top=latest["last_pi_top"].strftime("%Y-%m-%d") if latest["last_pi_top"] is not None else "N/A"
+        ))
+        if "mayer" in selected_indicators:
+            with stage("figure:mayer"):
+                fig_mayer = mayer_figure(selected_coin, data_version, indicator_frame)
+                apply_labels(fig_mayer, title=t["mayer_chart"])
+            with stage("plotly_chart"):
+                st.plotly_chart(to_figure(fig_mayer), use_container_width=True)
     
     # 2. Cycle Comparison (Overlay)
     st.markdown(t["overlay_title"])
     st.markdown(t["overlay_desc"])
     
-    fig_overlay = go.Figure()
-    
-    colors = {0: "purple", 1: "gray", 2: "blue", 3: "green", 4: "red"}
-    
-    for cycle_num, data in cycles.items():
-        cycle_df = data["data"]
-        # Use absolute prices instead of normalized
-        if not cycle_df.empty:
-            
-            fig_overlay.add_trace(go.Scatter(
-                x=cycle_df["days_since_halving"],
-                y=cycle_df["price"],
-                mode='lines',
-                name=f"Cycle {cycle_num} ({data['start_date'].year})",
-                line=dict(color=colors.get(cycle_num, "black"), width=2 if cycle_num == 4 else 1)
-            ))
-            
-    fig_overlay.update_layout(
-        title=t["overlay_chart"],
-        xaxis_title="Days Since Halving",
-        yaxis_title="Price (USD)",
-        yaxis_type="log",
-        hovermode="x unified",
-        dragmode="pan"
-    )
-    st.plotly_chart(fig_overlay, use_container_width=True)
+    with stage("figure:overlay"):
+        fig_overlay = overlay_figure(selected_coin, data_version, cycles)
+        apply_labels(fig_overlay, title=quote_label(t["overlay_chart"], quote), **quote_axis(quote))
+    with stage("plotly_chart"):
+        st.plotly_chart(to_figure(fig_overlay), use_container_width=True)
     
     # Cycle Stats Table
     st.markdown(t["stats_title"])
@@ -269,19 +570,23 @@ elif page == "Cycle Analysis":
         stats_data.append({
             t["col_cycle"]: c_num,
             t["col_start_date"]: s_date.strftime("%Y-%m-%d"),
-            t["col_high"]: f"${data['high']:,.2f}" if not pd.isna(data['high']) else "N/A",
+            quote_label(t["col_high"], quote): format_price(data['high'], quote),
             t["col_days_high"]: data["high_days"] if data["high_days"] is not None else "N/A",
-            t["col_low"]: f"${data['low']:,.2f}" if not pd.isna(data['low']) else "N/A"
+            quote_label(t["col_low"], quote): format_price(data['low'], quote)
         })
     st.dataframe(pd.DataFrame(stats_data), hide_index=True, use_container_width=True)
 
 # --- Page: Price Prediction ---
-elif page == "Price Prediction":
+@st.fragment
+@profiled
+def render_price_prediction(t, selected_coin, df, data_version, quote=USD):
     st.title(t["pred_title"].format(coin=selected_coin))
     st.warning(t["pred_disclaimer"])
     
-    cycles = get_cycle_data(df)
-    fan_data = generate_fan_chart_data(df, cycles)
+    with stage("cycle_data"):
+        cycles = cycle_data(selected_coin, data_version, df)
+    with stage("projection"):
+        fan_data = fan_chart_data(selected_coin, data_version, df)
     
     if fan_data.empty:
         st.error(t["pred_error"])
@@ -289,92 +594,73 @@ elif page == "Price Prediction":
         st.markdown(t["fan_title"])
         st.markdown(t["fan_desc"])
         
-        fig_fan = go.Figure()
+        with stage("figure:fan"):
+            fig_fan = fan_figure(selected_coin, data_version, cycles, fan_data)
+            apply_labels(fig_fan, title=t["fan_chart_title"].format(coin=selected_coin), trace_names={
+                FAN_TRACE_ACTUAL: t["legend_actual"],
+                FAN_TRACE_MEDIAN: t["legend_median"],
+                FAN_TRACE_RANGE: t["legend_range"]
+            }, **quote_axis(quote))
         
-        # Historical Data (Current Cycle)
-        current_cycle_df = cycles[4]['data']
-        fig_fan.add_trace(go.Scatter(
-            x=current_cycle_df.index,
-            y=current_cycle_df['price'],
-            mode='lines',
-            name=t["legend_actual"],
-            line=dict(color='#007bff', width=3)
-        ))
-        
-        # Fan Chart Areas
-        # 1. Max to Median (Upper zone)
-        fig_fan.add_trace(go.Scatter(
-            x=fan_data.index,
-            y=fan_data['max_price'],
-            mode='lines',
-            line=dict(width=0),
-            showlegend=False
-        ))
-        
-        fig_fan.add_trace(go.Scatter(
-            x=fan_data.index,
-            y=fan_data['median_price'],
-            mode='lines',
-            fill='tonexty',
-            fillcolor='rgba(0, 255, 0, 0.1)',
-            line=dict(color='green', dash='dash'),
-            name=t["legend_median"]
-        ))
-        
-        # 2. Median to Min (Lower zone)
-        fig_fan.add_trace(go.Scatter(
-            x=fan_data.index,
-            y=fan_data['min_price'],
-            mode='lines',
-            fill='tonexty',
-            fillcolor='rgba(255, 0, 0, 0.1)',
-            line=dict(width=0),
-            name=t["legend_range"]
-        ))
-        
-        fig_fan.update_layout(
-            title=t["fan_chart_title"].format(coin=selected_coin),
-            xaxis_title="Date",
-            yaxis_title="Price (USD)",
-            yaxis_type="log",
-            hovermode="x unified",
-            dragmode="pan"
-        )
-        
-        st.plotly_chart(fig_fan, use_container_width=True)
+        with stage("plotly_chart"):
+            st.plotly_chart(to_figure(fig_fan), use_container_width=True)
         
         st.markdown(t["levels_title"])
         last_proj = fan_data.iloc[-1]
         c1, c2, c3 = st.columns(3)
-        c1.metric(t["metric_low"], f"${last_proj['min_price']:,.2f}")
-        c2.metric(t["metric_median"], f"${last_proj['median_price']:,.2f}")
-        c3.metric(t["metric_high"], f"${last_proj['max_price']:,.2f}")
+        c1.metric(t["metric_low"], format_price(last_proj['min_price'], quote))
+        c2.metric(t["metric_median"], format_price(last_proj['median_price'], quote))
+        c3.metric(t["metric_high"], format_price(last_proj['max_price'], quote))
 
 
 # --- Page: DCA Calculator ---
-elif page == "DCA Calculator":
+def render_dca_calculator(t, selected_coin, df, data_version, quote=USD):
     st.title(t["dca_title"].format(coin=selected_coin))
     st.markdown(t["dca_desc"].format(coin=selected_coin))
-    
+    render_dca_form(t, selected_coin, df, data_version, quote)
+
+@st.fragment
+@profiled
+def render_dca_form(t, selected_coin, df, data_version, quote=USD):
     col1, col2 = st.columns([1, 2])
     
+    if 'dca_frequency' not in st.session_state:
+        st.session_state['dca_frequency'] = "Monthly"
+    
     with col1:
-        st.subheader(t["dca_params"])
-        amount = st.number_input(t["input_amount"], min_value=10, value=500, step=50)
-        
-        # Default start date logic: Try to get start of cycle 3, else first date
-        default_start = pd.to_datetime("2020-05-11")
-        if df.index[0] > default_start:
-            default_start = df.index[0]
+        # Inputs are batched in a form: editing them does not rerun anything until the backtest is run
+        with st.form("dca_form"):
+            st.subheader(t["dca_params"])
+            if quote == USD:
+                amount = st.number_input(t["input_amount"], min_value=10, value=500, step=50)
+            else:
+                # Amounts in a coin or another currency: no USD-sized defaults
+                amount = st.number_input(quote_label(t["input_amount"], quote), min_value=0.0001, value=1.0, step=0.01, format="%.4f")
+            frequency = st.selectbox(
+                t["input_frequency"],
+                list(t["frequency_options"].keys()),
+                format_func=lambda key: t["frequency_options"][key],
+                key="dca_frequency"
+            )
             
-        start_date = st.date_input(t["input_start"], default_start)
-        end_date = st.date_input(t["input_end"], pd.Timestamp.now())
+            # Default start date logic: Try to get start of cycle 3, else first date
+            default_start = pd.to_datetime("2020-05-11")
+            if df.index[0] > default_start:
+                default_start = df.index[0]
+                
+            start_date = st.date_input(t["input_start"], default_start)
+            end_date = st.date_input(t["input_end"], pd.Timestamp.now())
+            
+            submitted = st.form_submit_button(t["btn_run"])
         
-        if st.button(t["btn_run"]):
-            res = calculate_dca(df, amount, "Monthly", start_date, end_date)
+        if submitted:
+            with stage("dca"):
+                res = dca_result(selected_coin, data_version, amount, frequency, start_date, end_date, df)
             
             if res:
                 st.session_state['dca_result'] = res
+                with stage("strategies"):
+                    st.session_state['strategy_result'] = strategy_results(selected_coin, data_version, amount, frequency, start_date, end_date, df)
             else:
                 st.error(t["dca_error"])
 
@@ -384,19 +670,250 @@ elif page == "DCA Calculator":
             
             # Summary Metrics
             m1, m2, m3 = st.columns(3)
-            m1.metric(t["metric_invested"], f"${res['total_invested']:,.0f}")
-            m2.metric(t["metric_value"], f"${res['final_value']:,.0f}")
+            m1.metric(t["metric_invested"], format_price(res['total_invested'], quote, decimals=0))
+            m2.metric(t["metric_value"], format_price(res['final_value'], quote, decimals=0))
             m3.metric(t["metric_roi"], f"{res['roi']:.2f}%", delta_color="normal")
             
             st.metric(t["metric_drawdown"], f"{res['max_drawdown']:.2f}%")
             
             # Chart
             history_df = res['history']
-            fig_dca = go.Figure()
-            fig_dca.add_trace(go.Scatter(x=history_df.index, y=history_df['value'], mode='lines', name=t["metric_value"], fill='tozeroy'))
-            fig_dca.add_trace(go.Scatter(x=history_df.index, y=history_df['invested'], mode='lines', name=t["metric_invested"], line=dict(dash='dash')))
-            
-            fig_dca.update_layout(title=t["dca_chart_title"], xaxis_title="Date", yaxis_title="Value (USD)", dragmode="pan")
-            st.plotly_chart(fig_dca, use_container_width=True)
+            with stage("figure:dca"):
+                fig_dca = go.Figure()
+                fig_dca.add_trace(go.Scatter(x=history_df.index, y=history_df['value'], mode='lines', name=t["metric_value"], fill='tozeroy'))
+                fig_dca.add_trace(go.Scatter(x=history_df.index, y=history_df['invested'], mode='lines', name=t["metric_invested"], line=dict(dash='dash')))
+                
+                fig_dca.update_layout(title=t["dca_chart_title"], xaxis_title="Date", yaxis_title=f"Value ({quote_symbol(quote)})", dragmode="pan")
+            with stage("plotly_chart"):
+                st.plotly_chart(fig_dca, use_container_width=True)
             
             st.success(t["dca_success"])
+
+    # ROI Heatmap: every start date x holding period for the selected frequency
+    st.markdown(t["sweep_title"])
+    st.markdown(t["sweep_desc"])
+    
+    with stage("dca_sweep"):
+        roi_matrix = dca_sweep_matrix(selected_coin, data_version, frequency, df)
+    
+    if not roi_matrix.empty:
+        with stage("figure:sweep"):
+            fig_sweep = go.Figure(go.Heatmap(
+                x=roi_matrix.columns,
+                y=roi_matrix.index,
+                z=roi_matrix.values,
+                colorscale="RdYlGn",
+                zmid=0,
+                zmax=np.nanpercentile(roi_matrix.values, 95), # Clip extreme early-history ROI so the scale stays readable
+                colorbar=dict(title="ROI %")
+            ))
+            fig_sweep.update_layout(xaxis_title=t["sweep_x"], yaxis_title=t["sweep_y"], dragmode="pan")
+        with stage("plotly_chart"):
+            st.plotly_chart(fig_sweep, use_container_width=True)
+    
+    # Lump Sum vs DCA: every rolling window of the history for the selected frequency
+    with stage("lump_sum"):
+        lump_sum = lump_sum_comparison(selected_coin, data_version, frequency, df)
+    
+    if lump_sum:
+        st.markdown(t["lump_title"])
+        st.markdown(t["lump_desc"])
+        st.dataframe(pd.DataFrame([{
+            t["col_window"]: t["corr_window_days"].format(days=days),
+            t["col_lump_wins"]: f"{res['lump_sum_win_rate']:.1f}%",
+            t["col_dca_wins"]: f"{res['dca_win_rate']:.1f}%",
+            t["col_lump_median"]: f"{res['distribution'].at[0.5, 'lump_sum']:.2f}%",
+            t["col_dca_median"]: f"{res['distribution'].at[0.5, 'dca']:.2f}%",
+            t["col_lump_worst"]: f"{res['worst']['lump_sum']['return']:.2f}%",
+            t["col_dca_worst"]: f"{res['worst']['dca']['return']:.2f}%"
+        } for days, res in lump_sum.items()]), hide_index=True, use_container_width=True)
+    
+    # Strategy Comparison: the same range and frequency under different accumulation rules
+    strategy_res = st.session_state.get('strategy_result')
+    if strategy_res is not None:
+        st.markdown(t["strategy_title"])
+        st.markdown(t["strategy_desc"])
+        
+        summary = strategy_res['summary']
+        names = {name: t["strategy_names"].get(name, name) for name in summary.index}
+        st.dataframe(pd.DataFrame({
+            t["col_strategy"]: [names[name] for name in summary.index],
+            t["metric_invested"]: [format_price(v, quote, decimals=0) for v in summary['total_invested']],
+            t["metric_value"]: [format_price(v, quote, decimals=0) for v in summary['final_value']],
+            t["col_avg_cost"]: [format_price(v, quote) for v in summary['avg_cost']],
+            t["metric_roi"]: [f"{v:.2f}%" for v in summary['roi']],
+            t["metric_drawdown"]: [f"{v:.2f}%" for v in summary['max_drawdown']]
+        }), hide_index=True, use_container_width=True)
+        
+        with stage("figure:strategies"):
+            fig_strategies = go.Figure()
+            for name, values in strategy_res['value'].items():
+                fig_strategies.add_trace(go.Scatter(x=values.index, y=values, mode='lines', name=names[name]))
+            fig_strategies.update_layout(title=t["strategy_chart_title"], xaxis_title="Date", yaxis_title=f"Value ({quote_symbol(quote)})", dragmode="pan")
+        with stage("plotly_chart"):
+            st.plotly_chart(fig_strategies, use_container_width=True)
+
+
+# --- Page: Multi-Coin Comparison ---
+@st.fragment
+@profiled
+def render_comparison(t, selected_coin, api_key, source):
+    st.title(t["comp_title"])
+    st.markdown(t["comp_desc"])
+    
+    default_coins = list(dict.fromkeys([selected_coin, "Bitcoin (BTC)", "Ethereum (ETH)"]))
+    coins = st.multiselect(t["comp_coins"], list(COINS.keys()), default=default_coins, key="comp_coins")
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        anchor = st.radio(t["comp_anchor"], ANCHORS, format_func=lambda key: t["anchor_options"][key], horizontal=True, key="comp_anchor")
+    with col2:
+        anchor_date = None
+        if anchor == "halving":
+            halving = st.selectbox(t["comp_halving"], sorted(HALVING_DATES, reverse=True),
+                                   format_func=lambda n: f"#{n} ({HALVING_DATES[n]})", key="comp_halving")
+            anchor_date = HALVING_DATES[halving]
+        elif anchor == "date":
+            anchor_date = st.date_input(t["comp_date"], value=pd.to_datetime("2023-01-01"), key="comp_date").isoformat()
+    with col3:
+        axis = st.radio(t["comp_axis"], ["calendar", "days"], format_func=lambda key: t["axis_options"][key], horizontal=True, key="comp_axis")
+    use_log = st.toggle(t["log_scale_label"], value=True, key="comp_log")
+    
+    if not coins:
+        st.info(t["comp_error"])
+        return
+    
+    with st.spinner(t["fetch_data"].format(coin=", ".join(coins))), stage("fetch_matrix"):
+        prices, sources, version = comparison_matrix(tuple(sorted(coins)), api_key, source)
+    
+    coin_order = tuple(c for c in coins if c in prices.columns)
+    missing = [c for c in coins if c not in coin_order]
+    if missing:
+        st.warning(t["load_error"].format(coin=", ".join(missing)))
+    with stage("figure:comparison"):
+        fig_comp, summary = comparison_figure(version, coin_order, anchor, anchor_date, axis, use_log, prices) if coin_order else (None, None)
+    if fig_comp is None:
+        st.error(t["comp_error"])
+        return
+    
+    apply_labels(fig_comp, title=t["comp_chart"], x_title=t["comp_x_days"] if axis == "days" else t["comp_x_date"], y_title=t["comp_y"])
+    with stage("plotly_chart"):
+        st.plotly_chart(to_figure(fig_comp), use_container_width=True)
+    
+    st.markdown(t["comp_table_title"])
+    st.dataframe(pd.DataFrame({
+        t["col_coin"]: summary.index,
+        t["col_anchor_date"]: summary["anchor_date"].dt.strftime("%Y-%m-%d").values,
+        t["col_multiple"]: [f"{m:,.2f}x" for m in summary["multiple"]],
+        t["data_source"].lstrip("#").strip(): [sources.get(c, "") for c in summary.index]
+    }), hide_index=True, use_container_width=True)
+    
+    render_correlation(t, prices, version, coin_order)
+
+def render_correlation(t, prices, version, coin_order):
+    """Rolling correlation / beta of the compared coins: time series, heatmap and halving-cycle averages."""
+    st.markdown(t["corr_title"])
+    st.caption(t["corr_desc"])
+    if len(coin_order) < 2:
+        st.info(t["corr_need_two"])
+        return
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        window = st.radio(t["corr_window"], WINDOWS, index=1, format_func=lambda days: t["corr_window_days"].format(days=days),
+                          horizontal=True, key="corr_window")
+    with col2:
+        measure = st.radio(t["corr_measure"], MEASURES, format_func=lambda key: t["corr_measures"][key], horizontal=True, key="corr_measure")
+    with col3:
+        reference = st.selectbox(t["corr_reference"], coin_order, index=coin_order.index(REFERENCE) if REFERENCE in coin_order else 0,
+                                 key="corr_reference")
+    measure_name = t["corr_measures"][measure]
+    
+    with stage("correlation"):
+        stats = correlation_stats(version, window, prices)
+    with stage("figure:correlation"):
+        fig_corr = correlation_figure(version, window, measure, reference, coin_order, stats)
+        apply_labels(fig_corr, title=t["corr_chart"].format(measure=measure_name, coin=reference, days=window),
+                     x_title=t["comp_x_date"], y_title=measure_name)
+    with stage("plotly_chart"):
+        st.plotly_chart(to_figure(fig_corr), use_container_width=True)
+    
+    dates = stats["dates"]
+    heatmap_date = st.date_input(t["corr_date"], value=dates[-1], min_value=dates[0], max_value=dates[-1], key="corr_date")
+    matrix, used_date = snapshot(stats, heatmap_date, measure)
+    if used_date is not None:
+        matrix = matrix.loc[list(coin_order), list(coin_order)]
+        with stage("figure:correlation_heatmap"):
+            fig_heat = apply_labels(correlation_heatmap_spec(matrix, measure),
+                                    title=t["corr_heatmap"].format(measure=measure_name, date=used_date.strftime("%Y-%m-%d")))
+        st.plotly_chart(to_figure(fig_heat), use_container_width=True)
+    
+    st.markdown(t["corr_phase_title"])
+    phases = phase_means(stats, reference, measure)[[c for c in coin_order if c != reference]]
+    phases.index = [f"#{n} ({HALVING_DATES[n][:4]})" for n in phases.index]
+    phases.index.name = t["col_halving_cycle"]
+    st.dataframe(phases.round(2), use_container_width=True)
+
+
+# --- Main ---
+def render_page(t, selected_coin, page, quote=USD):
+    """Loads the selected coin's data (where the page needs it), prices it in `quote` and renders the page."""
+    # API Configuration
+    # Currently set to 'Auto' to try CoinGecko first, then fallback to Yahoo/Binance
+    selected_source = "Auto"
+    api_key = None 
+    
+    if page == "Comparison":
+        # Fetches its own selection of coins; the selected coin's data is not needed
+        render_sidebar_footer(t)
+        render_comparison(t, selected_coin, api_key, selected_source)
+        return
+    
+    # Load historical and current price data for the selected coin
+    with stage("load_data"):
+        coin_data = load_coin_data(selected_coin, api_key, selected_source, t)
+    df = coin_data["df"]
+    current_price_data = coin_data["current_price"]
+    data_version = coin_data["data_version"]
+    
+    # Error Handling: Stop if no data is found
+    if df.empty or not current_price_data:
+        # Do not keep a failed load around; the fetch caches skip failed results too, so the next rerun tries again
+        st.session_state.pop("coin_data", None)
+        st.error(t["load_error"].format(coin=selected_coin))
+        return
+    
+    if quote != USD:
+        with stage("denominate"):
+            coin_data = denominate_coin_data(coin_data, quote, api_key, selected_source)
+        if coin_data is None:
+            st.error(t["load_error"].format(coin=quote_symbol(quote)))
+            return
+        df = coin_data["df"]
+        current_price_data = coin_data["current_price"]
+        data_version = coin_data["data_version"]
+    
+    render_sidebar_footer(t)
+    
+    with stage(f"page:{page}"):
+        if page == "Dashboard":
+            render_dashboard(t, selected_coin, df, current_price_data, data_version, quote, api_key, selected_source)
+        elif page == "Cycle Analysis":
+            render_cycle_analysis(t, selected_coin, df, data_version, quote)
+        elif page == "Price Prediction":
+            render_price_prediction(t, selected_coin, df, data_version, quote)
+        elif page == "DCA Calculator":
+            render_dca_calculator(t, selected_coin, df, data_version, quote)
+
+profile_enabled = profiling_enabled()
+session = profile_session() if profile_enabled else None
+with profiling.run("rerun", enabled=profile_enabled, session=session) as profile:
+    with stage("sidebar"):
+        t, selected_coin, page, quote = render_sidebar()
+    if profile:
+        profile.name = page
+        profile.context["coin"] = selected_coin
+    render_page(t, selected_coin, page, quote)
+
+if profile_enabled:
+    render_profile_panel(session)
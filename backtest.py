@@ -0,0 +1,210 @@
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from cycles import get_cycle_data
+from prediction import project_cycle_multipliers
+
+# Forecast horizons (days after the as-of date) that every projection is scored at
+DEFAULT_HORIZONS = [30, 90, 180, 365]
+
+# Nominal quantile level of each fan chart band, used for the pinball loss
+BAND_QUANTILES = {
+    "min_price": 0.05,
+    "median_price": 0.5,
+    "max_price": 0.95
+}
+
+
+def _daily_prices(df):
+    """
+    Collapses a price DataFrame onto one observation per calendar day (last one wins).
+    """
+    prices = df["price"].dropna()
+    prices.index = prices.index.normalize()
+    prices = prices[~prices.index.duplicated(keep='last')]
+    return prices.sort_index()
+
+
+def pinball_loss(realized, predicted, quantile):
+    """
+    Quantile (pinball) loss of a predicted quantile against realized values.
+
+    Args:
+        realized (np.ndarray): Realized values.
+        predicted (np.ndarray): Predicted quantile values (same shape as realized).
+        quantile (float): Quantile level of the prediction, between 0 and 1.
+
+    Returns:
+        np.ndarray: Element-wise loss.
+    """
+    diff = realized - predicted
+    return np.maximum(quantile * diff, (quantile - 1) * diff)
+
+
+def walk_forward_backtest(df, horizons=DEFAULT_HORIZONS, step=1, start_date=None, end_date=None):
+    """
+    Replays the cycle projection model as of each past date and scores it against realized prices.
+
+    The shipped fan chart (generate_fan_chart_data) always projects cycle 4 from cycles 2 and 3. The
+    backtest adapts that method to a rolling window: an as-of date inside cycle N is projected from
+    the two preceding cycles (N-2, N-1) with the same project_cycle_multipliers helper, scaled to the
+    first price of cycle N. Both previous cycles ended before cycle N started, so the projection is
+    identical for every as-of date in the cycle; it is built once per cycle and all as-of dates ×
+    horizons are scored with vectorized array lookups. No data after the as-of date enters the
+    projection. For cycle 4 this is exactly the shipped projection.
+
+    Args:
+        df (pd.DataFrame): DataFrame with 'price' column and datetime index.
+        horizons (list): Days after the as-of date at which the realized price is scored.
+        step (int): Use every `step`-th trading day as an as-of date.
+        start_date (datetime, optional): First as-of date to replay.
+        end_date (datetime, optional): Last as-of date to replay.
+
+    Returns:
+        pd.DataFrame: One row per (as-of date, horizon) with columns:
+                      'as_of', 'horizon', 'target_date', 'cycle', 'realized',
+                      'min_price', 'median_price', 'max_price', 'covered',
+                      'pinball_loss' (mean over bands, on log10 prices) and 'log_error'.
+    """
+    if df.empty:
+        return pd.DataFrame()
+
+    prices = _daily_prices(df)
+    if prices.empty:
+        return pd.DataFrame()
+
+    cycles = get_cycle_data(df)
+    last_date = prices.index.max()
+    band_cols = list(BAND_QUANTILES.keys())
+    frames = []
+
+    for cycle_num, current_cycle in sorted(cycles.items()):
+        references = [cycle_num - 2, cycle_num - 1]
+        if not all(c in cycles for c in references):
+            continue
+
+        # Projection table for this cycle (days since halving x [min, median, max])
+        proj_df = project_cycle_multipliers(cycles, references)
+        start_price = current_cycle['data'].iloc[0]['price']
+        bands = proj_df[['min', 'median', 'max']].to_numpy() * start_price
+        halving = current_cycle['start_date']
+
+        # As-of dates: days inside this cycle on which the coin already traded
+        in_cycle = (prices.index >= current_cycle['actual_start_date']) & (prices.index < current_cycle['end_date'])
+        as_of = prices.index[in_cycle][::step]
+        if start_date is not None:
+            as_of = as_of[as_of >= pd.to_datetime(start_date)]
+        if end_date is not None:
+            as_of = as_of[as_of <= pd.to_datetime(end_date)]
+        if len(as_of) == 0:
+            continue
+
+        for horizon in horizons:
+            target = as_of + pd.Timedelta(days=horizon)
+            target_day = (target - halving).days.to_numpy()
+            realized = prices.reindex(target).to_numpy()
+
+            valid = (target_day < len(bands)) & (target <= last_date) & ~np.isnan(realized)
+            if not valid.any():
+                continue
+
+            band_values = bands[target_day[valid]]
+            frame = pd.DataFrame(band_values, columns=band_cols)
+            frame.insert(0, "as_of", as_of[valid])
+            frame.insert(1, "horizon", horizon)
+            frame.insert(2, "target_date", target[valid])
+            frame.insert(3, "cycle", cycle_num)
+            frame.insert(4, "realized", realized[valid])
+            frames.append(frame)
+
+    if not frames:
+        return pd.DataFrame()
+
+    results = pd.concat(frames, ignore_index=True)
+    results = results.dropna(subset=band_cols)
+
+    # Score on log prices so that losses are comparable across price levels and coins
+    log_realized = np.log10(results["realized"].to_numpy())
+    losses = [
+        pinball_loss(log_realized, np.log10(results[col].to_numpy()), q)
+        for col, q in BAND_QUANTILES.items()
+    ]
+    results["covered"] = (results["realized"] >= results["min_price"]) & (results["realized"] <= results["max_price"])
+    results["pinball_loss"] = np.mean(losses, axis=0)
+    results["log_error"] = log_realized - np.log10(results["median_price"].to_numpy())
+
+    return results.sort_values(["as_of", "horizon"]).reset_index(drop=True)
+
+
+def summarize_backtest(results):
+    """
+    Aggregates walk-forward rows into per-(coin, horizon) scores.
+
+    Args:
+        results (pd.DataFrame): Output of walk_forward_backtest, optionally with a 'coin' column.
+
+    Returns:
+        pd.DataFrame: Columns 'samples', 'coverage' (share of realized prices inside the min/max band),
+                      'pinball_loss' and 'median_abs_log_error'.
+    """
+    if results.empty:
+        return pd.DataFrame()
+
+    keys = ["coin", "horizon"] if "coin" in results.columns else ["horizon"]
+    grouped = results.groupby(keys)
+    summary = pd.DataFrame({
+        "samples": grouped.size(),
+        "coverage": grouped["covered"].mean(),
+        "pinball_loss": grouped["pinball_loss"].mean(),
+        "median_abs_log_error": grouped["log_error"].apply(lambda e: e.abs().median())
+    })
+    return summary.reset_index()
+
+
+def run_backtest(coin_names, horizons=DEFAULT_HORIZONS, step=1, api_key=None, source="Auto"):
+    """
+    Fetches each coin's history and runs the walk-forward backtest on it.
+
+    Returns:
+        pd.DataFrame: Concatenated walk-forward rows with a leading 'coin' column.
+    """
+    from utils import fetch_coin_history
+
+    frames = []
+    for coin_name in coin_names:
+        t0 = time.perf_counter()
+        df, source_used = fetch_coin_history(coin_name, api_key, source)
+        results = walk_forward_backtest(df, horizons=horizons, step=step)
+        print(f"{coin_name}: {len(results)} scored forecasts from {source_used} ({time.perf_counter() - t0:.2f}s)")
+        if not results.empty:
+            results.insert(0, "coin", coin_name)
+            frames.append(results)
+
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)
+
+
+if __name__ == "__main__":
+    from utils import COINS
+
+    parser = argparse.ArgumentParser(description="Walk-forward backtest of the cycle projection model.")
+    parser.add_argument("--coins", nargs="*", default=list(COINS.keys()), help="Coin names as listed in utils.COINS")
+    parser.add_argument("--horizons", default=",".join(str(h) for h in DEFAULT_HORIZONS), help="Comma-separated horizons in days")
+    parser.add_argument("--step", type=int, default=1, help="Replay every N-th day")
+    parser.add_argument("--output", default="backtest_results.csv", help="Where to write the per-forecast results table")
+    args = parser.parse_args()
+
+    horizons = [int(h) for h in args.horizons.split(",")]
+    results = run_backtest(args.coins, horizons=horizons, step=args.step)
+
+    if results.empty:
+        print("No coin had enough cycle history to backtest.")
+    else:
+        results.to_csv(args.output, index=False)
+        summary = summarize_backtest(results)
+        summary_file = args.output.replace(".csv", "_summary.csv")
+        summary.to_csv(summary_file, index=False)
+        print(f"Saved {len(results)} rows to {args.output} and summary to {summary_file}")
+        print(summary.to_string(index=False))
@@ -0,0 +1,185 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+from utils import load_local_history, merge_histories
+from cycles import get_cycle_data
+from prediction import generate_fan_chart_data
+from dca import calculate_dca
+
+REFERENCE_CSV = "btc_daily_data.csv"
+
+# Scale -> sampling interval. Every scale covers the same calendar span as the reference file, so
+# cycles and DCA schedules stay realistic; larger scales are intraday series with more rows per day.
+SCALES = {
+    1: "1D",
+    10: "144min",
+    100: "864s"
+}
+
+DCA_FREQUENCIES = ["Daily", "Weekly", "Monthly"]
+
+
+def synthetic_history(start, end, freq, seed=0):
+    """
+    Geometric random walk with a long-run uptrend, shaped like a crypto price history.
+
+    Returns:
+        pd.DataFrame: 'price' column indexed by datetime.
+    """
+    index = pd.date_range(start, end, freq=freq)
+    rng = np.random.default_rng(seed)
+    steps_per_day = pd.Timedelta(days=1) / pd.Timedelta(freq)
+    # ~4% daily volatility and ~+60% yearly drift, scaled to the sampling interval
+    returns = rng.normal(0.0013 / steps_per_day, 0.04 / np.sqrt(steps_per_day), len(index))
+    prices = 0.05 * np.exp(np.cumsum(returns))
+    return pd.DataFrame({"price": prices}, index=pd.DatetimeIndex(index, name="timestamp"))
+
+
+def build_datasets(scales):
+    """Builds one synthetic history per scale spanning the reference file's date range."""
+    reference = load_local_history(REFERENCE_CSV)
+    start, end = reference.index.min(), reference.index.max()
+    return {scale: synthetic_history(start, end, SCALES[scale], seed=scale) for scale in scales}
+
+
+def _merge_inputs(df):
+    # Overlapping slices like the real fallback sources: local (oldest), Yahoo (middle), Binance (newest)
+    n = len(df)
+    return df.iloc[:int(n * 0.4)], df.iloc[int(n * 0.2):int(n * 0.8)], df.iloc[int(n * 0.5):]
+
+
+def _cases(df, csv_path):
+    """Benchmark cases for one dataset: name -> zero-argument callable."""
+    cycles = get_cycle_data(df)
+    start_date = df.index[0] + (df.index[-1] - df.index[0]) / 2
+    local, yahoo, binance = _merge_inputs(df)
+
+    cases = {
+        "get_cycle_data": lambda: get_cycle_data(df),
+        "generate_fan_chart_data": lambda: generate_fan_chart_data(df, cycles),
+        "merge_histories": lambda: merge_histories(local, yahoo, binance),
+        "load_csv": lambda: load_local_history(csv_path)
+    }
+    for frequency in DCA_FREQUENCIES:
+        cases[f"calculate_dca[{frequency}]"] = lambda f=frequency: calculate_dca(df, 100, f, start_date, df.index[-1])
+    return cases
+
+
+def measure(func, repeats, min_time=0.2):
+    """
+    Times a callable and records its peak traced allocation.
+
+    Returns:
+        dict: best and median wall time over the runs (seconds), runs, and peak memory (MB).
+    """
+    func() # Warm-up (imports, caches)
+
+    timings = []
+    started = time.perf_counter()
+    while len(timings) < repeats or (time.perf_counter() - started < min_time and len(timings) < 100):
+        gc.collect()
+        t0 = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - t0)
+
+    # Memory is measured in a separate run: tracing slows the code down and would distort the timings
+    gc.collect()
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "best": min(timings),
+        "median": float(np.median(timings)),
+        "runs": len(timings),
+        "peak_mb": peak / 1024 / 1024
+    }
+
+
+def run_benchmarks(scales=(1, 10, 100), repeats=5, only=None):
+    """
+    Runs every case on every scale.
+
+    Args:
+        scales (tuple): Dataset scales (keys of SCALES).
+        repeats (int): Minimum timed runs per case.
+        only (list, optional): Case names to run (default: all).
+
+    Returns:
+        list: One result dict per (case, scale).
+    """
+    results = []
+    datasets = build_datasets(scales)
+    with tempfile.TemporaryDirectory() as tmp:
+        for scale, df in datasets.items():
+            csv_path = os.path.join(tmp, f"synthetic_{scale}x.csv")
+            df.to_csv(csv_path)
+            for name, func in _cases(df, csv_path).items():
+                if only and name not in only:
+                    continue
+                res = measure(func, repeats)
+                results.append({"case": name, "scale": scale, "rows": len(df), "freq": SCALES[scale], **res})
+                print(f"{name:<30}{scale:>5}x{len(df):>10,} rows{res['best'] * 1000:>12.2f} ms{res['peak_mb']:>10.1f} MB")
+    return results
+
+
+# Differences below these are treated as noise regardless of the relative threshold
+MIN_DELTA = {"best": 0.002, "peak_mb": 0.5}
+
+
+def compare(results, baseline, threshold=0.2):
+    """
+    Returns lines describing cases that got more than `threshold` (relative) slower or hungrier.
+    """
+    previous = {(r["case"], r["scale"]): r for r in baseline.get("results", [])}
+    regressions = []
+    for res in results:
+        base = previous.get((res["case"], res["scale"]))
+        if not base:
+            continue
+        for key, unit, factor in (("best", "ms", 1000), ("peak_mb", "MB", 1)):
+            if res[key] > base[key] * (1 + threshold) and res[key] - base[key] > MIN_DELTA[key]:
+                regressions.append(f"{res['case']} @ {res['scale']}x {key}: "
+                                   f"{base[key] * factor:.2f}{unit} -> {res[key] * factor:.2f}{unit}")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the analytics hot paths on synthetic 1x/10x/100x histories.")
+    parser.add_argument("--scales", default="1,10,100", help="Comma-separated scales (of %s)" % list(SCALES))
+    parser.add_argument("--repeats", type=int, default=5, help="Minimum timed runs per case")
+    parser.add_argument("--cases", nargs="*", help="Only run these cases")
+    parser.add_argument("--output", help="Write results as JSON")
+    parser.add_argument("--baseline", help="Compare against a previous --output file; exits 1 on regressions")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Relative slowdown reported as a regression")
+    args = parser.parse_args()
+
+    scales = [int(s) for s in args.scales.split(",")]
+    print(f"{'case':<30}{'scale':>6}{'rows':>15}{'best':>15}{'peak':>13}")
+    results = run_benchmarks(scales, args.repeats, args.cases)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({
+                "python": sys.version.split()[0],
+                "numpy": np.__version__,
+                "pandas": pd.__version__,
+                "machine": platform.machine(),
+                "results": results
+            }, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        sys.exit(1 if regressions else 0)
@@ -0,0 +1,270 @@
+import argparse
+import gc
+import hashlib
+import json
+import multiprocessing
+import os
+import random
+import resource
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+REFERENCE_CSV = os.path.join(os.path.dirname(APP_PATH), "btc_daily_data.csv")
+
+PAGES = ["Dashboard", "Cycle Analysis", "Price Prediction", "DCA Calculator"]
+DEFAULT_COINS = ["Bitcoin (BTC)", "Ethereum (ETH)", "Solana (SOL)"]
+
+# Relative weights of the simulated user actions
+ACTIONS = {
+    "switch_page": 4,
+    "switch_coin": 2,
+    "toggle_log_scale": 2,
+    "run_dca": 2
+}
+
+
+def install_stand_in(store_dir=None, latency=0.0):
+    """
+    Replaces the network fetches in utils with a local stand-in (call before the app is first run).
+
+    Histories come from the local store when a coin has been saved there (see generate_reports.py),
+    otherwise from the bundled BTC history scaled by a per-coin factor, so every coin still gets its
+    own data version and its own cache entries.
+
+    Args:
+        store_dir (str, optional): Local store directory (default: local_store.STORE_DIR).
+        latency (float): Seconds each fetch sleeps, to mimic upstream round trips.
+    """
+    import pandas as pd
+    import utils
+    from local_store import load_history
+
+    reference = pd.read_csv(REFERENCE_CSV, parse_dates=["timestamp"], index_col="timestamp")
+
+    def scale(coin_name):
+        return 1 + int(hashlib.md5(coin_name.encode("utf-8")).hexdigest()[:4], 16) / 65536
+
+    def fetch_coin_history(coin_name, api_key=None, source="Auto"):
+        time.sleep(latency)
+        df, meta = load_history(coin_name, store_dir=store_dir)
+        if meta:
+            return df, meta["source"]
+        return reference * scale(coin_name), "Local"
+
+    def fetch_current_price(coin_name, api_key=None):
+        time.sleep(latency)
+        return {"usd": float(reference["price"].iloc[-1] * scale(coin_name)), "usd_24h_change": 0.0}
+
+    utils.fetch_coin_history = fetch_coin_history
+    utils.fetch_current_price = fetch_current_price
+
+
+def _share_test_runtime():
+    """
+    Lets AppTest sessions run concurrently in one process.
+
+    AppTest installs a mock Runtime singleton at the start of every run and removes it at the end, so
+    one session finishing would pull the runtime from under the others. Keep serving the last one.
+    """
+    from streamlit.runtime.runtime import Runtime
+
+    last = []
+
+    def instance(cls):
+        if cls._instance is not None:
+            last[:] = [cls._instance]
+            return cls._instance
+        if last:
+            return last[0]
+        raise RuntimeError("Runtime hasn't been created!")
+
+    Runtime.instance = classmethod(instance)
+    Runtime.exists = classmethod(lambda cls: cls._instance is not None or bool(last))
+
+    # Every AppTest run compiles the script through its own ScriptCache, and concurrent compile()
+    # calls can fail on CPython 3.11 ("AST constructor recursion depth mismatch"); compile one at a time
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+
+    compile_lock = threading.Lock()
+    get_bytecode = ScriptCache.get_bytecode
+
+    def locked_get_bytecode(self, script_path):
+        with compile_lock:
+            return get_bytecode(self, script_path)
+
+    ScriptCache.get_bytecode = locked_get_bytecode
+
+
+def _rss_mb():
+    # Current resident set size; falls back to the peak where /proc is not available
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+    except OSError:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+def _session_bytes(at):
+    from cache import estimate_size
+    # Frames shared between sessions (e.g. a cached history) are counted in every session holding them
+    return estimate_size({key: at.session_state[key] for key in at.session_state.keys()})
+
+
+def _do(at, action, rng, coins):
+    """Performs one simulated user action on an AppTest session (without running it)."""
+    if action == "switch_page":
+        at.radio(key="current_page_canonical").set_value(rng.choice(PAGES))
+    elif action == "switch_coin":
+        at.selectbox(key="selected_coin").set_value(rng.choice(coins))
+    elif action == "toggle_log_scale":
+        if at.radio(key="current_page_canonical").value != "Cycle Analysis":
+            at.radio(key="current_page_canonical").set_value("Cycle Analysis").run()
+        scale = at.main.radio[0]
+        scale.set_value(scale.options[1] if scale.value == scale.options[0] else scale.options[0])
+    elif action == "run_dca":
+        if at.radio(key="current_page_canonical").value != "DCA Calculator":
+            at.radio(key="current_page_canonical").set_value("DCA Calculator").run()
+        at.button[0].click()
+
+
+def simulate_session(session_id, actions, coins, think_time, seed, results):
+    """Drives one AppTest session through a random flow, appending one record per rerun."""
+    from streamlit.testing.v1 import AppTest
+
+    rng = random.Random(seed * 1000 + session_id)
+    at = AppTest.from_file(APP_PATH, default_timeout=120)
+    started = time.perf_counter()
+    at.run()
+    results.append({"session": session_id, "action": "first_render", "seconds": time.perf_counter() - started,
+                    "errors": len(at.exception)})
+
+    names, weights = list(ACTIONS), list(ACTIONS.values())
+    for _ in range(actions):
+        time.sleep(think_time)
+        action = rng.choices(names, weights)[0]
+        try:
+            _do(at, action, rng, coins)
+            started = time.perf_counter()
+            at.run()
+        except Exception as e:
+            # AppTest is not built for concurrent sessions and occasionally loses a session's element
+            # tree; count it as an error and rerun from scratch instead of losing the whole session
+            print(f"session {session_id}: {action} failed: {e!r}")
+            results.append({"session": session_id, "action": "harness_error", "seconds": None, "errors": 1})
+            at = AppTest.from_file(APP_PATH, default_timeout=120)
+            at.run()
+            continue
+        results.append({"session": session_id, "action": action, "seconds": time.perf_counter() - started,
+                        "errors": len(at.exception)})
+    return at
+
+
+def run_level(sessions, actions=20, coins=DEFAULT_COINS, think_time=0.0, latency=0.0, store_dir=None, seed=0):
+    """
+    Runs `sessions` concurrent simulated sessions against one app process (this one).
+
+    Caches are warmed by a single session first, so the level measures steady-state serving rather
+    than the first fetch of each coin. Timings are AppTest reruns: script execution plus AppTest's
+    own bookkeeping, without the browser round trip.
+
+    Returns:
+        dict: Rerun latency percentiles (first renders reported separately), errors and memory.
+    """
+    install_stand_in(store_dir, latency)
+    _share_test_runtime()
+
+    warm = simulate_session(-1, 0, coins, 0.0, seed, [])
+    for coin in coins:
+        warm.selectbox(key="selected_coin").set_value(coin)
+        for page in PAGES:
+            warm.radio(key="current_page_canonical").set_value(page).run()
+    del warm
+    gc.collect()
+    rss_before = _rss_mb()
+
+    records, finished = [], []
+    threads = [
+        threading.Thread(target=lambda i=i: finished.append(simulate_session(i, actions, coins, think_time, seed, records)))
+        for i in range(sessions)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+
+    gc.collect()
+    rss_after = _rss_mb()
+    reruns = np.array([r["seconds"] for r in records if r["action"] not in ("first_render", "harness_error")])
+    first = np.array([r["seconds"] for r in records if r["action"] == "first_render"])
+    per_action = {}
+    for name in ACTIONS:
+        times = [r["seconds"] for r in records if r["action"] == name]
+        if times:
+            per_action[name] = {"count": len(times), "p50": float(np.percentile(times, 50)), "p95": float(np.percentile(times, 95))}
+
+    return {
+        "sessions": sessions,
+        "reruns": len(reruns),
+        "p50": float(np.percentile(reruns, 50)) if len(reruns) else None,
+        "p95": float(np.percentile(reruns, 95)) if len(reruns) else None,
+        "p99": float(np.percentile(reruns, 99)) if len(reruns) else None,
+        "max": float(reruns.max()) if len(reruns) else None,
+        "first_render_p50": float(np.percentile(first, 50)),
+        "throughput": len(reruns) / wall, # reruns per second served by the process
+        "errors": sum(r["errors"] for r in records),
+        "rss_mb": rss_after,
+        "mb_per_session": (rss_after - rss_before) / sessions,
+        "session_state_kb": float(np.mean([_session_bytes(at) for at in finished])) / 1024,
+        "per_action": per_action
+    }
+
+
+def run_levels(levels, **kwargs):
+    """Runs each concurrency level in a fresh process, so memory and caches start from the same point."""
+    results = []
+    for sessions in levels:
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+            res = pool.submit(run_level, sessions, **kwargs).result()
+        results.append(res)
+        print(f"{res['sessions']:>8}{res['reruns']:>8}{res['p50'] * 1000:>10.0f}{res['p95'] * 1000:>10.0f}"
+              f"{res['p99'] * 1000:>10.0f}{res['throughput']:>10.1f}{res['errors']:>8}"
+              f"{res['mb_per_session']:>12.1f}{res['session_state_kb']:>12.0f}")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulate concurrent app sessions against one app.py process.")
+    parser.add_argument("--sessions", default="1,2,4,8,16", help="Comma-separated concurrency levels")
+    parser.add_argument("--actions", type=int, default=20, help="Actions (reruns) per session")
+    parser.add_argument("--coins", nargs="*", default=DEFAULT_COINS, help="Coins the sessions switch between")
+    parser.add_argument("--think", type=float, default=0.0, help="Seconds a session waits between actions")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds each stand-in fetch sleeps")
+    parser.add_argument("--store", help="Local store directory to serve histories from")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write results as JSON")
+    args = parser.parse_args()
+
+    if args.actions < 1:
+        parser.error("--actions must be at least 1")
+    from utils import COINS
+    unknown = [c for c in args.coins if c not in COINS]
+    if unknown:
+        parser.error(f"unknown coins: {', '.join(unknown)}")
+
+    levels = [int(s) for s in args.sessions.split(",")]
+    print(f"{'sessions':>8}{'reruns':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'rerun/s':>10}{'errors':>8}"
+          f"{'MB/session':>12}{'state KB':>12}")
+    results = run_levels(levels, actions=args.actions, coins=args.coins, think_time=args.think,
+                         latency=args.latency, store_dir=args.store, seed=args.seed)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"python": sys.version.split()[0], "actions": args.actions, "coins": args.coins,
+                       "think": args.think, "latency": args.latency, "results": results}, f, indent=2)
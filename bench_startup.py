@@ -0,0 +1,131 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+# Every measurement runs in a fresh interpreter so module caches don't hide import costs
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+
+IMPORT_TARGETS = ["utils", "cycles", "dca", "prediction", "charts", "downsample", "api_server", "generate_reports"]
+
+# Modules the analytics/CLI layer should not pull in
+HEAVY_MODULES = ["streamlit", "yfinance", "plotly.express"]
+
+IMPORT_SNIPPET = """
+import sys, time, json
+t0 = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - t0
+print(json.dumps({{"seconds": elapsed, "heavy": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+RENDER_SNIPPET = """
+import sys, time, json
+t0 = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+if {offline!r}:
+    import pandas as pd, utils
+    def _local_history(coin_name, api_key=None, source="Auto"):
+        df = pd.read_csv("btc_daily_data.csv", parse_dates=["timestamp"], index_col="timestamp")
+        return df, "Local"
+    utils.fetch_coin_history = _local_history
+    utils.fetch_current_price = lambda coin_name, api_key=None: {{"usd": 70000.0, "usd_24h_change": 0.0}}
+t_import = time.perf_counter() - t0
+at = AppTest.from_file({app!r}, default_timeout=120)
+t1 = time.perf_counter()
+at.run()
+t_first = time.perf_counter() - t1
+t2 = time.perf_counter()
+at.run()
+t_rerun = time.perf_counter() - t2
+print(json.dumps({{"harness_import": t_import, "first_render": t_first, "rerun": t_rerun,
+                   "exceptions": [str(e.value) for e in at.exception]}}))
+"""
+
+
+def _run_snippet(code):
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                            cwd=os.path.dirname(APP_PATH))
+    lines = result.stdout.strip().splitlines()
+    if result.returncode != 0 or not lines:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "no output")
+    return json.loads(lines[-1])
+
+
+def measure_imports(modules, repeats=5):
+    """
+    Measures cold import time of each module (best of `repeats` fresh interpreters).
+
+    Returns:
+        dict: module -> {'seconds', 'heavy'} where 'heavy' lists HEAVY_MODULES loaded as a side effect.
+    """
+    results = {}
+    for module in modules:
+        runs = [_run_snippet(IMPORT_SNIPPET.format(module=module, heavy=HEAVY_MODULES)) for _ in range(repeats)]
+        results[module] = {"seconds": min(r["seconds"] for r in runs), "heavy": runs[0]["heavy"]}
+    return results
+
+
+def measure_first_render(offline=True, repeats=3):
+    """
+    Measures the first render (cold process, empty caches) and a warm rerun of app.py via AppTest.
+
+    With offline=True the fetch functions read the bundled BTC CSV, so the timing covers imports and
+    rendering rather than upstream API latency.
+    """
+    runs = [_run_snippet(RENDER_SNIPPET.format(app=APP_PATH, offline=offline)) for _ in range(repeats)]
+    best = min(runs, key=lambda r: r["first_render"])
+    return {
+        "first_render": best["first_render"],
+        "rerun": min(r["rerun"] for r in runs),
+        "exceptions": best["exceptions"]
+    }
+
+
+def compare(current, baseline, threshold=0.2):
+    """Returns lines describing timings that got more than `threshold` (relative) slower."""
+    regressions = []
+    for module, res in current["imports"].items():
+        base = baseline.get("imports", {}).get(module)
+        if base and res["seconds"] > base["seconds"] * (1 + threshold):
+            regressions.append(f"import {module}: {base['seconds']:.3f}s -> {res['seconds']:.3f}s")
+    base_render = baseline.get("render")
+    if base_render and current.get("render"):
+        for key in ("first_render", "rerun"):
+            if current["render"][key] > base_render[key] * (1 + threshold):
+                regressions.append(f"{key}: {base_render[key]:.3f}s -> {current['render'][key]:.3f}s")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure cold import and first-render time of the app and CLI modules.")
+    parser.add_argument("--repeats", type=int, default=5, help="Fresh interpreters per import measurement")
+    parser.add_argument("--skip-render", action="store_true", help="Only measure imports")
+    parser.add_argument("--online", action="store_true", help="Let the first render fetch from the live APIs")
+    parser.add_argument("--output", help="Write results as JSON")
+    parser.add_argument("--baseline", help="Compare against a previous --output file; exits 1 on regressions")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Relative slowdown reported as a regression")
+    args = parser.parse_args()
+
+    results = {"python": sys.version.split()[0], "imports": measure_imports(IMPORT_TARGETS, args.repeats)}
+    print(f"{'module':<20}{'import (s)':>12}  heavy modules loaded")
+    for module, res in results["imports"].items():
+        print(f"{module:<20}{res['seconds']:>12.3f}  {', '.join(res['heavy']) or '-'}")
+
+    if not args.skip_render:
+        results["render"] = measure_first_render(offline=not args.online)
+        print(f"\napp.py first render: {results['render']['first_render']:.3f}s, rerun: {results['render']['rerun']:.3f}s")
+        for exc in results["render"]["exceptions"]:
+            print(f"  exception: {exc}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        sys.exit(1 if regressions else 0)
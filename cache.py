@@ -0,0 +1,183 @@
+import functools
+import inspect
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+
+# Default budget of the process-wide data cache (MB)
+DEFAULT_CACHE_MB = int(os.environ.get("CCA_CACHE_MB", "256"))
+
+
+def estimate_size(obj, _seen=None):
+    """
+    Approximate memory held by an object, in bytes.
+
+    DataFrames, Series and arrays report their buffers (deep, including object columns); containers
+    are walked recursively, counting each object once.
+    """
+    if _seen is None:
+        _seen = set()
+    if id(obj) in _seen:
+        return 0
+    _seen.add(id(obj))
+
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(index=True, deep=True).sum())
+    if isinstance(obj, (pd.Series, pd.Index)):
+        return int(obj.memory_usage(deep=True))
+    if isinstance(obj, np.ndarray):
+        return int(obj.nbytes)
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(estimate_size(k, _seen) + estimate_size(v, _seen) for k, v in obj.items())
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return sys.getsizeof(obj) + sum(estimate_size(item, _seen) for item in obj)
+    return sys.getsizeof(obj)
+
+
+class ByteLRUCache:
+    """
+    Thread-safe LRU cache bounded by the estimated size of its values rather than their count.
+
+    Entries may carry a TTL. Inserting past the byte budget evicts least recently used entries;
+    values larger than the whole budget are not stored.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = int(max_bytes)
+        self._entries = OrderedDict() # key -> (value, size, expires_at)
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            value, size, expires_at = entry
+            if expires_at is not None and time.time() >= expires_at:
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value, ttl=None, size=None):
+        size = estimate_size(value) if size is None else size
+        if size > self.max_bytes:
+            return False
+        expires_at = time.time() + ttl if ttl is not None else None
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, size, expires_at)
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+        return True
+
+    def _remove(self, key):
+        _, size, _ = self._entries.pop(key)
+        self.current_bytes -= size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        """
+        Returns:
+            dict: entries, bytes, max_bytes, hits, misses, evictions, expirations and hit_rate.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
+
+    def usage_by_function(self):
+        """Bytes and entry count per cached function (for keys created by the cached() decorator)."""
+        usage = {}
+        with self._lock:
+            for key, (_, size, _) in self._entries.items():
+                name = key[0] if isinstance(key, tuple) and key and isinstance(key[0], str) else "other"
+                entries, total = usage.get(name, (0, 0))
+                usage[name] = (entries + 1, total + size)
+        return {name: {"entries": n, "bytes": b} for name, (n, b) in usage.items()}
+
+
+def _freeze(value):
+    # Make argument values usable as dict keys (lists, dicts and sets from widgets are not hashable)
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (set, frozenset)):
+        return tuple(sorted(_freeze(v) for v in value))
+    return value
+
+
+def cached(cache, ttl=None, keep=None):
+    """
+    Memoizes a function in a ByteLRUCache.
+
+    Like st.cache_data, parameters whose name starts with an underscore are not part of the key
+    (pass large inputs that way together with a version argument that identifies them). Unlike
+    st.cache_data the cached object itself is returned, not a copy, so callers must not modify it.
+
+    Args:
+        cache (ByteLRUCache): Cache to store results in.
+        ttl (float, optional): Seconds a result stays valid.
+        keep (callable, optional): Called with each fresh result; results it rejects (e.g. a failed
+                                   fetch) are returned but not cached, so the next call tries again.
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+        name = f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = (name,) + tuple((arg, _freeze(value)) for arg, value in bound.arguments.items() if not arg.startswith("_"))
+
+            sentinel = wrapper # Distinguishes a miss from a cached None
+            result = cache.get(key, sentinel)
+            if result is sentinel:
+                result = func(*args, **kwargs)
+                if keep is None or keep(result):
+                    cache.put(key, result, ttl=ttl)
+            return result
+
+        wrapper.cache = cache
+        return wrapper
+    return decorator
+
+
+# Process-wide cache for fetched histories and derived data (cycles, projections, DCA results).
+# Lives in this module so it survives Streamlit script reruns.
+DATA_CACHE = ByteLRUCache(DEFAULT_CACHE_MB * 1024 * 1024)
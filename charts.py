@@ -0,0 +1,356 @@
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from cycles import HALVING_DATES
+from denomination import USD
+
+# Figure builders return language-neutral figure specs (plain dicts) so they can be cached and shared
+# across languages; translated titles and legend names are applied afterwards with apply_labels().
+
+
+# Indicator lines on the full history chart; traces are named by these keys (see apply_labels)
+INDICATOR_COLORS = {
+    "ma200w": "#8e44ad",
+    "ma111": "#27ae60",
+    "ma350x2": "#c0392b"
+}
+
+
+def full_history_spec(plot_df, price_min, price_max, min_date, use_log, indicator_lines=None, pi_tops=None):
+    """
+    Builds the full price history chart with BTC halving markers and optional indicator overlays.
+
+    Args:
+        plot_df (pd.DataFrame): (Downsampled) 'price' column indexed by date.
+        price_min (float): Lowest price of the full history (for the y range and annotations).
+        price_max (float): Highest price of the full history.
+        min_date (pd.Timestamp): First date of the full history.
+        use_log (bool): Log scale y-axis.
+        indicator_lines (dict, optional): Key of INDICATOR_COLORS -> (downsampled) series indexed by date.
+        pi_tops (pd.Series, optional): Price on each Pi Cycle top signal day, drawn as markers.
+
+    Returns:
+        dict: Figure spec without title. Indicator traces are named by their key ('pi_top' for the markers).
+    """
+    import plotly.express as px # Deferred: express pulls in a lot of modules and is only needed here
+    fig = px.line(plot_df, x=plot_df.index, y="price", log_y=use_log)
+
+    # Add vertical lines for halvings
+    # Only show halvings that are within or slightly before the data range to avoid huge empty spaces
+    # Buffer: Allow halving lines 1 year before data starts to show context, but not 10 years
+    buffer_date = min_date - pd.Timedelta(days=365)
+
+    for cycle_num, date_str in HALVING_DATES.items():
+        h_date = pd.to_datetime(date_str)
+        if h_date >= buffer_date:
+            fig.add_vline(x=h_date, line_width=1, line_dash="dash", line_color="orange")
+            # Only add text if it's within the visible range or close to it
+            if h_date >= min_date:
+                fig.add_annotation(x=h_date, y=price_min, text=f"BTC Halving {cycle_num}", showarrow=False, textangle=-90)
+
+    # Adjust Y-axis range to fit data tightly (User Request)
+    if use_log:
+        # Log scale range (log10 units)
+        # Add slight padding (e.g. 5% of the log range)
+        range_min = np.log10(price_min)
+        range_max = np.log10(price_max)
+        log_padding = (range_max - range_min) * 0.05
+        fig.update_layout(yaxis_range=[range_min - log_padding, range_max + log_padding])
+    else:
+        # Linear scale range
+        # Add 5% padding
+        padding = (price_max - price_min) * 0.05
+        fig.update_layout(yaxis_range=[price_min - padding, price_max + padding])
+
+    for name, series in (indicator_lines or {}).items():
+        fig.add_trace(go.Scatter(x=series.index, y=series.values, mode="lines", name=name,
+                                 line=dict(color=INDICATOR_COLORS[name], width=1.5)))
+    if pi_tops is not None and len(pi_tops):
+        fig.add_trace(go.Scatter(x=pi_tops.index, y=pi_tops.values, mode="markers", name="pi_top",
+                                 marker=dict(symbol="triangle-down", size=11, color="red")))
+    if indicator_lines or (pi_tops is not None and len(pi_tops)):
+        fig.update_traces(selector=0, showlegend=True, name="price")
+        fig.update_layout(legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="left", x=0))
+
+    fig.update_layout(yaxis_tickprefix="$", dragmode="pan")
+    return fig.to_dict()
+
+
+def mayer_spec(mayer, low, high):
+    """
+    Builds the Mayer multiple chart with its undervalued / overheated levels.
+
+    Args:
+        mayer (pd.Series): (Downsampled) Mayer multiple indexed by date.
+        low (float): Level below which the price is usually read as undervalued.
+        high (float): Level above which the price is usually read as overheated.
+
+    Returns:
+        dict: Figure spec without title.
+    """
+    fig = go.Figure(go.Scatter(x=mayer.index, y=mayer.values, mode="lines", line=dict(color="#2c3e50", width=1.5)))
+    fig.add_hline(y=low, line_width=1, line_dash="dash", line_color="green")
+    fig.add_hline(y=high, line_width=1, line_dash="dash", line_color="red")
+    fig.update_layout(yaxis_type="log", yaxis_ticksuffix="x", height=300, margin=dict(t=40, b=20), dragmode="pan")
+    return fig.to_dict()
+
+
+# Rainbow bands of the power-law chart, cheapest first (see power_law.BAND_EDGES)
+RAINBOW_COLORS = ["#2c7bb6", "#00a6ca", "#00ccbc", "#90eb9d", "#ffff8c", "#f9d057", "#f29e2e", "#d7191c"]
+
+
+def power_law_spec(plot_df, bands, quote=USD):
+    """
+    Builds the power-law rainbow chart: price over the fitted line and its residual bands.
+
+    Args:
+        plot_df (pd.DataFrame): (Downsampled) 'price' column indexed by date.
+        bands (pd.DataFrame): (Thinned) power_law.band_prices frame, which may run past the last price.
+        quote (str): Quote the prices are in; only USD axes get a '$' tick prefix.
+
+    Returns:
+        dict: Figure spec without title. The line and price traces are named 'fair_value' and 'price'.
+    """
+    fig = go.Figure()
+    edges = [column for column in bands.columns if column.startswith("edge_")]
+    for i, column in enumerate(edges):
+        # Each edge fills down to the previous one, so band i lies between edge i and edge i + 1
+        fig.add_trace(go.Scatter(
+            x=bands.index, y=bands[column], mode="lines", line=dict(width=0),
+            fill="tonexty" if i else None, fillcolor=RAINBOW_COLORS[i - 1] if i else None,
+            opacity=0.5, showlegend=False, hoverinfo="skip"
+        ))
+    fig.add_trace(go.Scatter(x=bands.index, y=bands["fair_value"], mode="lines", name="fair_value",
+                             line=dict(color="#555555", width=1, dash="dash")))
+    fig.add_trace(go.Scatter(x=plot_df.index, y=plot_df["price"], mode="lines", name="price",
+                             line=dict(color="#111111", width=1.5)))
+    fig.update_layout(yaxis_type="log", yaxis_tickprefix="$" if quote == USD else "", height=450, margin=dict(t=40, b=20), dragmode="pan",
+                      legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1))
+    return fig.to_dict()
+
+
+def overlay_spec(overlay_traces, cycles):
+    """
+    Builds the cycle overlay chart (price vs days since halving, one trace per cycle).
+
+    Args:
+        overlay_traces (dict): Cycle number -> (downsampled) price series indexed by days since halving.
+        cycles (dict): Processed cycle data from cycles.py (for the cycle start years).
+
+    Returns:
+        dict: Figure spec without title.
+    """
+    fig = go.Figure()
+
+    colors = {0: "purple", 1: "gray", 2: "blue", 3: "green", 4: "red"}
+
+    for cycle_num, data in cycles.items():
+        # Use absolute prices instead of normalized
+        if cycle_num in overlay_traces:
+            trace = overlay_traces[cycle_num]
+
+            fig.add_trace(go.Scatter(
+                x=trace.index,
+                y=trace.values,
+                mode='lines',
+                name=f"Cycle {cycle_num} ({data['start_date'].year})",
+                line=dict(color=colors.get(cycle_num, "black"), width=2 if cycle_num == 4 else 1)
+            ))
+
+    fig.update_layout(
+        xaxis_title="Days Since Halving",
+        yaxis_title="Price (USD)",
+        yaxis_type="log",
+        hovermode="x unified",
+        dragmode="pan"
+    )
+    return fig.to_dict()
+
+
+# Trace positions in fan_spec, used to apply translated legend names
+FAN_TRACE_ACTUAL = 0
+FAN_TRACE_MEDIAN = 2
+FAN_TRACE_RANGE = 3
+
+
+def fan_spec(current_cycle_df, fan_data):
+    """
+    Builds the fan chart: actual price of the current cycle plus the projected median and min/max range.
+
+    Args:
+        current_cycle_df (pd.DataFrame): Current cycle prices ('price' column indexed by date).
+        fan_data (pd.DataFrame): Output of prediction.generate_fan_chart_data.
+
+    Returns:
+        dict: Figure spec without title and legend names.
+    """
+    fig = go.Figure()
+
+    # Historical Data (Current Cycle)
+    fig.add_trace(go.Scatter(
+        x=current_cycle_df.index,
+        y=current_cycle_df['price'],
+        mode='lines',
+        line=dict(color='#007bff', width=3)
+    ))
+
+    # Fan Chart Areas
+    # 1. Max to Median (Upper zone)
+    fig.add_trace(go.Scatter(
+        x=fan_data.index,
+        y=fan_data['max_price'],
+        mode='lines',
+        line=dict(width=0),
+        showlegend=False
+    ))
+
+    fig.add_trace(go.Scatter(
+        x=fan_data.index,
+        y=fan_data['median_price'],
+        mode='lines',
+        fill='tonexty',
+        fillcolor='rgba(0, 255, 0, 0.1)',
+        line=dict(color='green', dash='dash')
+    ))
+
+    # 2. Median to Min (Lower zone)
+    fig.add_trace(go.Scatter(
+        x=fan_data.index,
+        y=fan_data['min_price'],
+        mode='lines',
+        fill='tonexty',
+        fillcolor='rgba(255, 0, 0, 0.1)',
+        line=dict(width=0)
+    ))
+
+    fig.update_layout(
+        xaxis_title="Date",
+        yaxis_title="Price (USD)",
+        yaxis_type="log",
+        hovermode="x unified",
+        dragmode="pan"
+    )
+    return fig.to_dict()
+
+
+def comparison_spec(normalized, log_scale=True):
+    """
+    Builds the multi-coin comparison chart: one trace per coin, normalized to 1.0 at its anchor.
+
+    Args:
+        normalized (pd.DataFrame): (Downsampled) output of comparison.normalize_prices; NaNs are skipped.
+        log_scale (bool): Log scale y-axis.
+
+    Returns:
+        dict: Figure spec without title and axis titles.
+    """
+    fig = go.Figure()
+
+    for coin_name in normalized.columns:
+        trace = normalized[coin_name].dropna()
+        fig.add_trace(go.Scatter(
+            x=trace.index,
+            y=trace.values,
+            mode='lines',
+            name=coin_name,
+            line=dict(width=1.5)
+        ))
+
+    # Anchor level
+    fig.add_hline(y=1.0, line_width=1, line_dash="dot", line_color="gray")
+    fig.update_layout(
+        yaxis_type="log" if log_scale else "linear",
+        yaxis_ticksuffix="x",
+        hovermode="x unified",
+        dragmode="pan"
+    )
+    return fig.to_dict()
+
+
+def correlation_series_spec(series, measure="corr"):
+    """
+    Builds the rolling correlation / beta chart: one trace per coin against the reference, with BTC halvings.
+
+    Args:
+        series (pd.DataFrame): (Downsampled) date x coin output of correlation.pair_series.
+        measure (str): 'corr' (y fixed to -1..1) or 'beta' (reference line at 1).
+
+    Returns:
+        dict: Figure spec without title and axis titles.
+    """
+    fig = go.Figure()
+    for coin_name in series.columns:
+        trace = series[coin_name].dropna()
+        fig.add_trace(go.Scatter(x=trace.index, y=trace.values, mode="lines", name=coin_name, line=dict(width=1.2)))
+
+    for date_str in HALVING_DATES.values():
+        h_date = pd.to_datetime(date_str)
+        if series.index.min() <= h_date <= series.index.max():
+            fig.add_vline(x=h_date, line_width=1, line_dash="dash", line_color="orange")
+    fig.add_hline(y=1.0 if measure == "beta" else 0.0, line_width=1, line_dash="dot", line_color="gray")
+    fig.update_layout(hovermode="x unified", dragmode="pan", yaxis_range=[-1, 1] if measure == "corr" else None)
+    return fig.to_dict()
+
+
+def correlation_heatmap_spec(matrix, measure="corr"):
+    """
+    Builds the coin x coin heatmap of one day of a correlation tensor.
+
+    Args:
+        matrix (pd.DataFrame): Output of correlation.snapshot (rows: coin, columns: against coin).
+        measure (str): 'corr' (color scale fixed to -1..1) or 'beta' (centered on 1).
+
+    Returns:
+        dict: Figure spec without title.
+    """
+    values = matrix.to_numpy(dtype=np.float64)
+    fig = go.Figure(go.Heatmap(
+        x=list(matrix.columns),
+        y=list(matrix.index),
+        z=values,
+        text=np.where(np.isnan(values), "", np.vectorize(lambda v: f"{v:.2f}")(values)),
+        texttemplate="%{text}",
+        colorscale="RdBu_r",
+        zmid=1.0 if measure == "beta" else 0.0,
+        zmin=-1.0 if measure == "corr" else None,
+        zmax=1.0 if measure == "corr" else None
+    ))
+    fig.update_layout(yaxis_autorange="reversed", height=max(300, 40 * len(matrix) + 120), margin=dict(t=40, b=20))
+    return fig.to_dict()
+
+
+def apply_labels(spec, title=None, trace_names=None, x_title=None, y_title=None, y_tickprefix=None):
+    """
+    Applies language-dependent labels to a figure spec in place.
+
+    Args:
+        spec (dict): Figure spec from one of the builders above.
+        title (str, optional): Chart title.
+        trace_names (dict, optional): Trace position -> legend name.
+        x_title (str, optional): X-axis title.
+        y_title (str, optional): Y-axis title.
+        y_tickprefix (str, optional): Y-axis tick prefix (e.g. '' to drop the '$' of a non-USD chart).
+
+    Returns:
+        dict: The same spec, for chaining.
+    """
+    if title is not None:
+        spec.setdefault("layout", {})["title"] = {"text": title}
+    for position, name in (trace_names or {}).items():
+        spec["data"][position]["name"] = name
+    for axis, axis_title in (("xaxis", x_title), ("yaxis", y_title)):
+        if axis_title is not None:
+            spec.setdefault("layout", {}).setdefault(axis, {})["title"] = {"text": axis_title}
+    if y_tickprefix is not None:
+        spec.setdefault("layout", {}).setdefault("yaxis", {})["tickprefix"] = y_tickprefix
+    return spec
+
+
+def to_figure(spec):
+    """
+    Wraps a cached spec in a go.Figure for st.plotly_chart.
+
+    The spec came out of a validated go.Figure, so plotly's validation is skipped; validating it
+    again (which st.plotly_chart does for plain dicts) costs about as much as rebuilding the figure.
+    """
+    return go.Figure(spec, _validate=False)
@@ -0,0 +1,112 @@
+import numpy as np
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from utils import fetch_coin_history
+from cycles import HALVING_DATES
+from portfolio import align_prices
+
+# Anchors a comparison can be normalized to
+ANCHORS = ("halving", "listing", "date")
+
+
+def fetch_price_matrix(coin_names, api_key=None, source="Auto", fetch=fetch_coin_history, max_workers=8):
+    """
+    Fetches several coins concurrently into one date x coin price matrix.
+
+    Args:
+        coin_names (list): Coin names as listed in COINS.
+        api_key (str, optional): CoinGecko API key.
+        source (str): Data source passed to the fetch function.
+        fetch (callable): Fetch function with the signature of utils.fetch_coin_history.
+        max_workers (int): Concurrent fetches.
+
+    Returns:
+        tuple: (Date x coin price DataFrame from portfolio.align_prices, dict of coin -> source used).
+               Coins that could not be fetched are left out.
+    """
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(coin_names)))) as pool:
+        fetched = list(pool.map(lambda coin: fetch(coin, api_key, source), coin_names))
+
+    histories = {coin: df for coin, (df, _) in zip(coin_names, fetched) if not df.empty}
+    sources = {coin: source_used for coin, (df, source_used) in zip(coin_names, fetched) if not df.empty}
+    return align_prices(histories), sources
+
+
+def matrix_version(prices):
+    """Short fingerprint of a price matrix (the multi-coin counterpart of utils.get_data_version)."""
+    if prices.empty:
+        return "empty"
+    digest = pd.util.hash_pandas_object(prices, index=True).to_numpy().sum()
+    return f"{prices.shape[0]}x{prices.shape[1]}-{int(digest) & 0xFFFFFFFFFFFF:012x}"
+
+
+def anchor_positions(prices, anchor="halving", anchor_date=None):
+    """
+    Row position of each coin's anchor in the price matrix.
+
+    'listing' anchors every coin on its first price. 'halving' and 'date' anchor on anchor_date (for
+    'halving' it defaults to the latest halving); coins listed after that date are anchored on their
+    listing day instead.
+
+    Returns:
+        np.ndarray: One row position per column (-1 for columns without any price).
+    """
+    if anchor not in ANCHORS:
+        raise ValueError(f"anchor must be one of {ANCHORS}")
+
+    values = prices.to_numpy(dtype=np.float64)
+    has_price = ~np.isnan(values)
+    first_valid = np.where(has_price.any(axis=0), has_price.argmax(axis=0), -1)
+
+    if anchor == "listing":
+        return first_valid
+
+    if anchor_date is None:
+        if anchor == "date":
+            raise ValueError("anchor_date is required for the 'date' anchor")
+        anchor_date = HALVING_DATES[max(HALVING_DATES)]
+    anchor_row = int(prices.index.searchsorted(pd.to_datetime(anchor_date)))
+
+    positions = np.maximum(first_valid, anchor_row)
+    positions[(first_valid < 0) | (positions >= len(prices))] = -1
+    return positions
+
+
+def normalize_prices(prices, anchor="halving", anchor_date=None, axis="calendar"):
+    """
+    Normalizes every coin in a price matrix to its price on the anchor day (anchor = 1.0).
+
+    All coins are handled as one array, so the cost hardly depends on how many are compared.
+
+    Args:
+        prices (pd.DataFrame): Date x coin price matrix (see fetch_price_matrix).
+        anchor (str): 'halving', 'listing' or 'date'.
+        anchor_date (datetime, optional): Halving date or chosen date (see anchor_positions).
+        axis (str): 'calendar' keeps the date index; 'days' re-indexes every coin by days since its anchor.
+
+    Returns:
+        tuple: (Normalized DataFrame, pd.Series of anchor date per coin). Coins without a valid anchor are dropped.
+    """
+    positions = anchor_positions(prices, anchor, anchor_date)
+    keep = positions >= 0
+    prices = prices.loc[:, keep]
+    positions = positions[keep]
+    if prices.empty:
+        return pd.DataFrame(), pd.Series(dtype="datetime64[ns]")
+
+    values = prices.to_numpy(dtype=np.float64)
+    columns = np.arange(values.shape[1])
+    normalized = values / values[positions, columns]
+    anchor_dates = pd.Series(prices.index[positions], index=prices.columns)
+
+    if axis == "days":
+        # Gather row (anchor + offset) of every column at once; rows past the end stay NaN
+        offsets = np.arange(len(prices) - positions.min())
+        rows = positions[None, :] + offsets[:, None]
+        inside = rows < len(prices)
+        shifted = np.full(rows.shape, np.nan)
+        shifted[inside] = normalized[rows[inside], np.broadcast_to(columns, rows.shape)[inside]]
+        result = pd.DataFrame(shifted, index=pd.Index(offsets, name="days_since_anchor"), columns=prices.columns)
+        return result.dropna(how="all"), anchor_dates
+
+    return pd.DataFrame(normalized, index=prices.index, columns=prices.columns), anchor_dates
@@ -0,0 +1,121 @@
+import numpy as np
+import pandas as pd
+from cycles import HALVING_DATES
+
+# Rolling windows offered, in days of returns
+WINDOWS = (30, 90, 365)
+
+# Coin the others are compared to by default
+REFERENCE = "Bitcoin (BTC)"
+
+# Measures in a correlation tensor
+MEASURES = ("corr", "beta")
+
+
+def log_returns(prices):
+    """
+    Daily log returns of every column of a price matrix.
+
+    Returns:
+        pd.DataFrame: Log returns indexed by date (first day dropped); NaN where a coin has no price.
+    """
+    values = prices.to_numpy(dtype=np.float64)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        logs = np.log(np.where(values > 0, values, np.nan))
+    return pd.DataFrame(np.diff(logs, axis=0), index=prices.index[1:], columns=prices.columns)
+
+
+def _window_sums(terms, window):
+    # Trailing-window sums along the date axis from one cumulative sum (shorter windows at the start)
+    cumsum = np.concatenate((np.zeros((1,) + terms.shape[1:]), np.cumsum(terms, axis=0)))
+    ends = np.arange(1, len(terms) + 1)
+    return cumsum[ends] - cumsum[np.maximum(ends - window, 0)]
+
+
+def rolling_pair_stats(prices, window, min_periods=None):
+    """
+    Rolling correlation and beta of daily log returns for every pair of coins.
+
+    Every pair comes from cumulative sums of the returns, their squares and their pairwise products
+    (counted only on days both coins have a return), so each window costs two lookups instead of a
+    pass over its days.
+
+    Args:
+        prices (pd.DataFrame): Date x coin price matrix (see portfolio.align_prices).
+        window (int): Window length in days of returns.
+        min_periods (int, optional): Days both coins need in a window (default: the whole window).
+
+    Returns:
+        dict: 'dates' (pd.DatetimeIndex), 'coins' (list) and, per measure, a (date, coin, coin)
+              float32 tensor: 'corr'[t, i, j] is the correlation of coins i and j, 'beta'[t, i, j]
+              the beta of coin i against coin j (cov(i, j) / var(j)). NaN where a window is too short.
+    """
+    returns = log_returns(prices)
+    r = returns.to_numpy()
+    valid = ~np.isnan(r)
+    r = np.where(valid, r, 0.0)
+    both = (valid[:, :, None] & valid[:, None, :]).astype(np.float64)
+
+    n = _window_sums(both, window)
+    # Sums of coin i's returns (and squares) over the days coin j also has one
+    sum_i = _window_sums(r[:, :, None] * both, window)
+    sum_ii = _window_sums((r * r)[:, :, None] * both, window)
+    sum_ij = _window_sums(r[:, :, None] * r[:, None, :], window)
+    sum_j = sum_i.transpose(0, 2, 1)
+    sum_jj = sum_ii.transpose(0, 2, 1)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = sum_ij - sum_i * sum_j / n
+        var_i = np.maximum(sum_ii - sum_i * sum_i / n, 0.0)
+        var_j = np.maximum(sum_jj - sum_j * sum_j / n, 0.0)
+        corr = np.clip(cov / np.sqrt(var_i * var_j), -1.0, 1.0)
+        beta = cov / var_j
+
+    short = n < (window if min_periods is None else min_periods)
+    corr[short] = np.nan
+    beta[short] = np.nan
+    return {
+        "dates": returns.index,
+        "coins": list(prices.columns),
+        "corr": corr.astype(np.float32),
+        "beta": beta.astype(np.float32)
+    }
+
+
+def pair_series(stats, reference=REFERENCE, measure="corr"):
+    """
+    Time series of every coin's measure against one reference coin.
+
+    Returns:
+        pd.DataFrame: Date x coin (the reference itself left out).
+    """
+    j = stats["coins"].index(reference)
+    frame = pd.DataFrame(stats[measure][:, :, j], index=stats["dates"], columns=stats["coins"])
+    return frame.drop(columns=reference)
+
+
+def snapshot(stats, date=None, measure="corr"):
+    """
+    Coin x coin matrix of a measure on one day (the last day on or before `date`; default: the latest).
+
+    Returns:
+        tuple: (pd.DataFrame matrix, date used), or (empty DataFrame, None) if there is no such day.
+    """
+    dates = stats["dates"]
+    row = len(dates) - 1 if date is None else int(dates.searchsorted(pd.Timestamp(date), side="right")) - 1
+    if row < 0:
+        return pd.DataFrame(), None
+    return pd.DataFrame(stats[measure][row], index=stats["coins"], columns=stats["coins"]), dates[row]
+
+
+def phase_means(stats, reference=REFERENCE, measure="corr"):
+    """
+    Mean of every coin's measure against the reference within each BTC halving cycle.
+
+    Returns:
+        pd.DataFrame: Halving cycle number x coin (cycles without any value left out).
+    """
+    series = pair_series(stats, reference, measure)
+    starts = pd.to_datetime(sorted(HALVING_DATES.values()))
+    cycle = np.array(sorted(HALVING_DATES))[np.maximum(starts.searchsorted(series.index, side="right") - 1, 0)]
+    return series.groupby(cycle).mean().dropna(how="all")
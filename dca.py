@@ -1,6 +1,13 @@
 import pandas as pd
 import numpy as np
 
+# Resample rules for the investment calendar ('Daily' invests on every available price)
+FREQUENCY_RULES = {
+    "Monthly": "MS",  # First day of the month
+    "Weekly": "W-MON"  # Every Monday
+}
+
+
 def calculate_dca(df, amount, frequency="Monthly", start_date=None, end_date=None):
     """
     Calculates the performance of a Dollar Cost Averaging (DCA) strategy.
@@ -21,55 +28,119 @@ def calculate_dca(df, amount, frequency="Monthly", start_date=None, end_date=Non
               - 'roi': Return on Investment percentage.
               - 'max_drawdown': Maximum percentage drop from peak value.
     """
-    if df.empty:
-        return None
+    return calculate_dca_batch(df, [(amount, frequency, start_date, end_date)])[0]
 
-    # Filter by date range
-    if start_date:
-        df = df[df.index >= pd.to_datetime(start_date)]
-    if end_date:
-        df = df[df.index <= pd.to_datetime(end_date)]
+
+def calculate_dca_batch(df, scenarios):
+    """
+    Runs many DCA backtests on the same price history in one go.
+    
+    The price series and each frequency's investment calendar are prepared once and shared,
+    so each scenario only costs a couple of array slices and cumulative sums.
+    
+    Args:
+        df (pd.DataFrame): DataFrame with 'price' column and datetime index.
+        scenarios (list): Tuples of (amount, frequency, start_date, end_date), with the same
+                          meaning as the calculate_dca arguments.
         
+    Returns:
+        list: One calculate_dca result dict (or None when the range has no data) per scenario.
+    """
     if df.empty:
-        return None
+        return [None] * len(scenarios)
+
+    prices = _prepare_prices(df)
+    schedules = {}
+    results = []
+
+    for amount, frequency, start_date, end_date in scenarios:
+        if frequency not in schedules:
+            schedules[frequency] = _investment_schedule(prices, frequency)
+
+        dates, positions = _scenario_positions(prices, schedules[frequency], start_date, end_date)
+        if positions is None:
+            results.append(None)
+        else:
+            results.append(_dca_result(dates, prices.to_numpy()[positions], amount))
+
+    return results
+
+
+def _prepare_prices(df):
+    """
+    Extracts a chronologically sorted price series without missing values.
+    """
+    prices = df["price"].dropna()
+    if not prices.index.is_monotonic_increasing:
+        prices = prices.sort_index(kind="stable")
+    return prices
+
+
+def _investment_schedule(prices, frequency):
+    """
+    Determines the investment periods of a price series for the given frequency.
+    
+    Returns:
+        tuple: (labels, first_pos, last_pos) - the resample label of each non-empty period and the
+               positions of its first and last price in the series.
+    """
+    positions = pd.Series(np.arange(len(prices)), index=prices.index)
+    rule = FREQUENCY_RULES.get(frequency)
+    if rule is None: # Daily
+        return prices.index, positions.to_numpy(), positions.to_numpy()
+
+    resampled = positions.resample(rule)
+    # Skip days/weeks without price data
+    first = resampled.first().dropna()
+    last = resampled.last().dropna()
+    return first.index, first.to_numpy().astype(np.int64), last.to_numpy().astype(np.int64)
+
+
+def _scenario_positions(prices, schedule, start_date=None, end_date=None):
+    """
+    Selects the investment dates and price positions of a schedule within a date range.
+    
+    The first period is cut at start_date, so its investment happens on the first price on or
+    after start_date (the same as resampling the already filtered history).
+    
+    Returns:
+        tuple: (dates, positions), or (None, None) when the range holds no prices.
+    """
+    labels, first, last = schedule
 
-    # Resample based on frequency to determine investment dates
-    if frequency == "Monthly":
-        # First day of the month
-        investment_dates = df.resample('MS').first()
-    elif frequency == "Weekly":
-        # Every Monday
-        investment_dates = df.resample('W-MON').first()
-    else: # Daily
-        investment_dates = df
+    i0 = prices.index.searchsorted(pd.to_datetime(start_date), side="left") if start_date else 0
+    i1 = prices.index.searchsorted(pd.to_datetime(end_date), side="right") if end_date else len(prices)
+    if i0 >= i1:
+        return None, None
 
-    # Drop NaNs (skip days/weeks without price data)
-    investment_dates = investment_dates.dropna()
+    b0 = np.searchsorted(last, i0, side="left")
+    b1 = np.searchsorted(first, i1, side="left")
+    if b0 >= b1:
+        return None, None
 
+    positions = first[b0:b1].copy()
+    positions[0] = max(positions[0], i0)
+    return labels[b0:b1], positions
+
+
+def _dca_result(dates, prices, amount):
+    """
+    Builds the calculate_dca result from the investment dates and prices with cumulative sums.
+    """
     # Calculate portfolio accumulation
-    total_invested = 0
-    total_btc = 0
-    history = []
-
-    for date, row in investment_dates.iterrows():
-        price = row['price']
-        btc_bought = amount / price
-        total_invested += amount
-        total_btc += btc_bought
-        
-        current_value = total_btc * price
-        roi = (current_value - total_invested) / total_invested * 100
-        
-        history.append({
-            "date": date,
-            "invested": total_invested,
-            "value": current_value,
-            "btc_accumulated": total_btc,
-            "roi": roi,
-            "price": price
-        })
-        
-    results_df = pd.DataFrame(history).set_index("date")
+    invested = np.cumsum(np.full(len(prices), amount))
+    btc_accumulated = np.cumsum(amount / prices)
+    value = btc_accumulated * prices
+    roi = (value - invested) / invested * 100
+
+    results_df = pd.DataFrame({
+        "invested": invested,
+        "value": value,
+        "btc_accumulated": btc_accumulated,
+        "roi": roi,
+        "price": prices
+    }, index=pd.DatetimeIndex(np.asarray(dates), name="date"))
+    total_btc = btc_accumulated[-1]
     
     # Calculate Max Drawdown of the Portfolio Value
     # 1. Calculate the rolling peak value up to each point
@@ -92,3 +163,150 @@ def calculate_dca(df, amount, frequency="Monthly", start_date=None, end_date=Non
         "roi": final_roi,
         "max_drawdown": max_drawdown
     }
+
+
+def calculate_dca_sweep(df, durations, frequencies=("Daily", "Weekly", "Monthly"), start_step=1):
+    """
+    Computes DCA ROI for every start date × holding period × frequency at once.
+    
+    Each cell equals the 'roi' of calculate_dca(df, amount, frequency, start, start + duration days)
+    (ROI does not depend on the amount). Instead of one backtest per cell, a prefix sum of
+    1 / price over each frequency's investment dates turns every cell into a few array lookups.
+    
+    Args:
+        df (pd.DataFrame): DataFrame with 'price' column and datetime index.
+        durations (list): Holding periods in days.
+        frequencies (list): Investment frequencies to sweep ('Daily', 'Weekly', 'Monthly').
+        start_step (int): Use every `start_step`-th price date as a start date.
+        
+    Returns:
+        dict: Frequency -> DataFrame of ROI percentages indexed by start date with one column per
+              duration. Windows that run past the end of the history are NaN.
+    """
+    if df.empty:
+        return {}
+
+    prices = _prepare_prices(df)
+    price_values = prices.to_numpy()
+    dates = prices.index.values
+
+    starts = np.arange(0, len(prices), start_step)
+    durations = np.asarray(durations)
+
+    # End date of every (start, duration) window and the position just after it
+    window_ends = dates[starts][:, None] + durations[None, :].astype("timedelta64[D]")
+    end_pos = np.searchsorted(dates, window_ends, side="right")
+    complete = window_ends <= dates[-1]
+
+    results = {}
+    for frequency in frequencies:
+        schedule = _investment_schedule(prices, frequency)
+        count, units, last_price = _window_dca_units(price_values, schedule, starts[:, None], end_pos)
+        roi = (units * last_price - count) / count * 100
+
+        results[frequency] = pd.DataFrame(
+            np.where(complete, roi, np.nan),
+            index=prices.index[starts],
+            columns=durations
+        )
+
+    return results
+
+
+def _window_dca_units(price_values, schedule, starts, end_pos):
+    """
+    Vectorized DCA accumulation for arrays of windows [start, end_pos) investing $1 per period.
+    
+    The first investment is on the start date itself, later ones at the first price of each following
+    period, exactly like calculate_dca on the filtered range.
+    
+    Args:
+        price_values (np.ndarray): Prices of the prepared price series.
+        schedule (tuple): Output of _investment_schedule for the same series.
+        starts (np.ndarray): Start positions (broadcastable against end_pos).
+        end_pos (np.ndarray): Positions just after the last price of each window.
+        
+    Returns:
+        tuple: (count, units, last_price) arrays - number of investments, units accumulated and
+               price of the last investment.
+    """
+    _, first, last = schedule
+    invest_prices = price_values[first]
+
+    # inverse_cumsum[b] = units bought with $1 at each of the first b investment dates
+    # (extended precision: early sub-dollar prices dominate the sum and would swamp later terms)
+    inverse_cumsum = np.concatenate([[0.0], np.cumsum(1.0 / invest_prices.astype(np.longdouble))])
+
+    b0 = np.searchsorted(last, starts, side="left")
+    b1 = np.searchsorted(first, end_pos, side="left")
+    b1 = np.maximum(b1, b0 + 1)
+
+    start_prices = price_values[starts]
+    count = b1 - b0
+    units = (1.0 / start_prices + inverse_cumsum[b1] - inverse_cumsum[b0 + 1]).astype(np.float64)
+    last_price = np.where(count > 1, invest_prices[np.minimum(b1, len(first)) - 1], start_prices)
+    return count, units, last_price
+
+
+def compare_lump_sum_dca(df, window_days=(365, 730, 1460), frequency="Monthly", start_step=1):
+    """
+    Compares investing everything on day one against DCA over every rolling window of the history.
+    
+    For each window length and every start date whose window is fully covered by data, the same
+    capital is either invested at the start price (lump sum) or split evenly across the DCA
+    investment dates. Both are valued at the last price of the window.
+    
+    Args:
+        df (pd.DataFrame): DataFrame with 'price' column and datetime index.
+        window_days (list): Window lengths in days (e.g. 365, 730, 1460 for 1, 2 and 4 years).
+        frequency (str): DCA frequency - 'Daily', 'Weekly', or 'Monthly'.
+        start_step (int): Use every `start_step`-th price date as a window start.
+        
+    Returns:
+        dict: Window length -> dictionary containing:
+              - 'returns': DataFrame of 'lump_sum' and 'dca' returns (%) indexed by start date.
+              - 'lump_sum_win_rate': Percentage of windows where lump sum returned more.
+              - 'dca_win_rate': Percentage of windows where DCA returned more.
+              - 'distribution': Percentile table of both return columns.
+              - 'worst': Worst return and its start date for each approach.
+    """
+    if df.empty:
+        return {}
+
+    prices = _prepare_prices(df)
+    price_values = prices.to_numpy()
+    dates = prices.index.values
+    schedule = _investment_schedule(prices, frequency)
+    starts = np.arange(0, len(prices), start_step)
+
+    results = {}
+    for days in window_days:
+        window_ends = dates[starts] + np.timedelta64(int(days), "D")
+        valid = window_ends <= dates[-1]
+        if not valid.any():
+            continue
+
+        w_starts = starts[valid]
+        end_pos = np.searchsorted(dates, window_ends[valid], side="right")
+        end_prices = price_values[end_pos - 1]
+
+        count, units, _ = _window_dca_units(price_values, schedule, w_starts, end_pos)
+        returns = pd.DataFrame({
+            "lump_sum": (end_prices / price_values[w_starts] - 1) * 100,
+            "dca": (units * end_prices / count - 1) * 100
+        }, index=prices.index[w_starts])
+
+        worst = {}
+        for col in returns.columns:
+            worst_date = returns[col].idxmin()
+            worst[col] = {"start_date": worst_date, "return": returns.at[worst_date, col]}
+
+        results[days] = {
+            "returns": returns,
+            "lump_sum_win_rate": (returns["lump_sum"] > returns["dca"]).mean() * 100,
+            "dca_win_rate": (returns["dca"] > returns["lump_sum"]).mean() * 100,
+            "distribution": returns.quantile([0.05, 0.25, 0.5, 0.75, 0.95]),
+            "worst": worst
+        }
+
+    return results
@@ -0,0 +1,116 @@
+import os
+import re
+import pandas as pd
+from utils import COINS, load_local_history
+from portfolio import align_prices
+
+USD = "USD"
+
+# Fiat series: one 'timestamp,price' CSV per currency (e.g. fiat_data/EUR.csv), price = USD per unit
+FIAT_DIR = os.environ.get("CCA_FIAT_DIR", "fiat_data")
+
+
+def fiat_currencies(fiat_dir=None):
+    """
+    Returns:
+        list: Currency codes with a series in the fiat directory (empty if there is none).
+    """
+    fiat_dir = fiat_dir or FIAT_DIR
+    if not os.path.isdir(fiat_dir):
+        return []
+    return sorted(name[:-4].upper() for name in os.listdir(fiat_dir) if name.lower().endswith(".csv"))
+
+
+def load_fiat(code, fiat_dir=None):
+    """
+    Loads a fiat series (USD price of one unit of the currency).
+
+    Returns:
+        pd.DataFrame: 'price' column indexed by datetime (empty if the currency has no file).
+    """
+    path = os.path.join(fiat_dir or FIAT_DIR, f"{code.upper()}.csv")
+    if not os.path.exists(path):
+        return pd.DataFrame()
+    return load_local_history(path)
+
+
+def quote_symbol(quote):
+    """Short unit of a quote: 'USD', the ticker of a coin ('Bitcoin (BTC)' -> 'BTC') or a fiat code."""
+    if quote in COINS:
+        match = re.search(r"\(([^)]+)\)\s*$", quote)
+        return match.group(1) if match else quote
+    return quote
+
+
+def denominate(base_df, quote_df):
+    """
+    Prices one history in another: base / quote on the days both have a price.
+
+    Both USD histories are aligned on one daily calendar (portfolio.align_prices: last observation
+    per day, gaps forward-filled) and divided in one vectorized step, so any pair (ETH/BTC, SOL/ETH,
+    BTC/EUR) comes from the histories already fetched rather than from a separate pair history.
+    The result stops at the earlier of the two last dates, so a stale series is not extended.
+
+    Args:
+        base_df (pd.DataFrame): History of the priced asset ('price' in USD, datetime index).
+        quote_df (pd.DataFrame): History of the quote asset ('price' in USD, datetime index).
+
+    Returns:
+        pd.DataFrame: 'price' column (base in quote units) indexed by day; empty if they do not overlap.
+    """
+    if base_df.empty or quote_df.empty:
+        return pd.DataFrame()
+
+    aligned = align_prices({"base": base_df, "quote": quote_df})
+    end = min(base_df.index.max(), quote_df.index.max()).normalize()
+    aligned = aligned[aligned.index <= end].dropna()
+    aligned = aligned[aligned["quote"] > 0]
+    if aligned.empty:
+        return pd.DataFrame()
+
+    ratio = (aligned["base"] / aligned["quote"]).rename("price").to_frame()
+    ratio.index.name = "timestamp"
+    return ratio
+
+
+def cross_price(base_price, quote_price):
+    """
+    Combines two current-price records ({'usd', 'usd_24h_change'}) into base priced in quote.
+
+    The result keeps the keys the app reads ('usd' then holds the price in quote units).
+    """
+    if not base_price or not quote_price or not quote_price["usd"]:
+        return None
+    change = ((1 + base_price["usd_24h_change"] / 100) / (1 + quote_price["usd_24h_change"] / 100) - 1) * 100
+    return {"usd": base_price["usd"] / quote_price["usd"], "usd_24h_change": change}
+
+
+def fiat_current_price(fiat_df):
+    """Current-price record of a fiat series: its last rate and the change from the previous one."""
+    if fiat_df.empty:
+        return None
+    rates = fiat_df["price"].dropna()
+    change = (rates.iloc[-1] / rates.iloc[-2] - 1) * 100 if len(rates) > 1 else 0.0
+    return {"usd": float(rates.iloc[-1]), "usd_24h_change": float(change)}
+
+
+def format_price(value, quote=USD, decimals=2):
+    """
+    Formats a price in its quote: '$1,234.56' in USD, '0.05231 BTC' otherwise.
+
+    Ratios are often far below 1 (e.g. SUI in BTC), so non-USD prices under 1 keep 4 significant digits.
+    """
+    if pd.isna(value):
+        return "N/A"
+    if quote == USD:
+        return f"${value:,.{decimals}f}"
+    number = f"{value:,.{decimals}f}" if abs(value) >= 1 else f"{value:.4g}"
+    return f"{number} {quote_symbol(quote)}"
+
+
+def quote_label(text, quote=USD):
+    """Puts the quote unit into a translated label written for USD ('Cycle High ($)' -> 'Cycle High (BTC)')."""
+    if quote == USD:
+        return text
+    symbol = quote_symbol(quote)
+    return text.replace("($)", f"({symbol})").replace("USD", symbol)
@@ -0,0 +1,147 @@
+import argparse
+import threading
+import time
+from contextlib import nullcontext
+from concurrent.futures import Future, wait
+import metrics
+from utils import COINS, coin_symbols, _fetch_coingecko, fetch_coin_history_yahoo, fetch_coin_history_binance, fetch_coin_history_okex
+from source_coverage import COVERAGE_FILE, summarize_history, choose_source, save_coverage, load_coverage
+
+# Source -> (fetch function taking (symbol, api_key), position of its symbol in utils.coin_symbols)
+SOURCES = {
+    "CoinGecko": (lambda symbol, api_key: _fetch_coingecko(symbol, api_key), 0),
+    "Yahoo": (lambda symbol, api_key: fetch_coin_history_yahoo(symbol), 1),
+    "Binance": (lambda symbol, api_key: fetch_coin_history_binance(symbol), 2),
+    "OKEx": (lambda symbol, api_key: fetch_coin_history_okex(symbol), 3)
+}
+
+
+def check_source(coin_name, source, api_key=None, limit=None):
+    """
+    Fetches a coin's full history from one source and describes its coverage.
+
+    Args:
+        coin_name (str): Coin name as listed in COINS.
+        source (str): Key of SOURCES.
+        api_key (str, optional): CoinGecko API key.
+        limit (threading.Semaphore, optional): Caps concurrent requests to this source.
+
+    Returns:
+        dict: summarize_history fields plus symbol, latency (s), last HTTP status, pages and error.
+    """
+    fetch, position = SOURCES[source]
+    symbol = coin_symbols(coin_name)[position]
+
+    with limit or nullcontext():
+        started_at = time.time()
+        started = time.perf_counter()
+        df = fetch(symbol, api_key)
+        latency = time.perf_counter() - started
+
+    # The fetch functions swallow their errors; the attempt record still has them
+    attempts = [a for a in list(metrics.recent_attempts)
+                if a["source"] == source and a["symbol"] == symbol and a["kind"] == "history" and a["time"] >= started_at]
+    attempt = attempts[-1] if attempts else {}
+    return {
+        "symbol": symbol,
+        "latency": latency,
+        "status": attempt.get("status"),
+        "pages": attempt.get("pages"),
+        "error": attempt.get("error"),
+        **summarize_history(df)
+    }
+
+
+def _start_daemon(fn, *args):
+    # A Future completed on a daemon thread: a probe stuck past the deadline cannot keep the process alive
+    future = Future()
+
+    def run():
+        future.set_running_or_notify_cancel()
+        try:
+            future.set_result(fn(*args))
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=run, daemon=True).start()
+    return future
+
+
+def build_coverage(coin_names, sources=tuple(SOURCES), api_key=None, per_source=4, deadline=180):
+    """
+    Checks every coin against every source concurrently.
+
+    Requests to one source are capped at `per_source` at a time, so the diagnostics do not get
+    themselves rate limited. Every check runs on its own daemon thread; checks still running after
+    `deadline` seconds are reported as timed out and abandoned (the fetch functions have no timeout
+    of their own that could be relied on).
+
+    Returns:
+        dict: {'generated_at', 'coins': {coin: {'sources': {source: check}, 'preferred', 'complete'}}}
+    """
+    limits = {source: threading.Semaphore(per_source) for source in sources}
+    futures = {
+        (coin, source): _start_daemon(check_source, coin, source, api_key, limits[source])
+        for coin in coin_names for source in sources
+    }
+    wait(futures.values(), timeout=deadline)
+
+    coins = {}
+    for (coin, source), future in futures.items():
+        if not future.done():
+            check = {"symbol": coin_symbols(coin)[SOURCES[source][1]], "latency": None, "error": f"timed out after {deadline}s",
+                     **summarize_history(None)}
+        elif future.exception():
+            check = {"symbol": coin_symbols(coin)[SOURCES[source][1]], "latency": None,
+                     "error": repr(future.exception()), **summarize_history(None)}
+        else:
+            check = future.result()
+        coins.setdefault(coin, {"sources": {}})["sources"][source] = check
+
+    for coin, entry in coins.items():
+        entry["preferred"], entry["complete"] = choose_source(entry["sources"])
+        entry["checked_at"] = time.time()
+    return {"generated_at": time.time(), "coins": coins}
+
+
+def print_matrix(matrix, sources):
+    print(f"{'coin':<22}" + "".join(f"{source:>28}" for source in sources) + "   preferred")
+    for coin, entry in matrix["coins"].items():
+        cells = []
+        for source in sources:
+            check = entry["sources"].get(source)
+            if check is None:
+                cells.append("")
+            elif check["rows"]:
+                mark = "*" if source in entry["complete"] else " "
+                cells.append(f"{check['first']}..{check['last'][5:]} {check['latency']:5.1f}s{mark}")
+            else:
+                cells.append((check["error"] or "no data")[:26])
+        print(f"{coin:<22}" + "".join(f"{cell:>28}" for cell in cells) + f"   {entry['preferred'] or '-'}")
+    print("\n* complete: starts with the earliest source, up to date and without long gaps")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check every coin against every data source and write the coverage matrix used by Auto mode.")
+    parser.add_argument("--coins", nargs="*", default=list(COINS), help="Coin names (default: all)")
+    parser.add_argument("--sources", nargs="*", default=list(SOURCES), choices=list(SOURCES))
+    parser.add_argument("--api-key", help="CoinGecko API key")
+    parser.add_argument("--per-source", type=int, default=4, help="Concurrent requests per source")
+    parser.add_argument("--deadline", type=float, default=180, help="Seconds before unfinished checks are reported as timed out")
+    parser.add_argument("--output", default=COVERAGE_FILE, help="Coverage matrix file (default: %(default)s)")
+    parser.add_argument("--dry-run", action="store_true", help="Print the matrix without writing it")
+    args = parser.parse_args()
+
+    unknown = [c for c in args.coins if c not in COINS]
+    if unknown:
+        parser.error(f"unknown coins: {', '.join(unknown)}")
+
+    matrix = build_coverage(args.coins, args.sources, args.api_key, args.per_source, args.deadline)
+    print_matrix(matrix, args.sources)
+
+    if not args.dry_run:
+        # Checking a subset keeps the other coins' entries from the previous run
+        previous = load_coverage(args.output, max_age=None) or {}
+        matrix["coins"] = {**previous.get("coins", {}), **matrix["coins"]}
+        save_coverage(matrix, args.output)
+        print(f"Wrote {args.output}")
@@ -0,0 +1,167 @@
+import numpy as np
+import pandas as pd
+
+# Plotted area of a full-width chart in the wide layout (pixels). Streamlit does not report the real
+# width to the script, so this is the reference the point budget is derived from.
+DEFAULT_CHART_WIDTH = 1000
+
+
+def target_points(chart_width=DEFAULT_CHART_WIDTH, points_per_pixel=1.0):
+    """
+    Number of points worth sending for a chart of the given width; more cannot be told apart on screen.
+    """
+    return max(int(chart_width * points_per_pixel), 3)
+
+
+def lttb(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets downsampling.
+
+    Keeps the first and last point, splits the rest into n_out - 2 buckets and from each bucket keeps
+    the point forming the largest triangle with the previously kept point and the average of the next
+    bucket. This preserves the visual shape (including spikes) far better than plain decimation.
+
+    Args:
+        x (np.ndarray): Monotonic x values (numeric).
+        y (np.ndarray): y values.
+        n_out (int): Number of points to keep.
+
+    Returns:
+        np.ndarray: Sorted indices of the kept points.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    # n_out - 2 buckets over the interior points, plus prefix sums for the bucket averages
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    cum_x = np.concatenate([[0.0], np.cumsum(x)])
+    cum_y = np.concatenate([[0.0], np.cumsum(y)])
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        next_lo, next_hi = (edges[i + 1], edges[i + 2]) if i + 2 < len(edges) else (n - 1, n)
+        avg_x = (cum_x[next_hi] - cum_x[next_lo]) / (next_hi - next_lo)
+        avg_y = (cum_y[next_hi] - cum_y[next_lo]) / (next_hi - next_lo)
+
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(np.argmax(area))
+        selected[i + 1] = a
+
+    return selected
+
+
+def minmax_downsample(y, n_out):
+    """
+    Min/max bucketing: keeps the lowest and highest point of each of n_out / 2 equal-count buckets.
+
+    Cheaper than LTTB and guarantees every local extreme at bucket resolution survives.
+
+    Returns:
+        np.ndarray: Sorted indices of the kept points.
+    """
+    n = len(y)
+    if n_out >= n or n_out < 4:
+        return np.arange(n)
+
+    y = np.asarray(y, dtype=np.float64)
+    n_buckets = n_out // 2
+    bucket = np.arange(n) * n_buckets // n
+
+    # Sorting by (bucket, y) puts each bucket's minimum first and maximum last
+    order = np.lexsort((y, bucket))
+    starts = np.searchsorted(bucket[order], np.arange(n_buckets), side="left")
+    ends = np.append(starts[1:], n) - 1
+
+    return np.unique(np.concatenate([[0, n - 1], order[starts], order[ends]]))
+
+
+def downsample_series(series, n_out, log_scale=False, method="lttb"):
+    """
+    Reduces a datetime-indexed price series to about n_out points for plotting.
+
+    Args:
+        series (pd.Series): Values indexed by datetime (or numbers, e.g. days since halving).
+        n_out (int): Target number of points.
+        log_scale (bool): Select points on log10 values, matching what a log axis shows.
+        method (str): 'lttb' or 'minmax'.
+
+    Returns:
+        pd.Series: The kept points (the series itself if it is already small enough). The global
+                   high and low are always kept so that visible peaks never disappear.
+    """
+    series = series.dropna()
+    if len(series) <= n_out:
+        return series
+
+    y = series.to_numpy(dtype=np.float64)
+    if log_scale:
+        y = np.log10(np.where(y > 0, y, np.nan))
+        y = np.where(np.isnan(y), np.nanmin(y), y)
+
+    if method == "minmax":
+        keep = minmax_downsample(y, n_out)
+    else:
+        index = series.index
+        x = index.asi8 if isinstance(index, pd.DatetimeIndex) else np.asarray(index, dtype=np.float64)
+        x = np.asarray(x, dtype=np.float64)
+        keep = lttb(x - x[0], y, n_out)
+
+    keep = np.union1d(keep, [int(np.argmax(y)), int(np.argmin(y))])
+    return series.iloc[keep]
+
+
+def downsample_matrix(frame, n_out, log_scale=False):
+    """
+    Min/max downsampling of every column of a matrix in one pass (shared equal-count buckets).
+
+    Args:
+        frame (pd.DataFrame): Columns to downsample (e.g. the date x coin comparison matrix).
+        n_out (int): Target number of points per column.
+        log_scale (bool): Select points on log10 values.
+
+    Returns:
+        pd.DataFrame: Same shape as frame, with the values that were not kept set to NaN. The first
+                      and last value, high and low of every column are always kept.
+    """
+    n = len(frame)
+    if n <= n_out or n_out < 4:
+        return frame
+
+    values = frame.to_numpy(dtype=np.float64)
+    y = np.log10(np.where(values > 0, values, np.nan)) if log_scale else values.copy()
+    valid = ~np.isnan(y)
+
+    # Pad to whole buckets so the matrix can be reshaped to (buckets, bucket size, columns)
+    n_buckets = n_out // 2
+    size = -(-n // n_buckets)
+    padded = np.full((n_buckets * size, y.shape[1]), np.nan)
+    padded[:n] = y
+    blocks = padded.reshape(n_buckets, size, -1)
+
+    starts = (np.arange(n_buckets) * size)[:, None]
+    lows = starts + np.where(np.isnan(blocks), np.inf, blocks).argmin(axis=1)
+    highs = starts + np.where(np.isnan(blocks), -np.inf, blocks).argmax(axis=1)
+
+    keep = np.zeros(padded.shape, dtype=bool)
+    columns = np.broadcast_to(np.arange(y.shape[1]), lows.shape)
+    keep[lows, columns] = True
+    keep[highs, columns] = True
+    keep = keep[:n]
+
+    # First and last value of each column (coins list on different days)
+    has_value = valid.any(axis=0)
+    cols = np.arange(y.shape[1])[has_value]
+    keep[valid.argmax(axis=0)[has_value], cols] = True
+    keep[n - 1 - valid[::-1].argmax(axis=0)[has_value], cols] = True
+    keep &= valid
+
+    return frame.where(keep)
@@ -0,0 +1,214 @@
+import argparse
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import pandas as pd
+from utils import fetch_coin_history, fetch_current_price, COINS
+from cycles import get_cycle_data, get_current_cycle_progress
+from prediction import generate_fan_chart_data
+from dca import calculate_dca
+from languages import TRANSLATIONS
+from local_store import save_history, load_history, coin_key
+
+# Default DCA scenario shown in the reports (same defaults as the DCA Calculator page)
+DEFAULT_DCA_AMOUNT = 500
+DEFAULT_DCA_START = "2020-05-11"
+
+HTML_TEMPLATE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{title}</title>
+<style>
+body {{ font-family: sans-serif; margin: 2em; background: #0e1117; color: #fafafa; }}
+table {{ border-collapse: collapse; margin-bottom: 2em; }}
+th, td {{ border: 1px solid #262730; padding: 6px 12px; text-align: right; }}
+a {{ color: #f63366; }}
+</style></head><body>
+{body}
+<p><small>Generated {generated}</small></p>
+</body></html>
+"""
+
+
+def _heading(text):
+    # Translations carry markdown heading prefixes ("### ...") for Streamlit
+    return text.lstrip("#").strip()
+
+
+def fetch_stage(coin_name, store_dir):
+    """
+    Fetches one coin's history and current price into the local store (I/O bound, runs on threads).
+    """
+    t0 = time.perf_counter()
+    df, source_used = fetch_coin_history(coin_name)
+    current_price = fetch_current_price(coin_name)
+    if not df.empty:
+        save_history(coin_name, df, source_used, extra={"current_price": current_price}, store_dir=store_dir)
+    return coin_name, not df.empty, time.perf_counter() - t0
+
+
+def build_coin_report(coin_name, store_dir, out_dir, lang="🇬🇧"):
+    """
+    Builds the JSON and HTML snapshot for one coin from the local store (CPU bound, runs in a worker process).
+
+    Returns:
+        dict: Per-stage timings in seconds (or an 'error' entry).
+    """
+    t = TRANSLATIONS[lang]
+    timings = {}
+
+    t0 = time.perf_counter()
+    df, meta = load_history(coin_name, store_dir=store_dir)
+    timings["load"] = time.perf_counter() - t0
+    if df.empty:
+        return {"coin": coin_name, "error": "no data in local store"}
+
+    # Dashboard
+    t0 = time.perf_counter()
+    progress = get_current_cycle_progress()
+    current_price = meta.get("current_price") or {}
+    dashboard = {
+        "current_price": current_price.get("usd", float(df["price"].iloc[-1])),
+        "change_24h": current_price.get("usd_24h_change"),
+        "days_since_halving": progress["days_passed"],
+        "cycle_progress_pct": progress["progress_pct"],
+        "next_halving_est": (progress["halving_date"] + pd.Timedelta(days=1460)).strftime("%Y-%m-%d")
+    }
+    timings["dashboard"] = time.perf_counter() - t0
+
+    # Cycle stats
+    t0 = time.perf_counter()
+    cycles = get_cycle_data(df)
+    cycle_stats = [{
+        "cycle": c_num,
+        "start_date": data["actual_start_date"].strftime("%Y-%m-%d"),
+        "high": data["high"],
+        "high_days": data["high_days"],
+        "low": data["low"]
+    } for c_num, data in cycles.items()]
+    timings["cycles"] = time.perf_counter() - t0
+
+    # Fan chart levels (end of the projected cycle)
+    t0 = time.perf_counter()
+    fan_data = generate_fan_chart_data(df, cycles)
+    fan_levels = None
+    if not fan_data.empty:
+        last_proj = fan_data.iloc[-1]
+        fan_levels = {
+            "date": fan_data.index[-1].strftime("%Y-%m-%d"),
+            "min_price": last_proj["min_price"],
+            "median_price": last_proj["median_price"],
+            "max_price": last_proj["max_price"]
+        }
+    timings["projection"] = time.perf_counter() - t0
+
+    # Default DCA
+    t0 = time.perf_counter()
+    dca_start = max(pd.to_datetime(DEFAULT_DCA_START), df.index[0])
+    res = calculate_dca(df, DEFAULT_DCA_AMOUNT, "Monthly", dca_start, pd.Timestamp.now())
+    dca_result = None
+    if res:
+        dca_result = {k: float(res[k]) for k in ("total_invested", "final_value", "total_btc", "roi", "max_drawdown")}
+        dca_result.update({"amount": DEFAULT_DCA_AMOUNT, "frequency": "Monthly", "start_date": dca_start.strftime("%Y-%m-%d")})
+    timings["dca"] = time.perf_counter() - t0
+
+    # Write JSON and HTML
+    t0 = time.perf_counter()
+    key = coin_key(coin_name)
+    report = {
+        "coin": coin_name,
+        "source": meta.get("source"),
+        "data_version": meta.get("data_version"),
+        "last_date": df.index[-1].strftime("%Y-%m-%d"),
+        "dashboard": dashboard,
+        "cycle_stats": cycle_stats,
+        "projection": fan_levels,
+        "dca": dca_result
+    }
+    with open(os.path.join(out_dir, f"{key}.json"), "w") as f:
+        json.dump(report, f, indent=2, default=float)
+
+    body = [f"<h1>{t['dash_title'].format(coin=coin_name)}</h1>",
+            f"<p>{_heading(t['data_source'])}: {meta.get('source')} (data until {report['last_date']})</p>",
+            pd.DataFrame([dashboard]).to_html(index=False),
+            f"<h2>{_heading(t['stats_title'])}</h2>",
+            pd.DataFrame(cycle_stats).to_html(index=False, float_format=lambda v: f"{v:,.2f}")]
+    if fan_levels:
+        body += [f"<h2>{_heading(t['levels_title'])}</h2>", pd.DataFrame([fan_levels]).to_html(index=False, float_format=lambda v: f"{v:,.2f}")]
+    if dca_result:
+        body += [f"<h2>{t['dca_title'].format(coin=coin_name)}</h2>", pd.DataFrame([dca_result]).to_html(index=False, float_format=lambda v: f"{v:,.2f}")]
+    with open(os.path.join(out_dir, f"{key}.html"), "w", encoding="utf-8") as f:
+        f.write(HTML_TEMPLATE.format(title=coin_name, body="\n".join(body), generated=pd.Timestamp.now().strftime("%Y-%m-%d %H:%M")))
+    timings["write"] = time.perf_counter() - t0
+
+    return {"coin": coin_name, **timings}
+
+
+def generate_reports(coin_names, out_dir, store_dir, workers=None, fetch_workers=8, skip_fetch=False, lang="🇬🇧"):
+    """
+    Regenerates the static snapshot for every coin.
+
+    Fetching is I/O bound and runs on a thread pool; report building is CPU bound and runs on a
+    process pool sized to the CPU count. Worker processes read the fetched data from the local store.
+
+    Returns:
+        pd.DataFrame: Per-coin stage timings.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    started = time.perf_counter()
+    fetch_times = {}
+
+    if not skip_fetch:
+        with ThreadPoolExecutor(max_workers=fetch_workers) as pool:
+            for coin_name, ok, elapsed in pool.map(lambda c: fetch_stage(c, store_dir), coin_names):
+                fetch_times[coin_name] = elapsed
+                if not ok:
+                    print(f"{coin_name}: fetch failed")
+    fetch_wall = time.perf_counter() - started
+
+    t0 = time.perf_counter()
+    # Spawn rather than fork: forking after the fetch threads (and their HTTP clients) ran can deadlock
+    # or crash the children
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count(), mp_context=multiprocessing.get_context("spawn")) as pool:
+        results = list(pool.map(build_coin_report, coin_names, [store_dir] * len(coin_names),
+                                [out_dir] * len(coin_names), [lang] * len(coin_names)))
+    build_wall = time.perf_counter() - t0
+
+    timings = pd.DataFrame(results).set_index("coin")
+    if fetch_times:
+        timings.insert(0, "fetch", pd.Series(fetch_times))
+
+    # Index page and machine-readable summary
+    links = "".join(f'<li><a href="{coin_key(c)}.html">{c}</a></li>' for c in coin_names if "error" not in timings.columns or pd.isna(timings.at[c, "error"]))
+    with open(os.path.join(out_dir, "index.html"), "w", encoding="utf-8") as f:
+        f.write(HTML_TEMPLATE.format(title="Crypto Cycle Analysis", body=f"<h1>Crypto Cycle Analysis</h1><ul>{links}</ul>",
+                                     generated=pd.Timestamp.now().strftime("%Y-%m-%d %H:%M")))
+    with open(os.path.join(out_dir, "summary.json"), "w") as f:
+        json.dump({
+            "fetch_wall_seconds": fetch_wall,
+            "build_wall_seconds": build_wall,
+            "workers": workers or os.cpu_count(),
+            "coins": json.loads(timings.reset_index().to_json(orient="records"))
+        }, f, indent=2)
+
+    print(f"Fetch stage: {fetch_wall:.2f}s wall, build stage: {build_wall:.2f}s wall on {workers or os.cpu_count()} processes")
+    return timings
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pre-render dashboard, cycle, projection and DCA snapshots for every coin.")
+    parser.add_argument("--coins", nargs="*", default=list(COINS.keys()), help="Coin names as listed in utils.COINS")
+    parser.add_argument("--out", default=os.path.join("reports", pd.Timestamp.now().strftime("%Y-%m-%d")), help="Output directory")
+    parser.add_argument("--store", default=None, help="Local store directory (defaults to local_store.STORE_DIR)")
+    parser.add_argument("--workers", type=int, default=None, help="Report processes (defaults to the CPU count)")
+    parser.add_argument("--skip-fetch", action="store_true", help="Build from the local store without fetching")
+    parser.add_argument("--lang", default="🇬🇧", choices=list(TRANSLATIONS.keys()))
+    args = parser.parse_args()
+    unknown = [c for c in args.coins if c not in COINS]
+    if unknown:
+        parser.error(f"unknown coins: {', '.join(unknown)}")
+
+    timings = generate_reports(args.coins, args.out, args.store, workers=args.workers, skip_fetch=args.skip_fetch, lang=args.lang)
+    pd.set_option("display.width", 200)
+    print(timings.round(3).to_string())
+    print(f"Reports written to {args.out}")
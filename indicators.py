@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+
+# Moving-average windows in days (on a gap-free daily calendar)
+WINDOWS = {
+    "ma111": 111,
+    "ma200": 200,
+    "ma350": 350,
+    "ma200w": 200 * 7
+}
+
+# Indicators offered on the Cycle Analysis page
+INDICATORS = ("ma200w", "pi_cycle", "mayer")
+
+# Mayer multiple levels usually read as undervalued / overheated
+MAYER_LOW = 1.0
+MAYER_HIGH = 2.4
+
+
+def daily_closes(df):
+    """
+    Last price of every calendar day, with missing days forward-filled, so windows count days.
+
+    Returns:
+        pd.Series: Daily closes indexed by date.
+    """
+    prices = df["price"].dropna()
+    daily = prices.groupby(prices.index.normalize()).last()
+    return daily.asfreq("D").ffill()
+
+
+def _rolling_means(values, window):
+    # Mean of every trailing window from one cumulative sum; NaN until the window is full
+    out = np.full(len(values), np.nan)
+    if len(values) >= window:
+        cumsum = np.cumsum(np.concatenate(([0.0], values)))
+        out[window - 1:] = (cumsum[window:] - cumsum[:-window]) / window
+    return out
+
+
+def _indicator_columns(values):
+    columns = {"price": values}
+    for name, window in WINDOWS.items():
+        columns[name] = _rolling_means(values, window)
+    columns["ma350x2"] = 2 * columns["ma350"]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        columns["mayer"] = values / columns["ma200"]
+
+    above = columns["ma111"] > columns["ma350x2"] # False while either MA is NaN
+    columns["pi_top"] = above & ~np.concatenate(([False], above[:-1]))
+    return columns
+
+
+def compute_indicators(closes):
+    """
+    Computes every indicator over a daily close series in one vectorized pass.
+
+    Args:
+        closes (pd.Series): Daily closes (see daily_closes).
+
+    Returns:
+        pd.DataFrame: Indexed like closes with columns
+                      - 'price': the close
+                      - 'ma111', 'ma200', 'ma350', 'ma200w': simple moving averages (200 weeks = 1400 days)
+                      - 'ma350x2': 2 x 350-day MA (the Pi Cycle top line)
+                      - 'mayer': Mayer multiple (price / 200-day MA)
+                      - 'pi_top': True on days the 111-day MA crosses above 2 x 350-day MA
+    """
+    return pd.DataFrame(_indicator_columns(closes.to_numpy(dtype=np.float64)), index=closes.index)
+
+
+def latest_values(frame):
+    """
+    Returns:
+        dict: Latest value of every indicator plus the date of the last Pi Cycle top signal (or None).
+    """
+    last = frame.iloc[-1]
+    tops = frame.index[frame["pi_top"].to_numpy()]
+    return {
+        "price": last["price"],
+        "ma200w": last["ma200w"],
+        "mayer": last["mayer"],
+        "ma111": last["ma111"],
+        "ma350x2": last["ma350x2"],
+        "last_pi_top": tops[-1] if len(tops) else None
+    }
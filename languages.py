@@ -2,6 +2,7 @@ TRANSLATIONS = {
     "🇬🇧": {
         "sidebar_title": "🔍 Crypto Cycle Analysis",
         "select_asset": "Select Asset",
+        "select_quote": "Priced In",
         "settings": "⚙️ Settings",
         "api_key_label": "CoinGecko API Key (Optional)",
         "api_key_help": "Leave empty to use Yahoo Finance data (Free)",
@@ -11,7 +12,8 @@ TRANSLATIONS = {
             "Dashboard": "Dashboard",
             "Cycle Analysis": "Cycle Analysis",
             "Price Prediction": "Price Prediction",
-            "DCA Calculator": "DCA Calculator"
+            "DCA Calculator": "DCA Calculator",
+            "Comparison": "Multi-Coin Comparison"
         },
         "data_source": "### Data Source",
         "source_coingecko": "Source: CoinGecko API",
@@ -28,6 +30,20 @@ TRANSLATIONS = {
         "progress_bar_title": "### Current Cycle Progress (Anchored to BTC Halving)",
         "recent_price_title": "### Recent Price Action (Last 30 Days)",
         "chart_price_title": "{coin} Price - 30 Days",
+        "power_law_title": "### Power-Law Rainbow",
+        "power_law_desc": "Log price fitted against log days since launch (since the genesis block for BTC); bands are ±2 standard deviations of the residuals, drawn 4 years ahead.",
+        "power_law_fair": "Power-Law Fair Value",
+        "power_law_deviation": "Deviation",
+        "power_law_band": "Rainbow Band",
+        "rainbow_bands": ["Fire Sale", "Buy", "Accumulate", "Still Cheap", "Hold", "Is This a Bubble?", "Sell", "Maximum Bubble"],
+        "power_law_chart": "{coin} Power-Law Rainbow",
+        "legend_fair_value": "Power-Law Fair Value",
+        "power_law_all": "Fit all coins",
+        "power_law_table_title": "### Power-Law Fits (USD)",
+        "col_fair_value": "Fair Value",
+        "col_last_price": "Last Price",
+        "col_slope": "Slope",
+        "col_r2": "R²",
         
         # Cycle Analysis
         "cycle_title": "🔄 Historical Cycle Analysis ({coin})",
@@ -36,6 +52,19 @@ TRANSLATIONS = {
         "full_history_chart": "{coin} Price History",
         "log_scale_label": "Log Scale",
         "linear_scale_label": "Linear Scale",
+        "indicators_label": "Indicators",
+        "indicator_options": {
+            "ma200w": "200-Week MA",
+            "pi_cycle": "Pi Cycle Top",
+            "mayer": "Mayer Multiple"
+        },
+        "legend_price": "Price",
+        "legend_ma200w": "200-Week MA",
+        "legend_ma111": "111-Day MA",
+        "legend_ma350x2": "2 × 350-Day MA",
+        "legend_pi_top": "Pi Cycle Top Signal",
+        "mayer_chart": "Mayer Multiple (Price / 200-Day MA)",
+        "indicator_summary": "200-Week MA: **{ma200w}** · Mayer Multiple: **{mayer}** · Last Pi Cycle top signal: **{pi_top}**",
         "overlay_title": "### Cycle Overlay Comparison",
         "overlay_desc": "Comparing price performance relative to the BTC halving date.",
         "overlay_chart": "Cycle Performance (Absolute Price USD)",
@@ -65,7 +94,13 @@ TRANSLATIONS = {
         "dca_title": "💰 DCA Strategy Backtest ({coin})",
         "dca_desc": "Simulate a Dollar Cost Averaging strategy on {coin}.",
         "dca_params": "Parameters",
-        "input_amount": "Monthly Investment ($)",
+        "input_amount": "Investment per Period ($)",
+        "input_frequency": "Frequency",
+        "frequency_options": {
+            "Daily": "Daily",
+            "Weekly": "Weekly",
+            "Monthly": "Monthly"
+        },
         "input_start": "Start Date",
         "input_end": "End Date",
         "btn_run": "Run Backtest",
@@ -75,11 +110,79 @@ TRANSLATIONS = {
         "metric_roi": "ROI",
         "metric_drawdown": "Max Drawdown",
         "dca_chart_title": "Portfolio Value vs Invested Amount",
-        "dca_success": "Backtest Completed!"
+        "dca_success": "Backtest Completed!",
+        "sweep_title": "### ROI Heatmap (Start Date × Holding Period)",
+        "sweep_desc": "ROI of the selected frequency for every start date and holding period in the history.",
+        "sweep_x": "Holding Period (Days)",
+        "sweep_y": "Start Date",
+        "strategy_title": "### Strategy Comparison",
+        "strategy_desc": "The same amount, frequency and range under different accumulation rules.",
+        "strategy_names": {
+            "Fixed DCA": "Fixed DCA",
+            "Value Averaging": "Value Averaging",
+            "Buy the Dip": "Buy the Dip",
+            "Cycle Weighted": "Cycle Weighted"
+        },
+        "col_strategy": "Strategy",
+        "col_avg_cost": "Average Cost",
+        "strategy_chart_title": "Portfolio Value by Strategy",
+        "lump_title": "### Lump Sum vs DCA",
+        "lump_desc": "The same capital invested all on the first day or spread over the window, for every start date in the history.",
+        "col_window": "Window",
+        "col_lump_wins": "Lump Sum Wins",
+        "col_dca_wins": "DCA Wins",
+        "col_lump_median": "Median Lump Sum Return",
+        "col_dca_median": "Median DCA Return",
+        "col_lump_worst": "Worst Lump Sum Return",
+        "col_dca_worst": "Worst DCA Return",
+        
+        # Comparison
+        "comp_title": "📊 Multi-Coin Comparison",
+        "comp_desc": "Prices normalized to 1.0 on the anchor day, so coins of very different prices can be compared.",
+        "comp_coins": "Coins",
+        "comp_anchor": "Anchor",
+        "anchor_options": {
+            "halving": "BTC Halving",
+            "listing": "Listing Day",
+            "date": "Chosen Date"
+        },
+        "comp_halving": "Halving",
+        "comp_date": "Anchor Date",
+        "comp_axis": "X-Axis",
+        "axis_options": {
+            "calendar": "Calendar",
+            "days": "Days Since Anchor"
+        },
+        "comp_chart": "Price Relative to Anchor",
+        "comp_x_date": "Date",
+        "comp_x_days": "Days Since Anchor",
+        "comp_y": "Multiple of Anchor Price",
+        "comp_table_title": "### Performance Since Anchor",
+        "col_coin": "Coin",
+        "col_anchor_date": "Anchor Date",
+        "col_multiple": "Current Multiple",
+        "comp_error": "No data available for the selected coins.",
+        "corr_title": "### Correlation & Beta",
+        "corr_desc": "Rolling correlation and beta of daily log returns against the reference coin; dashed lines mark BTC halvings.",
+        "corr_need_two": "Select at least two coins to compare their correlation.",
+        "corr_window": "Window",
+        "corr_window_days": "{days} days",
+        "corr_measure": "Measure",
+        "corr_measures": {
+            "corr": "Correlation",
+            "beta": "Beta"
+        },
+        "corr_reference": "Against",
+        "corr_chart": "Rolling {measure} vs {coin} ({days}-Day Window)",
+        "corr_date": "Heatmap Date",
+        "corr_heatmap": "{measure} on {date} (Row vs Column)",
+        "corr_phase_title": "#### Average by Halving Cycle",
+        "col_halving_cycle": "Halving Cycle"
     },
     "🇨🇳": {
         "sidebar_title": "🔍 加密货币周期分析",
         "select_asset": "选择资产",
+        "select_quote": "计价单位",
         "settings": "⚙️ 设置",
         "api_key_label": "CoinGecko API Key (可选)",
         "api_key_help": "留空以使用 Yahoo Finance 数据（免费）",
@@ -89,7 +192,8 @@ TRANSLATIONS = {
             "Dashboard": "仪表盘",
             "Cycle Analysis": "周期分析",
             "Price Prediction": "价格预测",
-            "DCA Calculator": "定投回测"
+            "DCA Calculator": "定投回测",
+            "Comparison": "多币种对比"
         },
         "data_source": "### 数据来源",
         "source_coingecko": "来源: CoinGecko API",
@@ -106,6 +210,20 @@ TRANSLATIONS = {
         "progress_bar_title": "### 当前周期进度 (锚定 BTC 减半)",
         "recent_price_title": "### 近期价格走势 (过去30天)",
         "chart_price_title": "{coin} 价格 - 30天",
+        "power_law_title": "### 幂律彩虹图",
+        "power_law_desc": "以上线以来天数（BTC 从创世区块起算）的对数拟合对数价格；色带为残差的 ±2 个标准差，并向后延伸 4 年。",
+        "power_law_fair": "幂律公允价值",
+        "power_law_deviation": "偏离程度",
+        "power_law_band": "彩虹区间",
+        "rainbow_bands": ["甩卖", "买入", "积累", "仍然便宜", "持有", "是泡沫吗？", "卖出", "最大泡沫"],
+        "power_law_chart": "{coin} 幂律彩虹图",
+        "legend_fair_value": "幂律公允价值",
+        "power_law_all": "拟合所有币种",
+        "power_law_table_title": "### 幂律拟合 (USD)",
+        "col_fair_value": "公允价值",
+        "col_last_price": "最新价格",
+        "col_slope": "斜率",
+        "col_r2": "R²",
         
         # Cycle Analysis
         "cycle_title": "🔄 历史周期分析 ({coin})",
@@ -114,6 +232,19 @@ TRANSLATIONS = {
         "full_history_chart": "{coin} 价格历史",
         "log_scale_label": "对数坐标 (Log)",
         "linear_scale_label": "线性坐标 (Linear)",
+        "indicators_label": "技术指标",
+        "indicator_options": {
+            "ma200w": "200周均线",
+            "pi_cycle": "Pi Cycle 顶部指标",
+            "mayer": "梅耶倍数"
+        },
+        "legend_price": "价格",
+        "legend_ma200w": "200周均线",
+        "legend_ma111": "111日均线",
+        "legend_ma350x2": "2 × 350日均线",
+        "legend_pi_top": "Pi Cycle 顶部信号",
+        "mayer_chart": "梅耶倍数 (价格 / 200日均线)",
+        "indicator_summary": "200周均线: **{ma200w}** · 梅耶倍数: **{mayer}** · 最近一次 Pi Cycle 顶部信号: **{pi_top}**",
         "overlay_title": "### 周期叠加对比",
         "overlay_desc": "对比相对于 BTC 减半日期的价格表现。",
         "overlay_chart": "周期表现 (绝对价格 USD)",
@@ -143,7 +274,13 @@ TRANSLATIONS = {
         "dca_title": "💰 定投策略回测 ({coin})",
         "dca_desc": "模拟对 {coin} 的定投 (DCA) 策略。",
         "dca_params": "参数设置",
-        "input_amount": "每月投入金额 ($)",
+        "input_amount": "每期投入金额 ($)",
+        "input_frequency": "定投频率",
+        "frequency_options": {
+            "Daily": "每日",
+            "Weekly": "每周",
+            "Monthly": "每月"
+        },
         "input_start": "开始日期",
         "input_end": "结束日期",
         "btn_run": "运行回测",
@@ -153,11 +290,79 @@ TRANSLATIONS = {
         "metric_roi": "投资回报率 (ROI)",
         "metric_drawdown": "最大回撤",
         "dca_chart_title": "持仓价值 vs 总投入",
-        "dca_success": "回测完成！"
+        "dca_success": "回测完成！",
+        "sweep_title": "### 收益率热力图 (开始日期 × 持有期)",
+        "sweep_desc": "所选频率下，历史上每个开始日期与持有期组合的投资回报率。",
+        "sweep_x": "持有期 (天)",
+        "sweep_y": "开始日期",
+        "strategy_title": "### 策略对比",
+        "strategy_desc": "相同金额、频率和时间范围下不同积累规则的表现。",
+        "strategy_names": {
+            "Fixed DCA": "固定定投",
+            "Value Averaging": "价值平均",
+            "Buy the Dip": "逢低加仓",
+            "Cycle Weighted": "周期加权"
+        },
+        "col_strategy": "策略",
+        "col_avg_cost": "平均成本",
+        "strategy_chart_title": "各策略投资组合价值",
+        "lump_title": "### 一次性投入 vs 定投",
+        "lump_desc": "对历史上每个起始日期，比较同一笔资金在首日一次性投入与在窗口期内分批定投的结果。",
+        "col_window": "窗口期",
+        "col_lump_wins": "一次性投入胜率",
+        "col_dca_wins": "定投胜率",
+        "col_lump_median": "一次性投入收益中位数",
+        "col_dca_median": "定投收益中位数",
+        "col_lump_worst": "一次性投入最差收益",
+        "col_dca_worst": "定投最差收益",
+        
+        # Comparison
+        "comp_title": "📊 多币种对比",
+        "comp_desc": "价格在锚点日归一化为 1.0，便于比较价格量级差异很大的币种。",
+        "comp_coins": "币种",
+        "comp_anchor": "锚点",
+        "anchor_options": {
+            "halving": "BTC 减半",
+            "listing": "上市日",
+            "date": "自选日期"
+        },
+        "comp_halving": "减半",
+        "comp_date": "锚点日期",
+        "comp_axis": "横轴",
+        "axis_options": {
+            "calendar": "日历",
+            "days": "距锚点天数"
+        },
+        "comp_chart": "相对锚点的价格",
+        "comp_x_date": "日期",
+        "comp_x_days": "距锚点天数",
+        "comp_y": "锚点价格倍数",
+        "comp_table_title": "### 锚点以来表现",
+        "col_coin": "币种",
+        "col_anchor_date": "锚点日期",
+        "col_multiple": "当前倍数",
+        "comp_error": "所选币种没有可用数据。",
+        "corr_title": "### 相关性与 Beta",
+        "corr_desc": "对数日收益率相对参照币种的滚动相关性与 Beta；虚线标记 BTC 减半。",
+        "corr_need_two": "请至少选择两个币种以比较相关性。",
+        "corr_window": "窗口",
+        "corr_window_days": "{days} 天",
+        "corr_measure": "指标",
+        "corr_measures": {
+            "corr": "相关性",
+            "beta": "Beta"
+        },
+        "corr_reference": "参照",
+        "corr_chart": "相对 {coin} 的滚动{measure} ({days} 天窗口)",
+        "corr_date": "热力图日期",
+        "corr_heatmap": "{date} 的{measure} (行相对列)",
+        "corr_phase_title": "#### 各减半周期平均值",
+        "col_halving_cycle": "减半周期"
     },
     "🇯🇵": {
         "sidebar_title": "🔍 暗号資産サイクル分析",
         "select_asset": "銘柄選択",
+        "select_quote": "建値通貨",
         "settings": "⚙️ 設定",
         "api_key_label": "CoinGecko APIキー (任意)",
         "api_key_help": "空欄の場合、Yahoo Financeデータを使用します（無料）",
@@ -167,7 +372,8 @@ TRANSLATIONS = {
             "Dashboard": "ダッシュボード",
             "Cycle Analysis": "サイクル分析",
             "Price Prediction": "価格予測",
-            "DCA Calculator": "積立投資 (DCA)"
+            "DCA Calculator": "積立投資 (DCA)",
+            "Comparison": "複数銘柄比較"
         },
         "data_source": "### データソース",
         "source_coingecko": "ソース: CoinGecko API",
@@ -184,6 +390,20 @@ TRANSLATIONS = {
         "progress_bar_title": "### 現在のサイクル進捗 (BTC半減期基準)",
         "recent_price_title": "### 直近の値動き (過去30日間)",
         "chart_price_title": "{coin} 価格 - 30日間",
+        "power_law_title": "### べき乗則レインボー",
+        "power_law_desc": "上場からの日数（BTC はジェネシスブロックから）の対数で対数価格を回帰。帯は残差の ±2 標準偏差で、4年先まで描画します。",
+        "power_law_fair": "べき乗則の適正価格",
+        "power_law_deviation": "乖離",
+        "power_law_band": "レインボー帯",
+        "rainbow_bands": ["投げ売り", "買い", "積み立て", "まだ割安", "ホールド", "バブル？", "売り", "最大バブル"],
+        "power_law_chart": "{coin} べき乗則レインボー",
+        "legend_fair_value": "べき乗則の適正価格",
+        "power_law_all": "全銘柄をフィット",
+        "power_law_table_title": "### べき乗則フィット (USD)",
+        "col_fair_value": "適正価格",
+        "col_last_price": "最新価格",
+        "col_slope": "傾き",
+        "col_r2": "R²",
         
         # Cycle Analysis
         "cycle_title": "🔄 過去のサイクル分析 ({coin})",
@@ -192,6 +412,19 @@ TRANSLATIONS = {
         "full_history_chart": "{coin} 価格履歴",
         "log_scale_label": "対数スケール (Log)",
         "linear_scale_label": "線形スケール (Linear)",
+        "indicators_label": "インジケーター",
+        "indicator_options": {
+            "ma200w": "200週移動平均",
+            "pi_cycle": "Pi Cycle トップ",
+            "mayer": "メイヤー倍数"
+        },
+        "legend_price": "価格",
+        "legend_ma200w": "200週移動平均",
+        "legend_ma111": "111日移動平均",
+        "legend_ma350x2": "2 × 350日移動平均",
+        "legend_pi_top": "Pi Cycle トップシグナル",
+        "mayer_chart": "メイヤー倍数 (価格 / 200日移動平均)",
+        "indicator_summary": "200週移動平均: **{ma200w}** · メイヤー倍数: **{mayer}** · 直近の Pi Cycle トップシグナル: **{pi_top}**",
         "overlay_title": "### サイクル重ね合わせ比較",
         "overlay_desc": "BTC半減期を基準とした価格パフォーマンスの比較。",
         "overlay_chart": "サイクル・パフォーマンス (絶対価格 USD)",
@@ -221,7 +454,13 @@ TRANSLATIONS = {
         "dca_title": "💰 積立投資 (DCA) バックテスト ({coin})",
         "dca_desc": "{coin} のドルコスト平均法 (DCA) 戦略をシミュレーションします。",
         "dca_params": "パラメータ設定",
-        "input_amount": "月間投資額 ($)",
+        "input_amount": "1回あたりの投資額 ($)",
+        "input_frequency": "積立頻度",
+        "frequency_options": {
+            "Daily": "毎日",
+            "Weekly": "毎週",
+            "Monthly": "毎月"
+        },
         "input_start": "開始日",
         "input_end": "終了日",
         "btn_run": "バックテスト実行",
@@ -231,6 +470,73 @@ TRANSLATIONS = {
         "metric_roi": "投資収益率 (ROI)",
         "metric_drawdown": "最大ドローダウン",
         "dca_chart_title": "ポートフォリオ評価額 vs 投資額",
-        "dca_success": "バックテスト完了！"
+        "dca_success": "バックテスト完了！",
+        "sweep_title": "### ROIヒートマップ (開始日 × 保有期間)",
+        "sweep_desc": "選択した頻度で、全履歴の各開始日と保有期間の組み合わせにおけるROI。",
+        "sweep_x": "保有期間 (日)",
+        "sweep_y": "開始日",
+        "strategy_title": "### 戦略比較",
+        "strategy_desc": "同じ金額・頻度・期間で、異なる積立ルールを比較します。",
+        "strategy_names": {
+            "Fixed DCA": "定額積立",
+            "Value Averaging": "バリュー平均法",
+            "Buy the Dip": "押し目買い",
+            "Cycle Weighted": "サイクル加重"
+        },
+        "col_strategy": "戦略",
+        "col_avg_cost": "平均取得単価",
+        "strategy_chart_title": "戦略別ポートフォリオ価値",
+        "lump_title": "### 一括投資 vs 積立投資",
+        "lump_desc": "履歴上のすべての開始日について、同じ資金を初日に一括投資した場合と期間中に積み立てた場合を比較します。",
+        "col_window": "期間",
+        "col_lump_wins": "一括投資の勝率",
+        "col_dca_wins": "積立投資の勝率",
+        "col_lump_median": "一括投資リターン中央値",
+        "col_dca_median": "積立投資リターン中央値",
+        "col_lump_worst": "一括投資の最低リターン",
+        "col_dca_worst": "積立投資の最低リターン",
+        
+        # Comparison
+        "comp_title": "📊 複数銘柄比較",
+        "comp_desc": "基準日の価格を 1.0 として正規化し、価格水準の大きく異なる銘柄を比較します。",
+        "comp_coins": "銘柄",
+        "comp_anchor": "基準",
+        "anchor_options": {
+            "halving": "BTC半減期",
+            "listing": "上場日",
+            "date": "指定日"
+        },
+        "comp_halving": "半減期",
+        "comp_date": "基準日",
+        "comp_axis": "横軸",
+        "axis_options": {
+            "calendar": "カレンダー",
+            "days": "基準日からの日数"
+        },
+        "comp_chart": "基準日比の価格",
+        "comp_x_date": "日付",
+        "comp_x_days": "基準日からの日数",
+        "comp_y": "基準価格に対する倍率",
+        "comp_table_title": "### 基準日以降のパフォーマンス",
+        "col_coin": "銘柄",
+        "col_anchor_date": "基準日",
+        "col_multiple": "現在の倍率",
+        "comp_error": "選択した銘柄のデータがありません。",
+        "corr_title": "### 相関とベータ",
+        "corr_desc": "基準銘柄に対する日次対数リターンのローリング相関とベータ。破線は BTC 半減期です。",
+        "corr_need_two": "相関を比較するには2つ以上の銘柄を選択してください。",
+        "corr_window": "ウィンドウ",
+        "corr_window_days": "{days}日",
+        "corr_measure": "指標",
+        "corr_measures": {
+            "corr": "相関",
+            "beta": "ベータ"
+        },
+        "corr_reference": "基準",
+        "corr_chart": "{coin} に対するローリング{measure} ({days}日ウィンドウ)",
+        "corr_date": "ヒートマップの日付",
+        "corr_heatmap": "{date} の{measure} (行 対 列)",
+        "corr_phase_title": "#### 半減期サイクル別の平均",
+        "col_halving_cycle": "半減期サイクル"
     }
 }
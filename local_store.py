@@ -0,0 +1,395 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from multiprocessing import resource_tracker, shared_memory
+import numpy as np
+import pandas as pd
+from utils import COINS, get_data_version
+
+try:
+    import fcntl
+except ImportError: # Windows: no cross-process locking, every worker may refresh
+    fcntl = None
+
+# Directory holding fetched histories, shared by CLI tools and worker processes
+STORE_DIR = os.environ.get("CCA_STORE_DIR", "data_store")
+
+
+def coin_key(coin_name):
+    """File-name-safe key for a coin (its CoinGecko ID)."""
+    entry = COINS.get(coin_name)
+    return entry[0] if entry else "".join(c if c.isalnum() else "_" for c in coin_name).lower()
+
+
+def _paths(coin_name, store_dir=None):
+    base = os.path.join(store_dir or STORE_DIR, coin_key(coin_name))
+    return base + ".csv", base + ".json"
+
+
+def _write_atomic(path, write):
+    # Write to a temp file and rename, so readers in other processes never see a partial file
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def save_history(coin_name, df, source, extra=None, store_dir=None):
+    """
+    Saves a fetched history to the local store.
+
+    Prices use the same 'timestamp,price' CSV layout as the bundled btc_daily_data.csv; the source,
+    data version and fetch time go to a JSON sidecar.
+
+    Args:
+        coin_name (str): Coin name as listed in COINS.
+        df (pd.DataFrame): History with 'price' column and datetime index.
+        source (str): Source name returned by fetch_coin_history.
+        extra (dict, optional): Additional metadata to store (e.g. the current price).
+        store_dir (str, optional): Store directory (defaults to STORE_DIR).
+    """
+    csv_path, meta_path = _paths(coin_name, store_dir)
+    os.makedirs(os.path.dirname(csv_path) or ".", exist_ok=True)
+
+    prices = df[["price"]].rename_axis("timestamp")
+    _write_atomic(csv_path, lambda p: prices.to_csv(p))
+
+    meta = {
+        "coin": coin_name,
+        "source": source,
+        "data_version": get_data_version(df),
+        "fetched_at": time.time(),
+        **(extra or {})
+    }
+
+    def write_meta(path):
+        with open(path, "w") as f:
+            json.dump(meta, f, default=float)
+
+    _write_atomic(meta_path, write_meta)
+
+
+def load_history(coin_name, max_age=None, store_dir=None):
+    """
+    Loads a history from the local store.
+
+    Args:
+        coin_name (str): Coin name as listed in COINS.
+        max_age (float, optional): Ignore entries fetched more than this many seconds ago.
+        store_dir (str, optional): Store directory (defaults to STORE_DIR).
+
+    Returns:
+        tuple: (DataFrame with 'price' column, metadata dict). Empty DataFrame and None if missing or stale.
+    """
+    csv_path, meta_path = _paths(coin_name, store_dir)
+    if not (os.path.exists(csv_path) and os.path.exists(meta_path)):
+        return pd.DataFrame(), None
+
+    try:
+        with open(meta_path) as f:
+            meta = json.load(f)
+        if max_age is not None and time.time() - meta.get("fetched_at", 0) > max_age:
+            return pd.DataFrame(), None
+
+        df = pd.read_csv(csv_path)
+        df["timestamp"] = pd.to_datetime(df["timestamp"])
+        df.set_index("timestamp", inplace=True)
+        return df, meta
+    except Exception as e:
+        print(f"Error loading {coin_name} from local store: {e}")
+        return pd.DataFrame(), None
+
+
+# --- Shared Cache ---
+# Histories published to shared memory so every worker process on a host maps the same read-only
+# arrays instead of holding its own copy. The on-disk store is the source of truth (and survives
+# restarts); its JSON sidecar names the current segment. Refreshes are serialized with a file lock.
+
+# Only the latest version of every coin stays mapped in a process; older ones are closed when replaced
+_segments = {} # (store, coin key) -> (segment name, SharedMemory)
+_frames = {} # (store, coin key) -> (segment name, DataFrame view), so repeated reads return the same object
+_retired = [] # Replaced segments a caller still held a frame of; closed once those frames are gone
+_process_lock = threading.Lock()
+
+
+@contextmanager
+def _store_lock(coin_name, store_dir=None, blocking=True):
+    """
+    Exclusive per-coin file lock across processes. Yields False if blocking=False and it is taken.
+    """
+    if fcntl is None:
+        yield True
+        return
+
+    lock_path = _paths(coin_name, store_dir)[0][:-len(".csv")] + ".lock"
+    os.makedirs(os.path.dirname(lock_path) or ".", exist_ok=True)
+    with open(lock_path, "a") as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+class _Segment(shared_memory.SharedMemory):
+    def __del__(self):
+        # Frames handed out may outlive the segment object at exit; the mapping then goes with the process
+        try:
+            self.close()
+        except (BufferError, OSError):
+            pass
+
+
+def _untrack(shm):
+    # The resource tracker would unlink the segment when the process that created or attached it
+    # exits (Python < 3.13 registers both); its lifetime is managed through the store instead
+    try:
+        resource_tracker.unregister(shm._name, "shared_memory")
+    except Exception:
+        pass
+
+
+def _unlink(shm):
+    # unlink() also unregisters the name from the resource tracker, which complains about names it
+    # does not know; register it first (a no-op if it already is)
+    resource_tracker.register(shm._name, "shared_memory")
+    shm.unlink()
+
+
+def _segment_name(coin_name, data_version, store_dir=None):
+    # Short and unique per (store, coin, version); macOS limits names to 31 characters
+    key = f"{os.path.abspath(store_dir or STORE_DIR)}|{coin_key(coin_name)}|{data_version}"
+    return "cca_" + hashlib.md5(key.encode("utf-8")).hexdigest()[:20]
+
+
+def _slot(coin_name, store_dir=None):
+    return os.path.abspath(store_dir or STORE_DIR), coin_key(coin_name)
+
+
+def _release_older(slot, name):
+    """
+    Forgets this process's mapping of any other version of a coin than `name`. Call with _process_lock held.
+    """
+    frame = _frames.get(slot)
+    if frame is not None and frame[0] != name:
+        del _frames[slot]
+    segment = _segments.get(slot)
+    if segment is not None and segment[0] != name:
+        del _segments[slot]
+        _retired.append(segment[1])
+    _close_retired()
+
+
+def _close_retired():
+    # Close replaced segments whose frames are gone. Call with _process_lock held
+    still_used = []
+    for shm in _retired:
+        try:
+            shm.close()
+        except BufferError: # A frame handed out earlier is still referenced; try again on the next release
+            still_used.append(shm)
+    _retired[:] = still_used
+
+
+def _publish(coin_name, df, source, store_dir=None):
+    """
+    Writes a history to the on-disk store and to a new shared memory segment. Call with the store lock held.
+    """
+    prices = df["price"].astype(np.float64)
+    prices = prices[~prices.index.duplicated(keep='last')].sort_index()
+    timestamps = prices.index.values.astype("datetime64[ns]").view(np.int64)
+    rows = len(prices)
+
+    data_version = get_data_version(prices.to_frame())
+    name = _segment_name(coin_name, data_version, store_dir)
+    try:
+        shm = _Segment(name=name, create=True, size=max(rows * 16, 1))
+        buffer = np.ndarray((2, rows), dtype=np.int64, buffer=shm.buf)
+        buffer[0] = timestamps
+        buffer[1] = prices.to_numpy().view(np.int64)
+    except FileExistsError:
+        # Same data already published (e.g. the store was rebuilt from disk by another worker)
+        shm = _Segment(name=name)
+    _untrack(shm)
+
+    _, meta_path = _paths(coin_name, store_dir)
+    previous = None
+    if os.path.exists(meta_path):
+        with open(meta_path) as f:
+            previous = json.load(f).get("shm_name")
+
+    # The sidecar is replaced atomically after the segment is complete, so readers never see a partial one
+    save_history(coin_name, prices.to_frame(), source, extra={"rows": rows, "shm_name": name}, store_dir=store_dir)
+
+    if previous and previous != name:
+        # Processes that mapped the old segment keep their mapping; this only removes the name
+        try:
+            old = shared_memory.SharedMemory(name=previous)
+            _unlink(old)
+            old.close()
+        except FileNotFoundError:
+            pass
+
+    slot = _slot(coin_name, store_dir)
+    with _process_lock:
+        _release_older(slot, name)
+        if slot in _segments:
+            shm.close() # Already mapped (republished from disk with the same data)
+        else:
+            _segments[slot] = (name, shm)
+    return name
+
+
+def _attach(meta, store_dir=None):
+    """
+    Returns the read-only DataFrame view of a published segment (None if the segment is gone).
+    """
+    name, rows = meta.get("shm_name"), meta.get("rows")
+    if not name or rows is None:
+        return None
+
+    slot = _slot(meta.get("coin", ""), store_dir)
+    with _process_lock:
+        frame = _frames.get(slot)
+        if frame is not None and frame[0] == name:
+            return frame[1]
+        segment = _segments.get(slot)
+        if segment is not None and segment[0] == name:
+            shm = segment[1]
+        else:
+            try:
+                shm = _Segment(name=name)
+            except FileNotFoundError:
+                return None
+            _untrack(shm)
+            _release_older(slot, name)
+            _segments[slot] = (name, shm)
+
+        # frombuffer holds a buffer export for as long as any view of the frame lives, so closing a
+        # replaced segment fails (and is retried) instead of unmapping memory still in use
+        buffer = np.frombuffer(shm.buf, dtype=np.int64, count=2 * rows).reshape(2, rows)
+        buffer.setflags(write=False)
+        index = pd.DatetimeIndex(buffer[0].view("datetime64[ns]"), name="timestamp")
+        df = pd.DataFrame(buffer[1].view(np.float64).reshape(-1, 1), index=index, columns=["price"], copy=False)
+        _frames[slot] = (name, df)
+        return df
+
+
+def _read_meta(coin_name, store_dir=None):
+    _, meta_path = _paths(coin_name, store_dir)
+    try:
+        with open(meta_path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def shared_history(coin_name, fetch, max_age=3600, store_dir=None):
+    """
+    Returns a coin's history from the host-wide shared cache, refreshing it if it is older than max_age.
+
+    Exactly one process refreshes a coin at a time: the first one to take the coin's file lock fetches
+    and publishes, while the others keep serving the previous version (or, with nothing published yet,
+    wait for the lock and then use what the refresher published).
+
+    Args:
+        coin_name (str): Coin name as listed in COINS.
+        fetch (callable): Called as fetch(coin_name) -> (df, source_used), e.g. utils.fetch_coin_history.
+        max_age (float): Seconds after which the stored history is refreshed.
+        store_dir (str, optional): Store directory (defaults to STORE_DIR).
+
+    Returns:
+        tuple: (read-only DataFrame with 'price' column, metadata dict with 'source' and 'data_version').
+               Empty DataFrame and None if nothing could be fetched.
+    """
+    meta = _read_meta(coin_name, store_dir)
+    fresh = meta is not None and time.time() - meta.get("fetched_at", 0) <= max_age
+    df = _attach(meta, store_dir) if meta else None
+    if fresh and df is not None:
+        return df, meta
+
+    have_stale = df is not None
+    with _store_lock(coin_name, store_dir, blocking=not have_stale) as acquired:
+        if not acquired:
+            return df, meta # Another process is refreshing; serve the previous version meanwhile
+
+        # Someone may have refreshed while we waited for the lock
+        meta = _read_meta(coin_name, store_dir)
+        if meta is not None and time.time() - meta.get("fetched_at", 0) <= max_age:
+            df = _attach(meta, store_dir)
+            if df is None:
+                # Store is fresh but the segment is gone (e.g. /dev/shm was cleared): republish from disk
+                stored, meta = load_history(coin_name, store_dir=store_dir)
+                if not stored.empty:
+                    _publish(coin_name, stored, meta.get("source"), store_dir)
+                    meta = _read_meta(coin_name, store_dir)
+                    df = _attach(meta, store_dir)
+            if df is not None:
+                return df, meta
+
+        fetched, source_used = fetch(coin_name)
+        if fetched.empty:
+            # Keep serving what we have rather than nothing
+            return (df, meta) if have_stale else (pd.DataFrame(), None)
+
+        _publish(coin_name, fetched, source_used, store_dir)
+        meta = _read_meta(coin_name, store_dir)
+        return _attach(meta, store_dir), meta
+
+
+if __name__ == "__main__":
+    import argparse
+    import tempfile
+
+    parser = argparse.ArgumentParser(description="Check that republishing a history leaves one live shared segment per coin.")
+    parser.add_argument("--versions", type=int, default=20, help="Versions to publish per coin")
+    parser.add_argument("--coins", type=int, default=3, help="Synthetic coins")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as store:
+        coins = [f"Check Coin {i}" for i in range(args.coins)]
+        names = {coin: [] for coin in coins}
+        held = []
+        dates = pd.date_range("2020-01-01", periods=365, freq="D")
+        for version in range(args.versions):
+            for coin in coins:
+                # Each version gains a day, as an hourly refresh with a new candle would
+                df = pd.DataFrame({"price": np.arange(len(dates) + version, dtype=float) + 1},
+                                  index=pd.date_range(dates[0], periods=len(dates) + version, freq="D"))
+                names[coin].append(_publish(coin, df, "check", store))
+                held.append(_attach(_read_meta(coin, store), store))
+            held = held[-args.coins:] # Callers drop old frames; the latest ones stay in use
+        with _process_lock:
+            _close_retired()
+
+        failures = []
+        for coin, published in names.items():
+            alive = []
+            for name in published:
+                try:
+                    shm = shared_memory.SharedMemory(name=name)
+                except FileNotFoundError:
+                    continue
+                _untrack(shm)
+                shm.close()
+                alive.append(name)
+            if alive != published[-1:]:
+                failures.append(f"{coin}: {len(alive)} live segments")
+        mapped = sum(1 for slot in _segments if slot[0] == os.path.abspath(store))
+        if mapped != len(coins):
+            failures.append(f"{mapped} segments mapped in this process for {len(coins)} coins")
+        if _retired:
+            failures.append(f"{len(_retired)} replaced segments still mapped")
+
+        for coin in coins:
+            _unlink(_segments[_slot(coin, store)][1])
+
+    if failures:
+        raise SystemExit("FAILED: " + "; ".join(failures))
+    print(f"OK: {args.versions} versions of {len(coins)} coins left {len(coins)} live segments")
@@ -0,0 +1,253 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Latency buckets (seconds) for upstream fetches: fast cache-like answers up to paged full histories
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Exporters configured through the environment (see start_exporters_from_env)
+METRICS_FILE = os.environ.get("CCA_METRICS_FILE")
+METRICS_PORT = os.environ.get("CCA_METRICS_PORT")
+FETCH_LOG = os.environ.get("CCA_FETCH_LOG") # Optional JSON-lines log of every attempt
+
+_lock = threading.Lock()
+_exporter_started = False
+
+
+class Counter:
+    """Monotonic counter with labels."""
+
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help_text = help_text
+        self.values = {}
+
+    def inc(self, labels, amount=1):
+        key = tuple(sorted(labels.items()))
+        with _lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        for key, value in sorted(self.values.items()):
+            lines.append(f"{self.name}{_labels(key)} {_number(value)}")
+        return lines
+
+
+class Histogram:
+    """Cumulative-bucket histogram with labels, in the Prometheus layout."""
+
+    def __init__(self, name, help_text, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets)
+        self.values = {} # label key -> [bucket counts..., sum, count]
+
+    def observe(self, labels, value):
+        key = tuple(sorted(labels.items()))
+        with _lock:
+            state = self.values.setdefault(key, [0] * len(self.buckets) + [0.0, 0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for key, state in sorted(self.values.items()):
+            for bound, count in zip(self.buckets, state):
+                lines.append(f"{self.name}_bucket{_labels(key + (('le', _number(bound)),))} {count}")
+            lines.append(f"{self.name}_bucket{_labels(key + (('le', '+Inf'),))} {state[-1]}")
+            lines.append(f"{self.name}_sum{_labels(key)} {_number(state[-2])}")
+            lines.append(f"{self.name}_count{_labels(key)} {state[-1]}")
+        return lines
+
+
+def _labels(key):
+    if not key:
+        return ""
+    pairs = []
+    for name, value in key:
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{name}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+FETCH_DURATION = Histogram("cca_fetch_duration_seconds", "Duration of upstream fetch attempts.", LATENCY_BUCKETS)
+FETCH_ATTEMPTS = Counter("cca_fetch_attempts_total", "Upstream fetch attempts by source, kind and outcome.")
+FETCH_HTTP = Counter("cca_fetch_http_responses_total", "HTTP responses from upstream sources by status code.")
+FETCH_BYTES = Counter("cca_fetch_bytes_total", "Response bytes received from upstream sources.")
+FETCH_PAGES = Counter("cca_fetch_pages_total", "Pages (requests) made to upstream sources.")
+HISTORY_SERVED = Counter("cca_history_served_total", "Histories returned by fetch_coin_history, by requested mode and source that served them.")
+
+REGISTRY = [FETCH_DURATION, FETCH_ATTEMPTS, FETCH_HTTP, FETCH_BYTES, FETCH_PAGES, HISTORY_SERVED]
+
+# Most recent attempts, for debugging in a REPL or a diagnostics page
+recent_attempts = deque(maxlen=200)
+
+
+class FetchAttempt:
+    """
+    Context manager recording one fetch attempt against an upstream source.
+
+    Usage:
+        with fetch_attempt("Binance", "BTCUSDT") as attempt:
+            response = requests.get(...)
+            attempt.response(response)
+            ...
+            attempt.succeeded(rows)
+
+    An attempt that raises, is marked with failed() or got an HTTP error status (4xx/5xx) is recorded
+    with outcome 'error' (exceptions propagate); one that finishes without succeeded() after only 2xx
+    responses is recorded as 'empty'. succeeded() overrides an earlier error status.
+    """
+
+    def __init__(self, source, symbol, kind="history"):
+        self.source = source
+        self.symbol = symbol
+        self.kind = kind
+        self.pages = 0
+        self.bytes = 0
+        self.status = None
+        self.rows = None
+        self.outcome = "empty"
+        self.error = None
+
+    def response(self, response):
+        """Accounts one HTTP response (a page)."""
+        self.pages += 1
+        self.bytes += len(response.content)
+        self.status = response.status_code
+        FETCH_HTTP.inc({"source": self.source, "status": str(response.status_code)})
+        if response.status_code >= 400:
+            self.outcome = "error"
+            self.error = f"HTTP {response.status_code}"
+
+    def succeeded(self, rows=None):
+        self.outcome = "ok"
+        self.rows = rows
+        self.error = None
+
+    def failed(self, error):
+        """Marks the attempt as failed for errors the caller handles itself."""
+        self.outcome = "error"
+        self.error = f"{type(error).__name__}: {error}"
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        latency = time.perf_counter() - self.started
+        if exc_type is not None:
+            self.outcome = "error"
+            self.error = f"{exc_type.__name__}: {exc}"
+        record_attempt({
+            "time": time.time(),
+            "source": self.source,
+            "symbol": self.symbol,
+            "kind": self.kind,
+            "pages": self.pages,
+            "bytes": self.bytes,
+            "latency": latency,
+            "status": self.status,
+            "rows": self.rows,
+            "outcome": self.outcome,
+            "error": self.error
+        })
+        return False
+
+
+def fetch_attempt(source, symbol, kind="history"):
+    return FetchAttempt(source, symbol, kind)
+
+
+def record_attempt(attempt):
+    """Feeds one attempt record into the metrics, the recent-attempts buffer and the exporters."""
+    labels = {"source": attempt["source"], "kind": attempt["kind"], "outcome": attempt["outcome"]}
+    FETCH_DURATION.observe(labels, attempt["latency"])
+    FETCH_ATTEMPTS.inc(labels)
+    FETCH_PAGES.inc({"source": attempt["source"]}, attempt["pages"])
+    FETCH_BYTES.inc({"source": attempt["source"]}, attempt["bytes"])
+    recent_attempts.append(attempt)
+
+    if FETCH_LOG:
+        with _lock, open(FETCH_LOG, "a") as f:
+            f.write(json.dumps(attempt) + "\n")
+    if METRICS_FILE:
+        write_prometheus(METRICS_FILE)
+
+
+def record_served(mode, source_name):
+    """Counts which source finally served a history (e.g. to alert when Auto mode lands on Yahoo)."""
+    HISTORY_SERVED.inc({"mode": mode, "served_by": source_name})
+
+
+def render_prometheus():
+    """
+    Returns:
+        str: All metrics in the Prometheus text exposition format.
+    """
+    lines = []
+    for metric in REGISTRY:
+        with _lock:
+            lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(path):
+    """Writes the metrics to a file atomically (e.g. for the node_exporter textfile collector)."""
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(render_prometheus())
+    os.replace(tmp_path, path)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_metrics(port, host="127.0.0.1"):
+    """Serves /metrics on a background thread. Returns the server."""
+    server = ThreadingHTTPServer((host, int(port)), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics-exporter", daemon=True).start()
+    return server
+
+
+def start_exporters_from_env():
+    """
+    Starts the /metrics endpoint if CCA_METRICS_PORT is set (once per process; safe to call on every rerun).
+    CCA_METRICS_FILE needs no setup: the file is rewritten after every attempt.
+    """
+    global _exporter_started
+    if not METRICS_PORT:
+        return
+    with _lock:
+        if _exporter_started:
+            return
+        _exporter_started = True
+    try:
+        serve_metrics(METRICS_PORT)
+    except OSError as e:
+        # Another worker on this host already owns the port
+        print(f"Metrics endpoint not started on port {METRICS_PORT}: {e}")
@@ -0,0 +1,223 @@
+import argparse
+import pandas as pd
+import numpy as np
+from dca import _investment_schedule
+
+# Calendar rebalancing rules (first day of each period)
+REBALANCE_RULES = {
+    "Monthly": "MS",
+    "Quarterly": "QS",
+    "Yearly": "YS"
+}
+
+
+def align_prices(histories):
+    """
+    Aligns several price histories on one shared daily calendar.
+
+    Args:
+        histories (dict): Coin name -> DataFrame with 'price' column and datetime index.
+
+    Returns:
+        pd.DataFrame: Date x coin price matrix. Gaps after a coin's first price are forward-filled,
+                      days before it stay NaN.
+    """
+    series = {}
+    for coin_name, df in histories.items():
+        if df is None or df.empty:
+            continue
+        prices = df["price"].dropna()
+        prices.index = prices.index.normalize()
+        series[coin_name] = prices[~prices.index.duplicated(keep='last')].sort_index()
+
+    if not series:
+        return pd.DataFrame()
+    return pd.concat(series, axis=1).sort_index().ffill()
+
+
+def _target_weights(weights, available):
+    """
+    Target weight matrix (dates x assets), renormalized over the assets that have a price on each date.
+    """
+    target = np.where(available, weights[None, :], 0.0)
+    total = target.sum(axis=1, keepdims=True)
+    return np.divide(target, total, out=np.zeros_like(target), where=total > 0)
+
+
+def calculate_portfolio_dca(histories, weights, amount, frequency="Monthly", start_date=None, end_date=None,
+                            rebalance=None, fee_rate=0.0):
+    """
+    Backtests DCA into several coins by target weights, with optional rebalancing.
+
+    All assets are handled as (dates x assets) arrays on the shared daily calendar. Units from the
+    periodic contributions are one cumulative sum; a rebalance only shifts the units of the following
+    segment by a constant, so the loop runs once per rebalance event rather than once per day.
+    Coins that are not listed yet are skipped and their weight is spread over the others.
+
+    Args:
+        histories (dict): Coin name -> DataFrame with 'price' column and datetime index
+                          (or an already aligned date x coin price DataFrame).
+        weights (dict): Coin name -> target weight (normalized automatically).
+        amount (float): Total amount to invest per period in USD.
+        frequency (str): Investment frequency - 'Daily', 'Weekly', or 'Monthly'.
+        start_date (datetime, optional): Start date for the backtest.
+        end_date (datetime, optional): End date for the backtest.
+        rebalance (str or float, optional): 'Monthly', 'Quarterly' or 'Yearly' for calendar rebalancing,
+                                            or a float drift threshold (e.g. 0.05 rebalances when any weight
+                                            is more than 5 percentage points off target). None disables it.
+        fee_rate (float): Fee as a fraction of every traded amount (contributions and rebalances).
+
+    Returns:
+        dict: A dictionary containing:
+              - 'history': Daily DataFrame with 'invested', 'value' and 'roi'.
+              - 'asset_values': Daily DataFrame of the value held in each coin.
+              - 'units': Final units held per coin.
+              - 'weights': Final weights per coin.
+              - 'rebalance_dates': Dates on which the portfolio was rebalanced.
+              - 'total_invested', 'final_value', 'roi', 'max_drawdown', 'fees_paid'.
+              Returns None if the range has no data.
+    """
+    prices = histories if isinstance(histories, pd.DataFrame) else align_prices(histories)
+    coins = [c for c in weights if c in prices.columns]
+    if prices.empty or not coins:
+        return None
+
+    prices = prices[coins]
+    if start_date:
+        prices = prices[prices.index >= pd.to_datetime(start_date)]
+    if end_date:
+        prices = prices[prices.index <= pd.to_datetime(end_date)]
+    prices = prices.dropna(how="all")
+    if prices.empty:
+        return None
+
+    P = prices.to_numpy()
+    available = ~np.isnan(P)
+    market = np.where(available, P, 0.0) # Value-safe prices (unlisted coins are worth 0)
+    safe = np.where(available, P, 1.0) # Division-safe prices
+    target = _target_weights(np.array([weights[c] for c in coins], dtype=float), available)
+    n_days = len(prices)
+
+    # Contributions on the investment dates, split by the target weights of that day
+    _, first, _ = _investment_schedule(pd.Series(0, index=prices.index), frequency)
+    invest_day = np.zeros(n_days, dtype=bool)
+    invest_day[first] = True
+    invest_day &= target.sum(axis=1) > 0
+    contributions = np.where(invest_day[:, None], amount * target, 0.0)
+    accumulated = np.cumsum(contributions * (1 - fee_rate) / safe, axis=0)
+
+    # Rebalancing: units on day t are accumulated[t] + offset of the segment t falls in
+    offsets = [np.zeros(len(coins))]
+    events = []
+    rebalance_fees = 0.0
+
+    def _rebalance(day):
+        nonlocal rebalance_fees
+        units = accumulated[day] + offsets[-1]
+        total = (units * market[day]).sum()
+        if total <= 0:
+            return
+        new_units = total * target[day] / safe[day]
+        fee = np.abs(new_units - units) @ market[day] * fee_rate
+        new_units = (total - fee) * target[day] / safe[day]
+        rebalance_fees += fee
+        offsets.append(new_units - accumulated[day])
+        events.append(day)
+
+    if isinstance(rebalance, str):
+        period_starts = pd.Series(np.arange(n_days), index=prices.index).resample(REBALANCE_RULES[rebalance]).first()
+        for day in period_starts.dropna().astype(int):
+            if day > 0:
+                _rebalance(day)
+    elif rebalance is not None:
+        # Threshold rebalancing: scan forward in growing chunks for the first day the drift exceeds it
+        day = 0
+        while day < n_days - 1:
+            chunk = 64
+            breach = None
+            lo = day + 1
+            while lo < n_days and breach is None:
+                hi = min(lo + chunk, n_days)
+                held = (accumulated[lo:hi] + offsets[-1]) * market[lo:hi]
+                total = held.sum(axis=1, keepdims=True)
+                drift = np.abs(np.divide(held, total, out=np.zeros_like(held), where=total > 0) - target[lo:hi])
+                over = np.flatnonzero((drift.max(axis=1) > rebalance) & (total[:, 0] > 0))
+                if len(over):
+                    breach = lo + over[0]
+                lo = hi
+                chunk *= 2
+            if breach is None:
+                break
+            _rebalance(breach)
+            day = breach
+
+    segment = np.searchsorted(np.array(events, dtype=np.int64), np.arange(n_days), side="right")
+    units = accumulated + np.stack(offsets)[segment]
+    asset_values = units * market
+    value = asset_values.sum(axis=1)
+    invested = np.cumsum(contributions.sum(axis=1))
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        roi = np.where(invested > 0, (value - invested) / invested * 100, np.nan)
+        peak = np.maximum.accumulate(value)
+        drawdown = np.where(peak > 0, (value - peak) / peak, 0.0)
+
+    history = pd.DataFrame({"invested": invested, "value": value, "roi": roi}, index=prices.index)
+    history = history[invested > 0]
+    if history.empty:
+        return None
+
+    return {
+        "history": history,
+        "asset_values": pd.DataFrame(asset_values, index=prices.index, columns=coins).loc[history.index],
+        "units": pd.Series(units[-1], index=coins),
+        "weights": pd.Series(asset_values[-1] / value[-1] if value[-1] > 0 else np.zeros(len(coins)), index=coins),
+        "rebalance_dates": prices.index[events],
+        "total_invested": invested[-1],
+        "final_value": value[-1],
+        "roi": roi[-1],
+        "max_drawdown": drawdown.min() * 100,
+        "fees_paid": contributions.sum() * fee_rate + rebalance_fees
+    }
+
+
+if __name__ == "__main__":
+    from utils import COINS
+    from comparison import fetch_price_matrix
+
+    def _rebalance_arg(value):
+        # A calendar rule name or a drift threshold
+        return value if value in REBALANCE_RULES else float(value)
+
+    parser = argparse.ArgumentParser(description="Backtest DCA into several coins by target weights.")
+    parser.add_argument("--coins", nargs="+", default=["Bitcoin (BTC)", "Ethereum (ETH)"], help="Coin names as listed in utils.COINS")
+    parser.add_argument("--weights", nargs="+", type=float, help="Target weight per coin, in --coins order (default: equal)")
+    parser.add_argument("--amount", type=float, default=500, help="Total USD invested per period")
+    parser.add_argument("--frequency", default="Monthly", choices=["Daily", "Weekly", "Monthly"])
+    parser.add_argument("--start", help="Start date (YYYY-MM-DD)")
+    parser.add_argument("--end", help="End date (YYYY-MM-DD)")
+    parser.add_argument("--rebalance", type=_rebalance_arg,
+                        help=f"{', '.join(REBALANCE_RULES)} or a drift threshold such as 0.05 (default: never)")
+    parser.add_argument("--fee", type=float, default=0.0, help="Fee as a fraction of every trade (e.g. 0.001)")
+    args = parser.parse_args()
+
+    unknown = [c for c in args.coins if c not in COINS]
+    if unknown:
+        parser.error(f"unknown coins: {', '.join(unknown)}")
+    weights = args.weights or [1.0] * len(args.coins)
+    if len(weights) != len(args.coins):
+        parser.error("--weights needs one value per coin")
+
+    prices, _ = fetch_price_matrix(args.coins)
+    result = calculate_portfolio_dca(prices, dict(zip(args.coins, weights)), args.amount, args.frequency,
+                                     args.start, args.end, args.rebalance, args.fee)
+    if result is None:
+        raise SystemExit("Not enough data for the selected coins and range.")
+
+    print(f"Invested      ${result['total_invested']:,.0f}")
+    print(f"Final value   ${result['final_value']:,.0f}")
+    print(f"ROI           {result['roi']:.2f}%")
+    print(f"Max drawdown  {result['max_drawdown']:.2f}%")
+    print(f"Fees paid     ${result['fees_paid']:,.2f}")
+    print(f"Rebalances    {len(result['rebalance_dates'])}")
+    print(pd.DataFrame({"units": result["units"], "weight": result["weights"]}).to_string(float_format="{:.4f}".format))
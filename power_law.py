@@ -0,0 +1,147 @@
+import numpy as np
+import pandas as pd
+
+# Day 0 of the log-time axis. Bitcoin is measured from its genesis block; other coins from the day
+# before their first price (so the first day is day 1 and its log is defined).
+ORIGINS = {
+    "Bitcoin (BTC)": pd.Timestamp("2009-01-03")
+}
+
+# Rainbow band edges in residual standard deviations around the fitted line (8 bands, cheapest first)
+BAND_EDGES = np.linspace(-2.0, 2.0, 9)
+
+# Days the fitted bands are drawn past the last price
+PROJECTION_DAYS = 1460
+
+
+def origins_for(prices):
+    """
+    Day 0 of every column of a price matrix (see ORIGINS).
+
+    Returns:
+        pd.Series: Origin date per column.
+    """
+    first_valid = prices.apply(lambda column: column.first_valid_index())
+    return pd.Series({
+        coin: ORIGINS.get(coin, first - pd.Timedelta(days=1)) for coin, first in first_valid.items()
+    }, dtype="datetime64[ns]")
+
+
+def _log_axes(prices, origins):
+    # x: log10 days since each column's origin; y: log10 price. Cells without a usable point are NaN
+    days = (prices.index.to_numpy()[:, None] - origins.to_numpy()[None, :]) / np.timedelta64(1, "D")
+    values = prices.to_numpy(dtype=np.float64)
+    usable = (days > 0) & (values > 0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        x = np.where(usable, np.log10(days), np.nan)
+        y = np.where(usable, np.log10(values), np.nan)
+    return x, y
+
+
+def _regression_sums(x, y):
+    # Per-column least squares sums in one pass over the matrix, shape (6, columns):
+    # n, sum x, sum y, sum x^2, sum xy, sum y^2 (x = log10 days, y = log10 price)
+    usable = ~np.isnan(y)
+    x0, y0 = np.where(usable, x, 0.0), np.where(usable, y, 0.0)
+    return np.stack([usable.sum(axis=0), x0.sum(axis=0), y0.sum(axis=0),
+                     (x0 * x0).sum(axis=0), (x0 * y0).sum(axis=0), (y0 * y0).sum(axis=0)]).astype(np.float64)
+
+
+def fit_from_sums(sums):
+    """
+    Closed-form least squares line of every column from its regression sums.
+
+    Args:
+        sums (np.ndarray): Shape (6, columns), see _regression_sums.
+
+    Returns:
+        dict: 'intercept', 'slope', 'sigma' (residual standard deviation in log10 units) and 'r2',
+              one array entry per column (NaN where a column has fewer than 3 points).
+    """
+    n, sx, sy, sxx, sxy, syy = sums
+    with np.errstate(invalid="ignore", divide="ignore"):
+        var_x = n * sxx - sx * sx
+        var_y = n * syy - sy * sy
+        cov = n * sxy - sx * sy
+        slope = np.where((n >= 3) & (var_x > 0), cov / var_x, np.nan)
+        intercept = (sy - slope * sx) / n
+        # Residual sum of squares of the fitted line, from the same sums
+        ssr = np.maximum(var_y - slope * cov, 0.0) / n
+        sigma = np.sqrt(ssr / (n - 2))
+        r2 = np.where(var_y > 0, 1 - ssr * n / var_y, np.nan)
+    return {"intercept": intercept, "slope": slope, "sigma": sigma, "r2": r2}
+
+
+def _summarize(prices, origins, x, y, sums):
+    fit = fit_from_sums(sums)
+    # Latest usable point of every column
+    usable = ~np.isnan(y)
+    last = len(y) - 1 - np.argmax(usable[::-1], axis=0)
+    columns = np.arange(y.shape[1])
+    last_x, last_y = x[last, columns], y[last, columns]
+
+    fair = fit["intercept"] + fit["slope"] * last_x
+    with np.errstate(invalid="ignore", divide="ignore"):
+        z = (last_y - fair) / fit["sigma"]
+    band = np.clip(np.searchsorted(BAND_EDGES, z) - 1, 0, len(BAND_EDGES) - 2)
+
+    result = pd.DataFrame({
+        "origin": origins.to_numpy(),
+        "days": sums[0].astype(int),
+        "intercept": fit["intercept"],
+        "slope": fit["slope"],
+        "sigma": fit["sigma"],
+        "r2": fit["r2"],
+        "last_date": prices.index[last],
+        "last_price": 10 ** last_y,
+        "fair_value": 10 ** fair,
+        "z": z,
+        "band": np.where(np.isnan(z), -1, band)
+    }, index=prices.columns)
+    return result[result["days"] >= 3]
+
+
+def fit_power_laws(prices, origins=None):
+    """
+    Fits log10(price) = intercept + slope * log10(days since origin) to every coin at once.
+
+    Every column is solved in closed form from six sums over the matrix, so a batch of all coins
+    costs one vectorized pass.
+
+    Args:
+        prices (pd.DataFrame): Date x coin price matrix (see portfolio.align_prices).
+        origins (pd.Series, optional): Day 0 per coin (default: origins_for(prices)).
+
+    Returns:
+        pd.DataFrame: One row per coin with at least 3 prices, columns
+                      - 'origin', 'days': day 0 and number of fitted days
+                      - 'intercept', 'slope', 'sigma', 'r2': the fit (log10 units)
+                      - 'last_date', 'last_price', 'fair_value': latest price and the fitted line there
+                      - 'z': latest residual in sigmas; 'band': its rainbow band (0 = cheapest, see BAND_EDGES)
+    """
+    if prices.empty:
+        return pd.DataFrame()
+    origins = origins_for(prices) if origins is None else origins.reindex(prices.columns)
+    x, y = _log_axes(prices, origins)
+    return _summarize(prices, origins, x, y, _regression_sums(x, y))
+
+
+def band_prices(fit, start, end=None):
+    """
+    Daily prices of the fitted line and the rainbow band edges of one coin.
+
+    Args:
+        fit (pd.Series): One row of fit_power_laws.
+        start (datetime): First day.
+        end (datetime, optional): Last day (default: PROJECTION_DAYS after the last price).
+
+    Returns:
+        pd.DataFrame: 'fair_value' plus one column per band edge ('edge_0' cheapest), indexed by date.
+    """
+    end = fit["last_date"] + pd.Timedelta(days=PROJECTION_DAYS) if end is None else pd.Timestamp(end)
+    dates = pd.date_range(max(pd.Timestamp(start), fit["origin"] + pd.Timedelta(days=1)), end, freq="D")
+    line = fit["intercept"] + fit["slope"] * np.log10((dates - fit["origin"]).days.to_numpy(dtype=np.float64))
+    columns = {"fair_value": 10 ** line}
+    for i, edge in enumerate(BAND_EDGES):
+        columns[f"edge_{i}"] = 10 ** (line + edge * fit["sigma"])
+    return pd.DataFrame(columns, index=dates)
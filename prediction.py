@@ -39,11 +39,40 @@ def generate_fan_chart_data(df, cycle_data):
     
     # Analyze previous cycles (2 and 3) to get growth multiples
     # Cycle 1 is often an outlier due to extreme volatility, so we focus on 2 and 3 for more realistic projections.
+    proj_df = project_cycle_multipliers(cycle_data, [2, 3])
     
-    multipliers = []
-    max_days = 0
+    # Scale back to absolute prices using the current cycle's start price
+    result = pd.DataFrame()
+    result['days_since_halving'] = proj_df.index
+    result['median_price'] = proj_df['median'] * start_price
+    result['min_price'] = proj_df['min'] * start_price
+    result['max_price'] = proj_df['max'] * start_price
+    
+    # Add actual calendar dates to the projection
+    result['date'] = [start_date + pd.Timedelta(days=d) for d in result['days_since_halving']]
+    
+    return result.set_index('date')
+
+
+def project_cycle_multipliers(cycle_data, reference_cycles, projection_days=1460):
+    """
+    Builds the day-by-day growth multiples (relative to cycle start price) of the reference cycles.
+    
+    This is the cycle-agnostic core of generate_fan_chart_data: it only looks at the reference
+    cycles, so the same table can be reused for any date inside the cycle being projected.
+    
+    Args:
+        cycle_data (dict): Processed cycle data from cycles.py.
+        reference_cycles (list): Cycle numbers whose growth patterns are combined (e.g. [2, 3]).
+        projection_days (int): Number of days after the halving to project (default ~4 years).
+    
+    Returns:
+        pd.DataFrame: DataFrame indexed by days since halving with one 'cycle_N' column per
+                      reference cycle plus 'median', 'min' and 'max' multiplier columns.
+    """
+    multipliers = {}
     
-    for c_num in [2, 3]:
+    for c_num in reference_cycles:
         c_data = cycle_data.get(c_num)
         if c_data:
             c_df = c_data['data']
@@ -55,37 +84,23 @@ def generate_fan_chart_data(df, cycle_data):
                 # We need to re-index by "days since halving" to align timelines
                 c_days = (c_df.index - c_data['start_date']).days
                 
-                # Create a series indexed by days
-                series = pd.Series(c_multipliers.values, index=c_days)
-                multipliers.append(series)
-                
-                if c_days.max() > max_days:
-                    max_days = c_days.max()
+                # Create a series indexed by days (intraday data: keep each day's last observation)
+                c_series = pd.Series(c_multipliers.values, index=c_days)
+                multipliers[c_num] = c_series[~c_series.index.duplicated(keep='last')]
 
     # Create a DataFrame to hold all multipliers aligned by day
     # We project out to 1460 days (approx 4 years) to cover the full expected cycle
-    projection_days = range(0, 1460) 
+    days = range(0, projection_days)
     
-    proj_df = pd.DataFrame(index=projection_days)
+    proj_df = pd.DataFrame(index=days)
     
-    for i, s in enumerate(multipliers):
+    for c_num, s in multipliers.items():
         # Reindex to fill missing days if any using forward fill (propagate last valid observation)
-        s_reindexed = s.reindex(projection_days, method='ffill')
-        proj_df[f'cycle_{i+2}'] = s_reindexed
+        proj_df[f'cycle_{c_num}'] = s.reindex(days, method='ffill')
         
     # Calculate stats for fan chart (Median, Min, Max) across the historical multipliers
     proj_df['median'] = proj_df.median(axis=1)
     proj_df['min'] = proj_df.min(axis=1)
     proj_df['max'] = proj_df.max(axis=1)
     
-    # Scale back to absolute prices using the current cycle's start price
-    result = pd.DataFrame()
-    result['days_since_halving'] = proj_df.index
-    result['median_price'] = proj_df['median'] * start_price
-    result['min_price'] = proj_df['min'] * start_price
-    result['max_price'] = proj_df['max'] * start_price
-    
-    # Add actual calendar dates to the projection
-    result['date'] = [start_date + pd.Timedelta(days=d) for d in result['days_since_halving']]
-    
-    return result.set_index('date')
+    return proj_df
@@ -0,0 +1,154 @@
+import cProfile
+import json
+import os
+import pstats
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+
+# Opt-in: CCA_PROFILE=1 times every rerun of every session (the app also accepts ?profile=1 per session)
+ENABLED = os.environ.get("CCA_PROFILE") == "1"
+
+# Run cProfile on every Nth profiled rerun (0 = never). It makes that rerun noticeably slower.
+CPROFILE_EVERY = int(os.environ.get("CCA_PROFILE_CPROFILE", "0"))
+
+# Per-rerun records are appended here as JSON lines
+PROFILE_LOG = os.environ.get("CCA_PROFILE_LOG", "profile_log.jsonl")
+
+# Functions kept from a cProfile run, by cumulative time
+CPROFILE_TOP = 15
+
+_local = threading.local() # Streamlit runs each script run on its own thread
+_lock = threading.Lock()
+_profiled_runs = 0
+_NO_STAGE = nullcontext()
+
+# Most recent records of all sessions (see recent())
+recent_runs = deque(maxlen=200)
+
+
+class RerunProfile:
+    """Stage timings (and optionally a cProfile run) of one script rerun."""
+
+    def __init__(self, name, context, use_cprofile=False):
+        self.name = name
+        self.context = context
+        self.stages = [] # [name, depth, seconds] in start order; nested stages are included in their parent
+        self.record = None
+        self._depth = 0
+        self._profiler = cProfile.Profile() if use_cprofile else None
+
+    @contextmanager
+    def stage(self, name):
+        entry = [name, self._depth, None]
+        self.stages.append(entry)
+        self._depth += 1
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            entry[2] = time.perf_counter() - started
+            self._depth -= 1
+
+    def _start(self):
+        if self._profiler is not None:
+            try:
+                self._profiler.enable()
+            except ValueError:
+                # Another profiler is already active in this process (Python 3.12+ allows only one)
+                self._profiler = None
+        self.started_at = time.time()
+        self._started = time.perf_counter()
+
+    def _finish(self, error=None):
+        total = time.perf_counter() - self._started
+        if self._profiler is not None:
+            self._profiler.disable()
+
+        stages = [{"name": name, "depth": depth, "ms": seconds * 1000} for name, depth, seconds in self.stages if seconds is not None]
+        self.record = {
+            "time": self.started_at,
+            "name": self.name,
+            **self.context,
+            "total_ms": total * 1000,
+            "other_ms": (total - sum(s for _, depth, s in self.stages if depth == 0 and s is not None)) * 1000,
+            "stages": stages,
+            "error": error,
+            "cprofile": _top_functions(self._profiler) if self._profiler is not None else None
+        }
+        return self.record
+
+
+def _top_functions(profiler, limit=CPROFILE_TOP):
+    stats = pstats.Stats(profiler)
+    rows = []
+    for (filename, line, function), (_, calls, tottime, cumtime, _) in stats.stats.items():
+        rows.append({
+            "function": f"{os.path.basename(filename)}:{line}({function})",
+            "calls": calls,
+            "tottime_ms": tottime * 1000,
+            "cumtime_ms": cumtime * 1000
+        })
+    rows.sort(key=lambda row: row["cumtime_ms"], reverse=True)
+    return rows[:limit]
+
+
+@contextmanager
+def run(name, enabled=ENABLED, log_path=PROFILE_LOG, **context):
+    """
+    Profiles one rerun: stages entered on this thread until the block exits are recorded.
+
+    Nested calls (e.g. a fragment function during a full rerun) join the run that is already active.
+    When disabled this yields None and stage() stays a no-op.
+
+    Args:
+        name (str): What is being run (page or fragment name).
+        enabled (bool): Whether to profile at all.
+        log_path (str, optional): JSON-lines file the record is appended to (None to skip).
+        **context: Extra fields stored in the record (coin, session, ...).
+
+    Yields:
+        RerunProfile or None: The active profile; its .record is filled in once the block exits.
+    """
+    global _profiled_runs
+    current = getattr(_local, "profile", None)
+    if not enabled or current is not None:
+        yield current
+        return
+
+    with _lock:
+        _profiled_runs += 1
+        use_cprofile = CPROFILE_EVERY > 0 and _profiled_runs % CPROFILE_EVERY == 0
+    profile = RerunProfile(name, context, use_cprofile)
+    _local.profile = profile
+    profile._start()
+    error = None
+    try:
+        yield profile
+    except BaseException as e:
+        # st.stop() and st.rerun() end a run with an exception; still record it
+        error = type(e).__name__
+        raise
+    finally:
+        _local.profile = None
+        record = profile._finish(error)
+        recent_runs.append(record)
+        if log_path:
+            with _lock, open(log_path, "a") as f:
+                f.write(json.dumps(record, default=str) + "\n")
+
+
+def stage(name):
+    """Times a block as a stage of the active run; a shared no-op context when nothing is profiled."""
+    profile = getattr(_local, "profile", None)
+    return _NO_STAGE if profile is None else profile.stage(name)
+
+
+def recent(session=None, limit=20):
+    """
+    Returns:
+        list: The latest records (oldest first), optionally only those of one session.
+    """
+    runs = [r for r in list(recent_runs) if session is None or r.get("session") == session]
+    return runs[-limit:]
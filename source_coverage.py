@@ -0,0 +1,114 @@
+import json
+import os
+import threading
+import time
+import pandas as pd
+
+# Coverage matrix written by diagnose_sources.py and read by Auto mode in utils.fetch_coin_history
+COVERAGE_FILE = os.environ.get("CCA_COVERAGE_FILE", "source_coverage.json")
+
+# Older matrices are ignored: listings, delistings and rate limits change
+COVERAGE_MAX_AGE = 7 * 24 * 3600
+
+# A source is complete for a coin when it starts within START_TOLERANCE_DAYS of the earliest source,
+# is at most STALE_DAYS behind today and has no hole longer than MAX_GAP_DAYS
+START_TOLERANCE_DAYS = 30
+STALE_DAYS = 3
+MAX_GAP_DAYS = 7
+
+_lock = threading.Lock()
+_loaded = {"path": None, "mtime": None, "matrix": None}
+
+
+def summarize_history(df, now=None):
+    """
+    Describes what a fetched history covers.
+
+    Returns:
+        dict: rows, first and last date (ISO), days_behind (today minus last date), missing_days
+              and max_gap_days (longest hole between consecutive days). Empty histories give rows=0.
+    """
+    if df is None or df.empty:
+        return {"rows": 0, "first": None, "last": None, "days_behind": None, "missing_days": None, "max_gap_days": None}
+
+    days = pd.DatetimeIndex(df.index).normalize().unique().sort_values()
+    steps = days.to_series().diff().dt.days.dropna()
+    now = pd.Timestamp.now() if now is None else pd.Timestamp(now)
+    return {
+        "rows": int(len(df)),
+        "first": days[0].date().isoformat(),
+        "last": days[-1].date().isoformat(),
+        "days_behind": int((now.normalize() - days[-1]).days),
+        "missing_days": int((steps - 1).clip(lower=0).sum()),
+        "max_gap_days": int(steps.max() - 1) if len(steps) else 0
+    }
+
+
+def choose_source(checks):
+    """
+    Picks the fastest complete source for one coin.
+
+    Args:
+        checks (dict): Source name -> check result (summarize_history fields plus 'latency').
+
+    Returns:
+        tuple: (preferred source or None, list of complete sources fastest first).
+    """
+    available = {source: c for source, c in checks.items() if c.get("rows")}
+    if not available:
+        return None, []
+
+    earliest = min(pd.Timestamp(c["first"]) for c in available.values())
+    complete = [
+        source for source, c in available.items()
+        if (pd.Timestamp(c["first"]) - earliest).days <= START_TOLERANCE_DAYS
+        and c["days_behind"] <= STALE_DAYS
+        and c["max_gap_days"] <= MAX_GAP_DAYS
+    ]
+    complete.sort(key=lambda source: available[source]["latency"])
+    return (complete[0] if complete else None), complete
+
+
+def save_coverage(matrix, path=None):
+    """Writes a coverage matrix atomically (readers in other processes never see a partial file)."""
+    path = path or COVERAGE_FILE
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(matrix, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def load_coverage(path=None, max_age=COVERAGE_MAX_AGE):
+    """
+    Loads the coverage matrix, re-reading the file only when it changed.
+
+    Returns:
+        dict or None: The matrix, or None if there is none or it is older than max_age seconds.
+    """
+    path = path or COVERAGE_FILE
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+
+    with _lock:
+        if _loaded["path"] != path or _loaded["mtime"] != mtime:
+            try:
+                with open(path) as f:
+                    matrix = json.load(f)
+            except (OSError, ValueError):
+                return None
+            _loaded.update(path=path, mtime=mtime, matrix=matrix)
+        matrix = _loaded["matrix"]
+
+    if max_age is not None and time.time() - matrix.get("generated_at", 0) > max_age:
+        return None
+    return matrix
+
+
+def preferred_source(coin_name, path=None):
+    """The fastest complete source for a coin according to the coverage matrix (None if unknown)."""
+    matrix = load_coverage(path)
+    if not matrix:
+        return None
+    return matrix.get("coins", {}).get(coin_name, {}).get("preferred")
@@ -0,0 +1,149 @@
+import pandas as pd
+import numpy as np
+from cycles import HALVING_DATES
+from dca import _prepare_prices, _investment_schedule, _scenario_positions
+
+# Example strategy set: each strategy is a dict with a 'name', a 'rule' (key of RULES) and its parameters
+DEFAULT_STRATEGIES = [
+    {"name": "Fixed DCA", "rule": "fixed", "amount": 500},
+    # Keep the holding worth at least amount x number of periods, topping up when it falls short
+    {"name": "Value Averaging", "rule": "value_averaging", "amount": 500},
+    # Multiply the amount when price is X% below its all-time high
+    {"name": "Buy the Dip", "rule": "drawdown", "amount": 500, "tiers": {0.3: 2.0, 0.5: 3.0, 0.7: 4.0}},
+    # Weight per year since the last BTC halving (year 1, 2, 3, 4+): buy more in the bear/accumulation years
+    {"name": "Cycle Weighted", "rule": "cycle_phase", "amount": 500, "phase_weights": [0.5, 1.0, 2.0, 1.5]}
+]
+
+
+def _fixed_rule(strategy, ctx):
+    """Same amount every period (plain DCA)."""
+    return np.full(len(ctx["price"]), float(strategy["amount"]))
+
+
+def _value_averaging_rule(strategy, ctx):
+    """
+    Value averaging without selling: the holding must be worth at least amount x period.
+
+    Without sells the units held follow units_t = max(units_t-1, target_t / price_t), which is a
+    running maximum, so the whole path is one np.maximum.accumulate call.
+    """
+    target_value = float(strategy["amount"]) * ctx["period"]
+    units = np.maximum.accumulate(target_value / ctx["price"])
+    units_bought = np.diff(units, prepend=0.0)
+    # Cash needed so that, after fees and slippage, exactly units_bought end up in the holding
+    return units_bought * ctx["exec_price"] / (1 - ctx["fee_rate"])
+
+
+def _drawdown_rule(strategy, ctx):
+    """Amount multiplied by the highest tier whose drawdown from the all-time high is reached."""
+    tiers = sorted(strategy.get("tiers", {}).items(), reverse=True)
+    if not tiers:
+        return float(strategy["amount"]) * np.ones_like(ctx["drawdown"])
+    conditions = [ctx["drawdown"] >= level for level, _ in tiers]
+    multipliers = [mult for _, mult in tiers]
+    return float(strategy["amount"]) * np.select(conditions, multipliers, default=1.0)
+
+
+def _cycle_phase_rule(strategy, ctx):
+    """Amount weighted by the number of full years since the most recent BTC halving."""
+    weights = np.asarray(strategy.get("phase_weights", [1.0]), dtype=float)
+    phase = np.minimum(ctx["days_since_halving"] // 365, len(weights) - 1)
+    return float(strategy["amount"]) * weights[phase]
+
+
+# Rule name -> function(strategy, ctx) returning the cash to spend at every investment date
+RULES = {
+    "fixed": _fixed_rule,
+    "value_averaging": _value_averaging_rule,
+    "drawdown": _drawdown_rule,
+    "cycle_phase": _cycle_phase_rule
+}
+
+
+def _days_since_halving(dates):
+    """
+    Days since the most recent halving in HALVING_DATES for each date.
+    """
+    halvings = pd.to_datetime(sorted(HALVING_DATES.values())).values
+    dates = np.asarray(dates, dtype="datetime64[ns]")
+    idx = np.maximum(np.searchsorted(halvings, dates, side="right") - 1, 0)
+    return np.maximum((dates - halvings[idx]).astype("timedelta64[D]").astype(np.int64), 0)
+
+
+def run_strategies(df, strategies=DEFAULT_STRATEGIES, frequency="Monthly", start_date=None, end_date=None,
+                   fee_rate=0.0, slippage=0.0):
+    """
+    Backtests several accumulation strategies side by side on the same investment calendar.
+
+    Every rule is a vectorized expression over the investment dates; the resulting cash flows are
+    stacked into a (dates x strategies) matrix and accumulated with one cumulative sum per quantity.
+
+    Args:
+        df (pd.DataFrame): DataFrame with 'price' column and datetime index.
+        strategies (list): Strategy dicts with 'name', 'rule' (see RULES) and the rule's parameters.
+        frequency (str): Investment frequency - 'Daily', 'Weekly', or 'Monthly'.
+        start_date (datetime, optional): Start date for the backtest.
+        end_date (datetime, optional): End date for the backtest.
+        fee_rate (float): Exchange fee as a fraction of each purchase (e.g. 0.001 for 0.1%).
+        slippage (float): Execution price markup as a fraction of the price.
+
+    Returns:
+        dict: A dictionary containing:
+              - 'summary': DataFrame per strategy with 'total_invested', 'final_value', 'units',
+                'avg_cost', 'fees_paid', 'roi' and 'max_drawdown'.
+              - 'invested', 'value', 'units': DataFrames (dates x strategies) of the running totals.
+              Returns None if the range has no data.
+    """
+    if df.empty or not strategies:
+        return None
+
+    prices = _prepare_prices(df)
+    schedule = _investment_schedule(prices, frequency)
+    dates, positions = _scenario_positions(prices, schedule, start_date, end_date)
+    if positions is None:
+        return None
+
+    all_prices = prices.to_numpy()
+    price = all_prices[positions]
+    ath = np.maximum.accumulate(all_prices)[positions] # All-time high up to each investment date
+
+    ctx = {
+        "price": price,
+        "exec_price": price * (1 + slippage),
+        "fee_rate": fee_rate,
+        "period": np.arange(1, len(price) + 1),
+        "drawdown": 1 - price / ath,
+        "days_since_halving": _days_since_halving(dates)
+    }
+
+    cash = np.column_stack([RULES[s["rule"]](s, ctx) for s in strategies])
+    units_bought = cash * (1 - fee_rate) / ctx["exec_price"][:, None]
+
+    invested = np.cumsum(cash, axis=0)
+    units = np.cumsum(units_bought, axis=0)
+    value = units * price[:, None]
+
+    # Max drawdown of each strategy's portfolio value
+    peak = np.maximum.accumulate(value, axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        drawdown = np.where(peak > 0, (value - peak) / peak, 0.0)
+
+    names = [s["name"] for s in strategies]
+    index = pd.DatetimeIndex(np.asarray(dates), name="date")
+
+    summary = pd.DataFrame({
+        "total_invested": invested[-1],
+        "final_value": value[-1],
+        "units": units[-1],
+        "avg_cost": invested[-1] / units[-1],
+        "fees_paid": cash.sum(axis=0) * fee_rate,
+        "roi": (value[-1] - invested[-1]) / invested[-1] * 100,
+        "max_drawdown": drawdown.min(axis=0) * 100
+    }, index=pd.Index(names, name="strategy"))
+
+    return {
+        "summary": summary,
+        "invested": pd.DataFrame(invested, index=index, columns=names),
+        "value": pd.DataFrame(value, index=index, columns=names),
+        "units": pd.DataFrame(units, index=index, columns=names)
+    }
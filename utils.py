@@ -1,10 +1,15 @@
 import requests
 import pandas as pd
-import streamlit as st
-import yfinance as yf
 import time
 import os
 from datetime import datetime
+from metrics import fetch_attempt, record_served
+from source_coverage import preferred_source
+
+# This module has no Streamlit dependency so CLI tools and workers can use it; app.py wraps the
+# fetch functions in its caches. yfinance is imported only on the Yahoo paths (it is slow to import).
+# Every upstream attempt is recorded with metrics.fetch_attempt (source, symbol, pages, bytes,
+# latency, HTTP status, outcome), including the ones whose errors are swallowed below.
 
 # CoinGecko API URL
 BASE_URL = "https://api.coingecko.com/api/v3"
@@ -39,23 +44,27 @@ def fetch_coin_history_yahoo(ticker_symbol):
         pd.DataFrame: DataFrame containing 'price' column indexed by datetime.
     """
     try:
-        ticker = yf.Ticker(ticker_symbol)
-        
-        # Fetch max history
-        hist = ticker.history(period="max")
-        
-        if hist.empty:
-            return pd.DataFrame()
+        with fetch_attempt("Yahoo", ticker_symbol) as attempt:
+            import yfinance as yf
+            ticker = yf.Ticker(ticker_symbol)
             
-        # Standardize columns to match our app's expectation
-        # We need index as datetime and a 'price' column
-        df = pd.DataFrame()
-        df["price"] = hist["Close"]
-        
-        # Ensure index is timezone-naive or matches app logic
-        df.index = df.index.tz_localize(None)
-        
-        return df
+            # Fetch max history
+            hist = ticker.history(period="max")
+            attempt.pages = 1
+            
+            if hist.empty:
+                return pd.DataFrame()
+                
+            # Standardize columns to match our app's expectation
+            # We need index as datetime and a 'price' column
+            df = pd.DataFrame()
+            df["price"] = hist["Close"]
+            
+            # Ensure index is timezone-naive or matches app logic
+            df.index = df.index.tz_localize(None)
+            
+            attempt.succeeded(len(df))
+            return df
     except Exception as e:
         print(f"Error fetching data for {ticker_symbol} from Yahoo Finance: {e}")
         return pd.DataFrame()
@@ -82,56 +91,60 @@ def fetch_coin_history_binance(symbol):
     # We fetch in chunks
     current_start = start_ts
     
-    try:
-        while True:
-            params = {
-                "symbol": symbol,
-                "interval": "1d",
-                "startTime": current_start,
-                "limit": 1000
-            }
-            
-            response = requests.get(base_url, params=params)
-            
-            if response.status_code != 200:
-                break
+    with fetch_attempt("Binance", symbol) as attempt:
+        try:
+            while True:
+                params = {
+                    "symbol": symbol,
+                    "interval": "1d",
+                    "startTime": current_start,
+                    "limit": 1000
+                }
+                
+                response = requests.get(base_url, params=params, timeout=10)
+                attempt.response(response)
                 
-            data = response.json()
-            if not data:
-                break
+                if response.status_code != 200:
+                    break
+                    
+                data = response.json()
+                if not data:
+                    break
+                    
+                all_data.extend(data)
                 
-            all_data.extend(data)
+                # Last timestamp
+                last_close_time = data[-1][6]
+                current_start = last_close_time + 1
+                
+                if current_start >= end_ts:
+                    break
+                    
+                # Rate limit protection
+                time.sleep(0.1)
+                
+            if not all_data:
+                return pd.DataFrame()
+
+            # Parse data
+            # Binance kline: [open_time, open, high, low, close, vol, close_time...]
+            df = pd.DataFrame(all_data, columns=[
+                "open_time", "open", "high", "low", "close", "volume", 
+                "close_time", "quote_asset_volume", "number_of_trades", 
+                "taker_buy_base_asset_volume", "taker_buy_quote_asset_volume", "ignore"
+            ])
             
-            # Last timestamp
-            last_close_time = data[-1][6]
-            current_start = last_close_time + 1
+            df["timestamp"] = pd.to_datetime(df["open_time"], unit="ms")
+            df["price"] = df["close"].astype(float)
+            df.set_index("timestamp", inplace=True)
             
-            if current_start >= end_ts:
-                break
-                
-            # Rate limit protection
-            time.sleep(0.1)
+            attempt.succeeded(len(df))
+            return df[["price"]]
             
-        if not all_data:
+        except Exception as e:
+            attempt.failed(e)
             return pd.DataFrame()
 
-        # Parse data
-        # Binance kline: [open_time, open, high, low, close, vol, close_time...]
-        df = pd.DataFrame(all_data, columns=[
-            "open_time", "open", "high", "low", "close", "volume", 
-            "close_time", "quote_asset_volume", "number_of_trades", 
-            "taker_buy_base_asset_volume", "taker_buy_quote_asset_volume", "ignore"
-        ])
-        
-        df["timestamp"] = pd.to_datetime(df["open_time"], unit="ms")
-        df["price"] = df["close"].astype(float)
-        df.set_index("timestamp", inplace=True)
-        
-        return df[["price"]]
-        
-    except Exception as e:
-        return pd.DataFrame()
-
 def fetch_coin_history_okex(inst_id):
     """
     Fetches historical data from OKEx API.
@@ -144,87 +157,112 @@ def fetch_coin_history_okex(inst_id):
     all_data = []
     end_ts = None
     
-    try:
-        # Fetch up to ~1000 days
-        for _ in range(10): 
-            params = {
-                "instId": inst_id,
-                "bar": "1D",
-                "limit": "100"
-            }
-            if end_ts:
-                params["after"] = end_ts
-                
-            response = requests.get(base_url, params=params, timeout=5)
-            if response.status_code != 200:
-                break
-                
-            data = response.json().get("data", [])
-            if not data:
-                break
+    with fetch_attempt("OKEx", inst_id) as attempt:
+        try:
+            # Fetch up to ~1000 days
+            for _ in range(10): 
+                params = {
+                    "instId": inst_id,
+                    "bar": "1D",
+                    "limit": "100"
+                }
+                if end_ts:
+                    params["after"] = end_ts
+                    
+                response = requests.get(base_url, params=params, timeout=5)
+                attempt.response(response)
+                if response.status_code != 200:
+                    break
+                    
+                data = response.json().get("data", [])
+                if not data:
+                    break
+                    
+                all_data.extend(data)
+                end_ts = data[-1][0] # Timestamp of the last candle
+                time.sleep(0.1)
                 
-            all_data.extend(data)
-            end_ts = data[-1][0] # Timestamp of the last candle
-            time.sleep(0.1)
-            
-        # If history empty, try recent candles
-        if not all_data:
-             base_url_recent = "https://www.okx.com/api/v5/market/candles"
-             response = requests.get(base_url_recent, params={"instId": inst_id, "bar": "1D", "limit": "100"}, timeout=5)
-             if response.status_code == 200:
-                 all_data = response.json().get("data", [])
+            # If history empty, try recent candles
+            if not all_data:
+                 base_url_recent = "https://www.okx.com/api/v5/market/candles"
+                 response = requests.get(base_url_recent, params={"instId": inst_id, "bar": "1D", "limit": "100"}, timeout=5)
+                 attempt.response(response)
+                 if response.status_code == 200:
+                     all_data = response.json().get("data", [])
 
-        if not all_data:
-            return pd.DataFrame()
+            if not all_data:
+                return pd.DataFrame()
 
-        # OKEx data: [ts, o, h, l, c, vol, volCcy, volCcyQuote, confirm]
-        df = pd.DataFrame(all_data, columns=["ts", "o", "h", "l", "c", "vol", "volCcy", "volCcyQuote", "confirm"])
-        df["timestamp"] = pd.to_datetime(df["ts"].astype(int), unit="ms")
-        df["price"] = df["c"].astype(float)
-        df.set_index("timestamp", inplace=True)
-        df.sort_index(inplace=True)
-        
-        return df[["price"]]
-        
-    except Exception as e:
-        print(f"Error fetching OKEx history: {e}")
-        return pd.DataFrame()
+            # OKEx data: [ts, o, h, l, c, vol, volCcy, volCcyQuote, confirm]
+            df = pd.DataFrame(all_data, columns=["ts", "o", "h", "l", "c", "vol", "volCcy", "volCcyQuote", "confirm"])
+            df["timestamp"] = pd.to_datetime(df["ts"].astype(int), unit="ms")
+            df["price"] = df["c"].astype(float)
+            df.set_index("timestamp", inplace=True)
+            df.sort_index(inplace=True)
+            
+            attempt.succeeded(len(df))
+            return df[["price"]]
+            
+        except Exception as e:
+            attempt.failed(e)
+            print(f"Error fetching OKEx history: {e}")
+            return pd.DataFrame()
 
 def fetch_current_price_okex(inst_id):
     """
     Fetches the current price from OKEx.
     """
-    try:
-        url = "https://www.okx.com/api/v5/market/ticker"
-        params = {"instId": inst_id}
-        response = requests.get(url, params=params, timeout=3)
-        if response.status_code == 200:
-            data = response.json().get("data", [])
-            if data:
-                ticker = data[0]
-                last = float(ticker["last"])
-                open24 = float(ticker["open24h"])
-                change = ((last - open24) / open24) * 100 if open24 else 0
-                return {
-                    "usd": last,
-                    "usd_24h_change": change
-                }
-    except Exception as e:
-        pass
-    return None
+    with fetch_attempt("OKEx", inst_id, kind="price") as attempt:
+        try:
+            url = "https://www.okx.com/api/v5/market/ticker"
+            params = {"instId": inst_id}
+            response = requests.get(url, params=params, timeout=3)
+            attempt.response(response)
+            if response.status_code == 200:
+                data = response.json().get("data", [])
+                if data:
+                    ticker = data[0]
+                    last = float(ticker["last"])
+                    open24 = float(ticker["open24h"])
+                    change = ((last - open24) / open24) * 100 if open24 else 0
+                    attempt.succeeded()
+                    return {
+                        "usd": last,
+                        "usd_24h_change": change
+                    }
+        except Exception as e:
+            attempt.failed(e)
+        return None
 
-@st.cache_data(ttl=3600)  # Cache for 1 hour
 def fetch_coin_history(coin_name, api_key=None, source="Auto"):
     """
     Fetches the entire price history of a coin.
     Source can be: "Auto", "CoinGecko", "Binance", "Yahoo", "OKEx"
+    
+    Returns:
+        tuple: (DataFrame with 'price' column, name of the source that served it)
+    """
+    df, source_name = _fetch_coin_history(coin_name, api_key, source)
+    # Which source finally served the request (e.g. Auto mode falling through to Yahoo)
+    record_served(source, source_name if not df.empty else "None")
+    return df, source_name
+
+def coin_symbols(coin_name):
+    """
+    Returns:
+        tuple: (CoinGecko ID, Yahoo ticker, Binance symbol, OKEx instrument) of a coin (BTC for unknown names).
     """
     entry = COINS.get(coin_name, ("bitcoin", "BTC-USD", "BTCUSDT", "BTC-USDT"))
     if len(entry) == 4:
-        cg_id, yahoo_ticker, binance_symbol, okex_symbol = entry
-    else:
-        cg_id, yahoo_ticker, binance_symbol = entry
-        okex_symbol = binance_symbol.replace("USDT", "-USDT")
+        return entry
+    cg_id, yahoo_ticker, binance_symbol = entry
+    return cg_id, yahoo_ticker, binance_symbol, binance_symbol.replace("USDT", "-USDT")
+
+# Auto mode step that serves each source checked by diagnose_sources.py (Yahoo and Binance are merged)
+AUTO_STEPS = {"CoinGecko": "CoinGecko", "OKEx": "OKEx", "Yahoo": "Merged", "Binance": "Merged"}
+
+def _fetch_coin_history(coin_name, api_key=None, source="Auto"):
+    cg_id, yahoo_ticker, binance_symbol, okex_symbol = coin_symbols(coin_name)
     
     # Logic for Source Selection
     
@@ -248,18 +286,33 @@ def fetch_coin_history(coin_name, api_key=None, source="Auto"):
         
     # 5. Auto Mode (Default)
     # Priority: CoinGecko (Best Data) -> OKEx (For HYPE etc) -> Combine(Yahoo + Binance)
+    # If the coverage matrix from diagnose_sources.py names the fastest complete source for this coin,
+    # its step goes first instead of being reached through the failures of the others.
+    steps = ["CoinGecko", "OKEx", "Merged"]
+    preferred = AUTO_STEPS.get(preferred_source(coin_name))
+    if preferred:
+        steps.remove(preferred)
+        steps.insert(0, preferred)
     
-    # Try CoinGecko first (even without key, for best history coverage)
-    df_cg = _fetch_coingecko(cg_id, api_key)
-    if not df_cg.empty: 
-        return df_cg, "CoinGecko"
-        
-    # Try OKEx
-    df_okex = fetch_coin_history_okex(okex_symbol)
-    if not df_okex.empty:
-        return df_okex, "OKEx"
-        
-    # If CoinGecko/OKEx fails, we try to combine Yahoo (longer history) and Binance (better quality recent)
+    merged = None
+    for step in steps:
+        if step == "CoinGecko":
+            # Try CoinGecko (even without key, for best history coverage)
+            df_cg = _fetch_coingecko(cg_id, api_key)
+            if not df_cg.empty: 
+                return df_cg, "CoinGecko"
+        elif step == "OKEx":
+            df_okex = fetch_coin_history_okex(okex_symbol)
+            if not df_okex.empty:
+                return df_okex, "OKEx"
+        else:
+            # Combine Yahoo (longer history) and Binance (better quality recent)
+            merged = _fetch_merged(cg_id, yahoo_ticker, binance_symbol)
+            if not merged[0].empty:
+                return merged
+    return merged
+
+def _fetch_merged(cg_id, yahoo_ticker, binance_symbol):
     df_yahoo = fetch_coin_history_yahoo(yahoo_ticker)
     df_binance = fetch_coin_history_binance(binance_symbol)
     
@@ -271,10 +324,7 @@ def fetch_coin_history(coin_name, api_key=None, source="Auto"):
         try:
             local_file = "btc_daily_data.csv"
             if os.path.exists(local_file):
-                df_local = pd.read_csv(local_file)
-                df_local["timestamp"] = pd.to_datetime(df_local["timestamp"])
-                df_local.set_index("timestamp", inplace=True)
-                df_local.index = df_local.index.tz_localize(None)
+                df_local = load_local_history(local_file)
         except:
             pass
             
@@ -283,14 +333,35 @@ def fetch_coin_history(coin_name, api_key=None, source="Auto"):
         try:
             local_file = "eth_early_2015_2017.csv"
             if os.path.exists(local_file):
-                df_local = pd.read_csv(local_file)
-                df_local["timestamp"] = pd.to_datetime(df_local["timestamp"])
-                df_local.set_index("timestamp", inplace=True)
-                # Ensure index is timezone-naive
-                df_local.index = df_local.index.tz_localize(None)
+                df_local = load_local_history(local_file)
         except Exception as e:
             pass # Ignore if local file fails
 
+    return merge_histories(df_local, df_yahoo, df_binance)
+
+def load_local_history(path):
+    """
+    Loads a bundled 'timestamp,price' CSV (e.g. btc_daily_data.csv).
+    
+    Returns:
+        pd.DataFrame: DataFrame containing 'price' column indexed by timezone-naive datetime.
+    """
+    df_local = pd.read_csv(path)
+    df_local["timestamp"] = pd.to_datetime(df_local["timestamp"])
+    df_local.set_index("timestamp", inplace=True)
+    # Ensure index is timezone-naive
+    df_local.index = df_local.index.tz_localize(None)
+    return df_local
+
+def merge_histories(df_local, df_yahoo, df_binance):
+    """
+    Combines the fallback sources into one history.
+    
+    Priority: Local (Oldest) -> Yahoo (Middle) -> Binance (Newest). Any of the inputs may be empty.
+    
+    Returns:
+        tuple: (merged DataFrame, source name). Empty DataFrame and "None" if all inputs are empty.
+    """
     # Merge Logic
     # Priority: Local (Oldest) -> Yahoo (Middle) -> Binance (Newest)
     
@@ -344,6 +415,18 @@ def fetch_coin_history(coin_name, api_key=None, source="Auto"):
         
     return pd.DataFrame(), "None"
 
+def get_data_version(df):
+    """
+    Returns a short fingerprint of a price history.
+
+    Derived data (downsampled charts, projections, ...) is cached per (coin, data version), so it is
+    recomputed exactly when the underlying history changes.
+    """
+    if df.empty:
+        return "empty"
+    digest = pd.util.hash_pandas_object(df["price"], index=True).to_numpy().sum()
+    return f"{len(df)}-{int(digest) & 0xFFFFFFFFFFFF:012x}"
+
 def _fetch_coingecko(cg_id, api_key):
     url = f"{BASE_URL}/coins/{cg_id}/market_chart"
     params = {
@@ -355,52 +438,53 @@ def _fetch_coingecko(cg_id, api_key):
     if api_key:
         headers["x-cg-demo-api-key"] = api_key
     
-    try:
-        # Short timeout to avoid hanging if rate limited
-        response = requests.get(url, params=params, headers=headers, timeout=5)
-        if response.status_code == 200:
-            data = response.json()
-            prices = data.get("prices", [])
-            df = pd.DataFrame(prices, columns=["timestamp", "price"])
-            df["timestamp"] = pd.to_datetime(df["timestamp"], unit="ms")
-            df.set_index("timestamp", inplace=True)
-            return df
-    except:
-        pass
-    return pd.DataFrame()
+    with fetch_attempt("CoinGecko", cg_id) as attempt:
+        try:
+            # Short timeout to avoid hanging if rate limited
+            response = requests.get(url, params=params, headers=headers, timeout=5)
+            attempt.response(response)
+            if response.status_code == 200:
+                data = response.json()
+                prices = data.get("prices", [])
+                df = pd.DataFrame(prices, columns=["timestamp", "price"])
+                df["timestamp"] = pd.to_datetime(df["timestamp"], unit="ms")
+                df.set_index("timestamp", inplace=True)
+                if not df.empty:
+                    attempt.succeeded(len(df))
+                return df
+        except Exception as e:
+            attempt.failed(e)
+        return pd.DataFrame()
 
-@st.cache_data(ttl=300)
 def fetch_current_price(coin_name, api_key=None):
     """
     Fetches the current price of a coin.
     """
-    entry = COINS.get(coin_name, ("bitcoin", "BTC-USD", "BTCUSDT", "BTC-USDT"))
-    if len(entry) == 4:
-        cg_id, yahoo_ticker, binance_symbol, okex_symbol = entry
-    else:
-        cg_id, yahoo_ticker, binance_symbol = entry
-        okex_symbol = binance_symbol.replace("USDT", "-USDT")
+    cg_id, yahoo_ticker, binance_symbol, okex_symbol = coin_symbols(coin_name)
 
     # Try CoinGecko first
     # Even without key, we try it once (it might work and has best data)
-    try:
-        url = f"{BASE_URL}/simple/price"
-        params = {
-            "ids": cg_id,
-            "vs_currencies": "usd",
-            "include_24hr_change": "true"
-        }
-        headers = {}
-        if api_key:
-            headers["x-cg-demo-api-key"] = api_key
-        
-        response = requests.get(url, params=params, headers=headers, timeout=3)
-        if response.status_code == 200:
-            data = response.json()
-            if cg_id in data:
-                return data[cg_id]
-    except:
-        pass
+    with fetch_attempt("CoinGecko", cg_id, kind="price") as attempt:
+        try:
+            url = f"{BASE_URL}/simple/price"
+            params = {
+                "ids": cg_id,
+                "vs_currencies": "usd",
+                "include_24hr_change": "true"
+            }
+            headers = {}
+            if api_key:
+                headers["x-cg-demo-api-key"] = api_key
+            
+            response = requests.get(url, params=params, headers=headers, timeout=3)
+            attempt.response(response)
+            if response.status_code == 200:
+                data = response.json()
+                if cg_id in data:
+                    attempt.succeeded()
+                    return data[cg_id]
+        except Exception as e:
+            attempt.failed(e)
     
     # Try OKEx for current price (Good for HYPE)
     okex_price = fetch_current_price_okex(okex_symbol)
@@ -408,41 +492,49 @@ def fetch_current_price(coin_name, api_key=None):
         return okex_price
 
     # Try Binance for current price
-    try:
-        url = "https://api.binance.com/api/v3/ticker/24hr"
-        params = {"symbol": binance_symbol}
-        response = requests.get(url, params=params)
-        if response.status_code == 200:
-            data = response.json()
-            return {
-                "usd": float(data["lastPrice"]),
-                "usd_24h_change": float(data["priceChangePercent"])
-            }
-    except:
-        pass
-            
-    # Fallback to Yahoo Finance
-    try:
-        ticker = yf.Ticker(yahoo_ticker)
-        # Get fast info
-        info = ticker.fast_info
-        if info and info.last_price:
-            # Yahoo doesn't give 24h change directly in fast_info easily without history
-            # Let's get 2 days history to calc change
-            hist = ticker.history(period="2d")
-            if len(hist) >= 2:
-                last = hist["Close"].iloc[-1]
-                prev = hist["Close"].iloc[-2]
-                change = ((last - prev) / prev) * 100
-                return {
-                    "usd": last,
-                    "usd_24h_change": change
-                }
-            else:
+    with fetch_attempt("Binance", binance_symbol, kind="price") as attempt:
+        try:
+            url = "https://api.binance.com/api/v3/ticker/24hr"
+            params = {"symbol": binance_symbol}
+            response = requests.get(url, params=params, timeout=3)
+            attempt.response(response)
+            if response.status_code == 200:
+                data = response.json()
+                attempt.succeeded()
                 return {
-                    "usd": info.last_price,
-                    "usd_24h_change": 0.0
+                    "usd": float(data["lastPrice"]),
+                    "usd_24h_change": float(data["priceChangePercent"])
                 }
-    except Exception as e:
-        st.error(f"Error fetching current price for {coin_name}: {e}")
-        return None
+        except Exception as e:
+            attempt.failed(e)
+            
+    # Fallback to Yahoo Finance
+    with fetch_attempt("Yahoo", yahoo_ticker, kind="price") as attempt:
+        try:
+            import yfinance as yf
+            ticker = yf.Ticker(yahoo_ticker)
+            # Get fast info
+            info = ticker.fast_info
+            if info and info.last_price:
+                # Yahoo doesn't give 24h change directly in fast_info easily without history
+                # Let's get 2 days history to calc change
+                hist = ticker.history(period="2d")
+                attempt.pages = 1
+                attempt.succeeded()
+                if len(hist) >= 2:
+                    last = hist["Close"].iloc[-1]
+                    prev = hist["Close"].iloc[-2]
+                    change = ((last - prev) / prev) * 100
+                    return {
+                        "usd": last,
+                        "usd_24h_change": change
+                    }
+                else:
+                    return {
+                        "usd": info.last_price,
+                        "usd_24h_change": 0.0
+                    }
+        except Exception as e:
+            attempt.failed(e)
+            print(f"Error fetching current price for {coin_name}: {e}")
+            return None